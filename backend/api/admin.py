@@ -1,74 +1,190 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from tempfile import SpooledTemporaryFile
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+import json
 
-from models.schemas import AdminStats, UserInfo
-from services.interfaces import LDAPServiceAbstractClass, DatabaseServiceAbstractClass
+from core.config import settings
+from models.schemas import AdminDashboard, AdminStats, UserInfo
+from services.interfaces import AsyncLDAPServiceAbstractClass, DatabaseServiceAbstractClass
 from services.ldap_service import get_ldap_service
 from services.database_service import get_database_service
-from api.dependencies import require_admin
+from services.stats_service import AdminStatsService, get_admin_stats_service
+from services.import_service import PARSERS, UserImportService, get_import_service, iter_file_lines
+from api.dependencies import check_group, get_current_user_with_groups, require_admin
+from api.responses import model_response
 
 
 router = APIRouter()
 
 
+def _build_user_info(user: dict, memberships: Dict[str, List[str]]) -> Optional[UserInfo]:
+    """Join a Mongo user document with its LDAP groups, or None if it can't be processed"""
+    try:
+        return UserInfo(
+            username=user["username"],
+            email=user["email"],
+            first_name=user["first_name"],
+            last_name=user["last_name"],
+            groups=memberships.get(user["username"], []),
+            created_at=user.get("created_at"),
+            last_login=user.get("last_login"),
+            is_active=user.get("is_active", True)
+        )
+    except Exception:
+        return None
+
+
+async def _get_page_memberships(
+    ldap_service: AsyncLDAPServiceAbstractClass,
+    users: List[dict]
+) -> Dict[str, List[str]]:
+    """LDAP groups of just the users on this page"""
+    if not users:
+        return {}
+    return await ldap_service.get_groups_for_users([user["username"] for user in users])
+
+
+async def _stream_users(
+    ldap_service: AsyncLDAPServiceAbstractClass,
+    db_service: DatabaseServiceAbstractClass,
+    after: Optional[str],
+    limit: Optional[int]
+) -> AsyncIterator[str]:
+    """Yield users as NDJSON lines while the database cursor produces them"""
+    batch: List[dict] = []
+    
+    async def flush() -> str:
+        memberships = await _get_page_memberships(ldap_service, batch)
+        user_infos = (_build_user_info(user, memberships) for user in batch)
+        lines = "".join(user_info.model_dump_json() + "\n" for user_info in user_infos if user_info is not None)
+        batch.clear()
+        return lines
+    
+    # Groups are looked up once per batch of users rather than for the whole directory
+    async for user in db_service.iter_users(after=after, limit=limit):
+        batch.append(user)
+        if len(batch) >= settings.ADMIN_USERS_STREAM_BATCH_SIZE:
+            yield await flush()
+    if batch:
+        yield await flush()
+
+
+async def _get_users_page(
+    db_service: DatabaseServiceAbstractClass,
+    page_size: int,
+    after: Optional[str]
+) -> Tuple[List[dict], Optional[str]]:
+    """A page of user documents and the cursor for the next page, if there is one"""
+    # Fetch one extra row to learn whether another page follows
+    users = await db_service.get_users_page(page_size + 1, after)
+    if len(users) > page_size:
+        users = users[:page_size]
+        return users, users[-1]["username"]
+    return users, None
+
+
+def _build_user_list(users: List[dict], memberships: Dict[str, List[str]]) -> List[UserInfo]:
+    user_list = []
+    for user in users:
+        user_info = _build_user_info(user, memberships)
+        if user_info is not None:
+            user_list.append(user_info)
+    return user_list
+
+
 @router.get("/users", response_model=List[UserInfo])
 async def get_all_users(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=settings.ADMIN_USERS_MAX_PAGE_SIZE),
+    after: Optional[str] = Query(None, description="Return users whose username sorts after this cursor"),
+    output_format: str = Query("json", alias="format", pattern="^(json|ndjson)$"),
     current_user: str = Depends(require_admin),
-    ldap_service: LDAPServiceAbstractClass = Depends(get_ldap_service),
+    ldap_service: AsyncLDAPServiceAbstractClass = Depends(get_ldap_service),
     db_service: DatabaseServiceAbstractClass = Depends(get_database_service)
 ):
-    """Get all users - Admin only"""
-    users = await db_service.get_all_users()
-    user_list = []
+    """Get users a page at a time, or stream them as NDJSON - Admin only"""
+    if output_format == "ndjson":
+        return StreamingResponse(
+            _stream_users(ldap_service, db_service, after, limit),
+            media_type="application/x-ndjson"
+        )
     
-    for user in users:
-        try:
-            groups = ldap_service.get_user_groups(user["username"])
-            user_info = UserInfo(
-                username=user["username"],
-                email=user["email"],
-                first_name=user["first_name"],
-                last_name=user["last_name"],
-                groups=groups,
-                created_at=user.get("created_at"),
-                last_login=user.get("last_login"),
-                is_active=user.get("is_active", True)
-            )
-            user_list.append(user_info)
-        except Exception:
-            # Skip users that can't be processed
-            continue
+    users, next_cursor = await _get_users_page(db_service, limit or settings.ADMIN_USERS_PAGE_SIZE, after)
+    memberships = await _get_page_memberships(ldap_service, users)
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
     
-    return user_list
+    return model_response(_build_user_list(users, memberships), List[UserInfo], response)
+
+
+async def _stream_import_results(
+    import_service: UserImportService,
+    upload: SpooledTemporaryFile,
+    input_format: str
+) -> AsyncIterator[str]:
+    """Run the import over the spooled upload, yielding one NDJSON result per row"""
+    try:
+        rows = PARSERS[input_format](iter_file_lines(upload))
+        async for result in import_service.import_rows(rows):
+            yield json.dumps(result) + "\n"
+    finally:
+        upload.close()
+
+
+@router.post("/users/import")
+async def import_users(
+    request: Request,
+    input_format: str = Query("csv", alias="format", pattern="^(csv|ndjson)$"),
+    current_user: str = Depends(require_admin),
+    import_service: UserImportService = Depends(get_import_service)
+):
+    """Bulk import users from a CSV or NDJSON body, streaming per-row results - Admin only"""
+    # The body is spooled first because a streaming response shares the receive channel
+    upload = SpooledTemporaryFile(max_size=settings.USER_IMPORT_SPOOL_MAX_BYTES)
+    async for chunk in request.stream():
+        upload.write(chunk)
+    upload.seek(0)
+    
+    return StreamingResponse(
+        _stream_import_results(import_service, upload, input_format),
+        media_type="application/x-ndjson"
+    )
 
 
 @router.get("/stats", response_model=AdminStats)
 async def get_admin_stats(
     current_user: str = Depends(require_admin),
-    ldap_service: LDAPServiceAbstractClass = Depends(get_ldap_service),
-    db_service: DatabaseServiceAbstractClass = Depends(get_database_service)
+    stats_service: AdminStatsService = Depends(get_admin_stats_service)
 ):
     """Get admin statistics - Admin only"""
-    stats = await db_service.get_admin_stats()
-    
-    # Count users by group from LDAP
-    users = await db_service.get_all_users()
-    group_a_count = 0
-    group_b_count = 0
-    
-    for user in users:
-        try:
-            groups = ldap_service.get_user_groups(user["username"])
-            if "Group_A" in groups:
-                group_a_count += 1
-            if "Group_B" in groups:
-                group_b_count += 1
-        except Exception:
-            continue
+    return model_response(await stats_service.get_stats(), AdminStats)
+
+
+@router.get("/dashboard", response_model=AdminDashboard)
+async def get_admin_dashboard(
+    limit: Optional[int] = Query(None, ge=1, le=settings.ADMIN_USERS_MAX_PAGE_SIZE),
+    current_user: Tuple[str, List[str]] = Depends(get_current_user_with_groups),
+    ldap_service: AsyncLDAPServiceAbstractClass = Depends(get_ldap_service),
+    db_service: DatabaseServiceAbstractClass = Depends(get_database_service),
+    stats_service: AdminStatsService = Depends(get_admin_stats_service)
+):
+    """First page of users and the stats in one response - Admin only.
+
+    Authenticates once, reads the user page and the stats concurrently, then
+    the groups of the users on the page.
+    """
+    check_group(current_user[1], "Group_A")
     
-    return AdminStats(
-        total_users=stats["total_users"],
-        group_a_users=group_a_count,
-        group_b_users=group_b_count,
-        active_sessions=stats["active_sessions"]
+    (users, next_cursor), stats = await asyncio.gather(
+        _get_users_page(db_service, limit or settings.ADMIN_USERS_PAGE_SIZE, None),
+        stats_service.get_stats()
     )
+    memberships = await _get_page_memberships(ldap_service, users)
+    
+    return model_response(AdminDashboard(
+        users=_build_user_list(users, memberships),
+        next_cursor=next_cursor,
+        stats=stats
+    ), AdminDashboard)
@@ -1,14 +1,13 @@
 from fastapi import APIRouter, Depends
+from typing import Optional
 
 from models.schemas import (
-    UserRegistration, UserLogin, Token, UserInfo, 
-)
-from services.interfaces import (
-    AuthServiceAbstractClass, DatabaseServiceAbstractClass
+    UserRegistration, UserLogin, Token, UserInfo, RefreshRequest, RefreshedToken,
 )
+from services.interfaces import AuthServiceAbstractClass
 from services.auth_service import get_auth_service
-from services.database_service import get_database_service
-from api.dependencies import get_current_user, require_admin, require_user
+from api.dependencies import get_client_ip, get_current_user, get_token_payload, require_admin, require_user
+from api.responses import model_response
 
 
 router = APIRouter()
@@ -26,10 +25,22 @@ async def register_user(
 @router.post("/login", response_model=Token)
 async def login_user(
     user_credentials: UserLogin,
+    client_ip: Optional[str] = Depends(get_client_ip),
     auth_service: AuthServiceAbstractClass = Depends(get_auth_service)
 ):
     """Authenticate user and return JWT token"""
-    return await auth_service.authenticate_user(user_credentials.username, user_credentials.password)
+    return await auth_service.authenticate_user(
+        user_credentials.username, user_credentials.password, client_ip
+    )
+
+
+@router.post("/refresh", response_model=RefreshedToken)
+async def refresh_token(
+    request: RefreshRequest,
+    auth_service: AuthServiceAbstractClass = Depends(get_auth_service)
+):
+    """Rotate a refresh token into a new access token without contacting LDAP"""
+    return await auth_service.refresh_access_token(request.refresh_token)
 
 
 @router.get("/me", response_model=UserInfo)
@@ -38,14 +49,15 @@ async def get_current_user_info(
     auth_service: AuthServiceAbstractClass = Depends(get_auth_service)
 ):
     """Get current user information"""
-    return await auth_service.get_current_user(current_user)
+    return model_response(await auth_service.get_current_user(current_user), UserInfo)
 
 
 @router.post("/logout")
 async def logout_user(
     current_user: str = Depends(get_current_user),
-    db_service: DatabaseServiceAbstractClass = Depends(get_database_service)
+    payload: dict = Depends(get_token_payload),
+    auth_service: AuthServiceAbstractClass = Depends(get_auth_service)
 ):
-    """Logout user (log activity)"""
-    await db_service.log_user_activity(current_user, "User logged out")
+    """Logout user - revoke the refresh session and log activity"""
+    await auth_service.logout(current_user, payload.get("sid"))
     return {"message": "Successfully logged out"}
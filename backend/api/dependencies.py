@@ -1,8 +1,12 @@
-from fastapi import Depends, HTTPException, status
+import asyncio
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from typing import List, Optional, Tuple
+
+from core.config import settings
 
 from core.security import security_service
-from services.interfaces import LDAPServiceAbstractClass, DatabaseServiceAbstractClass
+from services.interfaces import AsyncLDAPServiceAbstractClass, DatabaseServiceAbstractClass
 from services.ldap_service import get_ldap_service
 from services.database_service import get_database_service
 
@@ -10,37 +14,91 @@ from services.database_service import get_database_service
 security = HTTPBearer()
 
 
+def get_client_ip(request: Request) -> Optional[str]:
+    """Address of the client, taken from X-Forwarded-For only when the proxy is trusted"""
+    if settings.TRUST_FORWARDED_FOR:
+        forwarded_for = request.headers.get("x-forwarded-for")
+        if forwarded_for:
+            # The last hop is the one our proxy appended; earlier ones are client-supplied
+            return forwarded_for.split(",")[-1].strip()
+    return request.client.host if request.client else None
+
+
+def get_token_payload(
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> dict:
+    """Verify the bearer token and return its claims"""
+    return security_service.verify_token(credentials.credentials)
+
+
 async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    ldap_service: LDAPServiceAbstractClass = Depends(get_ldap_service)
+    payload: dict = Depends(get_token_payload),
+    ldap_service: AsyncLDAPServiceAbstractClass = Depends(get_ldap_service)
 ) -> str:
     """Get current authenticated user"""
-    payload = security_service.verify_token(credentials.credentials)
     username = payload.get("sub")
-    
-    # Verify user still exists in LDAP
-    if not ldap_service.user_exists(username):
+
+    # Fresh signed claims are trusted as-is; otherwise verify user still exists in LDAP
+    if security_service.claims_are_fresh(payload):
+        return username
+
+    if not await ldap_service.user_exists(username):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User no longer exists",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    
+
     return username
 
 
+async def get_current_user_with_groups(
+    payload: dict = Depends(get_token_payload),
+    ldap_service: AsyncLDAPServiceAbstractClass = Depends(get_ldap_service)
+) -> Tuple[str, List[str]]:
+    """Authenticate once and return the username with its groups, for composite endpoints"""
+    username = payload.get("sub")
+
+    if security_service.claims_are_fresh(payload):
+        return username, payload["groups"]
+
+    # The existence check and the group lookup are independent, so run them together
+    exists, groups = await asyncio.gather(
+        ldap_service.user_exists(username),
+        ldap_service.get_user_groups(username)
+    )
+    if not exists:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User no longer exists",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    return username, groups
+
+
+def check_group(groups: List[str], required_group: str):
+    """Raise 403 unless required_group is among groups"""
+    if required_group not in groups:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Access denied. {required_group} membership required."
+        )
+
+
 def require_group(required_group: str):
     """Factory function to create group requirement dependency"""
-    def _require_group(
+    async def _require_group(
         current_user: str = Depends(get_current_user),
-        ldap_service: LDAPServiceAbstractClass = Depends(get_ldap_service)
+        payload: dict = Depends(get_token_payload),
+        ldap_service: AsyncLDAPServiceAbstractClass = Depends(get_ldap_service)
     ):
-        groups = ldap_service.get_user_groups(current_user)
-        if required_group not in groups:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail=f"Access denied. {required_group} membership required."
-            )
+        if security_service.claims_are_fresh(payload):
+            groups = payload["groups"]
+        else:
+            groups = await ldap_service.get_user_groups(current_user)
+
+        check_group(groups, required_group)
         return current_user
 
     return _require_group
@@ -1,45 +1,42 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response, status
 from datetime import datetime
 
-from models.schemas import HealthStatus
-from services.interfaces import LDAPServiceAbstractClass, DatabaseServiceAbstractClass
-from services.ldap_service import get_ldap_service
-from services.database_service import get_database_service
+from models.schemas import HealthStatus, ReadinessStatus
+from services.health_monitor import HealthMonitor, get_health_monitor
 
 
 router = APIRouter()
 
 
 @router.get("/health", response_model=HealthStatus)
-async def health_check(
-    ldap_service: LDAPServiceAbstractClass = Depends(get_ldap_service),
-    db_service: DatabaseServiceAbstractClass = Depends(get_database_service)
-):
-    """Health check endpoint"""
-    services = {}
-    
-    # Check LDAP connection
-    try:
-        conn = ldap_service._get_connection()
-        conn.unbind()
-        services["ldap"] = "connected"
-    except Exception:
-        services["ldap"] = "disconnected"
-    
-    # Check MongoDB connection
-    try:
-        is_healthy = await db_service.health_check()
-        services["mongodb"] = "connected" if is_healthy else "disconnected"
-    except Exception:
-        services["mongodb"] = "disconnected"
-    
+async def health_check(monitor: HealthMonitor = Depends(get_health_monitor)):
+    """Health check endpoint - served from the monitor's last check"""
+    await monitor.start()
+    services = {name: service.status for name, service in monitor.services().items()}
+
     # Determine overall status
     overall_status = "healthy" if all(
-        status == "connected" for status in services.values()
+        service_status == "connected" for service_status in services.values()
     ) else "unhealthy"
-    
+
     return HealthStatus(
         status=overall_status,
         services=services,
         timestamp=datetime.utcnow()
     )
+
+
+@router.get("/livez")
+async def liveness():
+    """Liveness probe - answers as long as the event loop is serving requests"""
+    return {"status": "alive"}
+
+
+@router.get("/readyz", response_model=ReadinessStatus)
+async def readiness(response: Response, monitor: HealthMonitor = Depends(get_health_monitor)):
+    """Readiness probe - 503 when a dependency is down or the last check is stale"""
+    await monitor.start()
+    readiness_status = monitor.readiness()
+    if readiness_status.status != "ready":
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return readiness_status
@@ -0,0 +1,144 @@
+import secrets
+import time
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+
+from core.config import settings
+
+from core.security import security_service
+from services.ldap_pool import get_pool_stats
+from services.directory_mirror import get_directory_mirror
+from services.health_monitor import get_health_monitor
+from services.ldap_service import get_group_cache
+from utils.metrics import CallbackMetric, http_request_duration, registry
+
+
+router = APIRouter()
+bearer = HTTPBearer(auto_error=False)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4"
+
+
+def _caches() -> dict:
+    return {
+        "ldap_groups": get_group_cache(),
+        "revoked_claims": security_service.revoked_claims,
+        "verified_tokens": security_service.token_cache,
+    }
+
+
+def _cache_stat(field: str):
+    return lambda: {(name,): cache.stats()[field] for name, cache in _caches().items()}
+
+
+def _pool_connections() -> dict:
+    return {
+        (pool, state): stats[state]
+        for pool, stats in get_pool_stats().items()
+        for state in ("idle", "in_use")
+    }
+
+
+registry.register(CallbackMetric(
+    "ldap_pool_connections", "Open LDAP connections by pool and state",
+    ("pool", "state"), _pool_connections,
+))
+registry.register(CallbackMetric(
+    "ldap_pool_size", "Maximum connections per LDAP pool",
+    ("pool",), lambda: {(pool,): stats["size"] for pool, stats in get_pool_stats().items()},
+))
+registry.register(CallbackMetric(
+    "cache_entries", "Entries held in each in-process cache", ("cache",), _cache_stat("size"),
+))
+registry.register(CallbackMetric(
+    "cache_hits_total", "Cache lookups that found a live entry", ("cache",), _cache_stat("hits"), type="counter",
+))
+registry.register(CallbackMetric(
+    "cache_misses_total", "Cache lookups that found nothing", ("cache",), _cache_stat("misses"), type="counter",
+))
+registry.register(CallbackMetric(
+    "cache_hit_ratio", "Share of cache lookups that were hits", ("cache",), _cache_stat("hit_ratio"),
+))
+registry.register(CallbackMetric(
+    "dependency_up", "Whether the last health check reached each dependency", ("service",),
+    lambda: {(name,): int(service.status == "connected") for name, service in get_health_monitor().services().items()},
+))
+registry.register(CallbackMetric(
+    "dependency_check_latency_seconds", "Duration of the last health check per dependency", ("service",),
+    lambda: {(name,): service.latency_ms / 1000 for name, service in get_health_monitor().services().items()},
+))
+
+
+def _mirror_staleness() -> dict:
+    mirror = get_directory_mirror()
+    if mirror is None:
+        return {}
+    ages = {"delta": mirror.staleness(), "full": mirror.full_staleness()}
+    return {(kind,): age for kind, age in ages.items() if age is not None}
+
+
+def _mirror_entries() -> dict:
+    mirror = get_directory_mirror()
+    return {} if mirror is None else {(kind,): count for kind, count in mirror.stats().items()}
+
+
+registry.register(CallbackMetric(
+    "ldap_mirror_staleness_seconds",
+    "Seconds since the directory mirror's last successful sync of any kind (delta) or full resync (full) began; "
+    "full bounds how long a deleted user can still be reported as existing",
+    ("kind",), _mirror_staleness,
+))
+registry.register(CallbackMetric(
+    "ldap_mirror_entries", "Users and groups held in the directory mirror", ("kind",),
+    _mirror_entries,
+))
+
+
+class MetricsMiddleware:
+    """Records the latency of every HTTP request by method, route template and status"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # The router stores the matched route in the scope; templates keep label cardinality bounded
+            route = scope.get("route")
+            http_request_duration.labels(
+                scope["method"], getattr(route, "path", "unmatched"), str(status_code)
+            ).observe(time.perf_counter() - start)
+
+
+def require_metrics_token(credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer)):
+    """Require METRICS_TOKEN as a bearer token when one is configured"""
+    if not settings.METRICS_TOKEN:
+        return
+    if credentials is None or not secrets.compare_digest(credentials.credentials, settings.METRICS_TOKEN):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+@router.get("/metrics", include_in_schema=False, dependencies=[Depends(require_metrics_token)])
+async def metrics():
+    """Prometheus scrape endpoint"""
+    return Response(registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
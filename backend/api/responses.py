@@ -0,0 +1,64 @@
+"""Opt-in fast JSON responses (FAST_RESPONSES).
+
+FastAPI validates whatever a handler returns against its response_model,
+dumps the result to Python primitives and only then encodes it with the
+standard json module. For handlers that already build the response models
+themselves that is the same work done twice. model_response hands such
+models straight to pydantic-core, which writes the JSON bytes in one pass;
+the response_model stays on the route for the OpenAPI schema.
+"""
+import importlib.util
+from functools import lru_cache
+from typing import Any, Optional, Type
+
+from fastapi import Response
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import TypeAdapter
+
+from core.config import settings
+from utils.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+
+@lru_cache(maxsize=None)
+def _adapter(response_type: Any) -> TypeAdapter:
+    return TypeAdapter(response_type)
+
+
+class ModelResponse(Response):
+    """JSON written by pydantic-core from already-validated models, without revalidating them"""
+    media_type = "application/json"
+
+    def __init__(self, content: Any, response_type: Any, status_code: int = 200):
+        self.adapter = _adapter(response_type)
+        super().__init__(content, status_code)
+
+    def render(self, content: Any) -> bytes:
+        return self.adapter.dump_json(content)
+
+
+def model_response(content: Any, response_type: Any, response: Optional[Response] = None) -> Any:
+    """content as a ModelResponse when FAST_RESPONSES is on, otherwise content for FastAPI to validate.
+
+    content must already be an instance of response_type. Headers set on the
+    injected response are carried over, since FastAPI drops them once a
+    handler returns its own Response.
+    """
+    if not settings.FAST_RESPONSES:
+        return content
+    fast = ModelResponse(content, response_type)
+    if response is not None:
+        fast.raw_headers.extend(response.raw_headers)
+    return fast
+
+
+def get_default_response_class() -> Type[Response]:
+    """ORJSONResponse for the remaining routes when FAST_RESPONSES is on and orjson is installed"""
+    if not settings.FAST_RESPONSES:
+        return JSONResponse
+    if importlib.util.find_spec("orjson") is None:
+        logger.warning("FAST_RESPONSES is set but orjson is not installed - using JSONResponse")
+        return JSONResponse
+    return ORJSONResponse
@@ -1,31 +1,25 @@
+import asyncio
 from fastapi import APIRouter, Depends, HTTPException
-from typing import List
+from typing import List, Optional, Tuple
 
-from models.schemas import UserProfile, UserActivity
-from services.interfaces import LDAPServiceAbstractClass, DatabaseServiceAbstractClass
+from models.schemas import UserProfile, UserActivity, UserDashboard
+from services.interfaces import AsyncLDAPServiceAbstractClass, DatabaseServiceAbstractClass
 from services.ldap_service import get_ldap_service
 from services.database_service import get_database_service
-from api.dependencies import get_current_user
+from api.dependencies import get_current_user, get_current_user_with_groups
+from api.responses import model_response
 
 
 router = APIRouter()
 
 
-@router.get("/profile", response_model=UserProfile)
-async def get_user_profile(
-    current_user: str = Depends(get_current_user),
-    ldap_service: LDAPServiceAbstractClass = Depends(get_ldap_service),
-    db_service: DatabaseServiceAbstractClass = Depends(get_database_service)
-):
-    """Get user profile"""
-    user_doc = await db_service.get_user(current_user)
-    groups = ldap_service.get_user_groups(current_user)
-    
+def _build_profile(username: str, user_doc: Optional[dict], groups: List[str]) -> UserProfile:
+    """Combine the MongoDB profile with LDAP groups"""
     if not user_doc:
         raise HTTPException(status_code=404, detail="User not found")
-    
+
     return UserProfile(
-        username=current_user,
+        username=username,
         email=user_doc["email"],
         first_name=user_doc["first_name"],
         last_name=user_doc["last_name"],
@@ -38,14 +32,7 @@ async def get_user_profile(
     )
 
 
-@router.get("/activities", response_model=List[UserActivity])
-async def get_user_activities(
-    current_user: str = Depends(get_current_user),
-    db_service: DatabaseServiceAbstractClass = Depends(get_database_service)
-):
-    """Get user activities"""
-    activities = await db_service.get_user_activities(current_user)
-    
+def _build_activities(activities: List[dict]) -> List[UserActivity]:
     return [
         UserActivity(
             timestamp=activity["timestamp"],
@@ -54,3 +41,45 @@ async def get_user_activities(
         )
         for activity in activities
     ]
+
+
+@router.get("/profile", response_model=UserProfile)
+async def get_user_profile(
+    current_user: str = Depends(get_current_user),
+    ldap_service: AsyncLDAPServiceAbstractClass = Depends(get_ldap_service),
+    db_service: DatabaseServiceAbstractClass = Depends(get_database_service)
+):
+    """Get user profile"""
+    user_doc = await db_service.get_user(current_user)
+    groups = await ldap_service.get_user_groups(current_user)
+
+    return model_response(_build_profile(current_user, user_doc, groups), UserProfile)
+
+
+@router.get("/activities", response_model=List[UserActivity])
+async def get_user_activities(
+    current_user: str = Depends(get_current_user),
+    db_service: DatabaseServiceAbstractClass = Depends(get_database_service)
+):
+    """Get user activities"""
+    activities = await db_service.get_user_activities(current_user)
+
+    return model_response(_build_activities(activities), List[UserActivity])
+
+
+@router.get("/dashboard", response_model=UserDashboard)
+async def get_user_dashboard(
+    current_user: Tuple[str, List[str]] = Depends(get_current_user_with_groups),
+    db_service: DatabaseServiceAbstractClass = Depends(get_database_service)
+):
+    """Profile and activities in one response - authenticates once and reads MongoDB concurrently"""
+    username, groups = current_user
+    user_doc, activities = await asyncio.gather(
+        db_service.get_user(username),
+        db_service.get_user_activities(username)
+    )
+
+    return model_response(UserDashboard(
+        profile=_build_profile(username, user_doc, groups),
+        activities=_build_activities(activities)
+    ), UserDashboard)
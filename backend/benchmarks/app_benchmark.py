@@ -0,0 +1,244 @@
+"""End-to-end HTTP benchmark of the app in-process against the service fakes.
+
+Requests go through the full FastAPI stack over httpx's ASGI transport, with
+LDAP and MongoDB replaced by the fakes in benchmarks.fakes through dependency
+overrides. Each scenario runs at every requested user count and reports
+throughput and p50/p95/p99 latency. Run from the backend directory:
+
+    python -m benchmarks.app_benchmark --users 100 1000 10000
+    python -m benchmarks.app_benchmark --save-baseline benchmarks/baseline.json
+    python -m benchmarks.app_benchmark --baseline benchmarks/baseline.json
+
+With --baseline the run exits non-zero if any scenario's median latency
+grew, or its throughput fell, by more than --tolerance. Timings depend on
+the machine, so record the baseline on the machine you compare on.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+from datetime import timedelta
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+from benchmarks.fakes import FakeDatabaseService, FakeLDAPService, populate
+from benchmarks.login_benchmark import percentile
+from core.config import settings
+from core.security import security_service
+from main import create_application
+from services.activity_log import ActivityLogWriter, get_activity_log_writer
+from services.auth_service import AuthService, get_auth_service
+from services.database_service import get_database_service
+from services.ldap_service import get_ldap_service
+from services.login_guard import LoginGuard, MemoryCounterStore
+from services.session_service import SessionService
+from services.stats_service import AdminStatsService, get_admin_stats_service
+from services.uid_allocator import UIDAllocator, get_uid_allocator
+
+
+PASSWORD = "password123"
+# Users whose tokens the authenticated scenarios rotate through
+TOKEN_USERS = 100
+
+Scenario = Callable[[httpx.AsyncClient, int], Awaitable[httpx.Response]]
+
+
+class BenchmarkApp:
+    """The FastAPI app wired to fakes populated with user_count users"""
+
+    def __init__(self, user_count: int, ldap_latency: float, db_latency: float):
+        self.user_count = user_count
+        self.ldap_service = FakeLDAPService(latency=ldap_latency)
+        self.db_service = FakeDatabaseService(latency=db_latency)
+        populate(self.ldap_service, self.db_service, user_count, PASSWORD)
+
+        self.activity_log = ActivityLogWriter(self.db_service)
+        self.uid_allocator = UIDAllocator(self.ldap_service, self.db_service)
+        self.stats_service = AdminStatsService(self.ldap_service, self.db_service)
+        self.login_guard = LoginGuard(MemoryCounterStore())
+        self.session_service = SessionService(self.db_service)
+
+        self.app = create_application()
+        self.app.dependency_overrides = {
+            get_ldap_service: lambda: self.ldap_service,
+            get_database_service: lambda: self.db_service,
+            get_activity_log_writer: lambda: self.activity_log,
+            get_uid_allocator: lambda: self.uid_allocator,
+            get_admin_stats_service: lambda: self.stats_service,
+            get_auth_service: lambda: AuthService(
+                self.ldap_service, self.db_service, self.activity_log, self.uid_allocator, self.login_guard,
+                self.session_service
+            ),
+        }
+
+        # populate() puts odd-numbered users in Group_A (admins) and even-numbered in Group_B
+        self.tokens = [self._token(i) for i in range(1, min(user_count, TOKEN_USERS) + 1)]
+        self.admin_token = self.tokens[0]
+
+    def username(self, i: int) -> str:
+        return f"user{i % self.user_count + 1}"
+
+    def _token(self, number: int) -> str:
+        username = f"user{number}"
+        return security_service.create_access_token(
+            data={"sub": username, "groups": self.ldap_service.memberships.get(username, [])},
+            expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+        )
+
+    def user_headers(self, i: int) -> dict:
+        return {"Authorization": f"Bearer {self.tokens[i % len(self.tokens)]}"}
+
+    def admin_headers(self) -> dict:
+        return {"Authorization": f"Bearer {self.admin_token}"}
+
+    def scenarios(self, page_size: int) -> Dict[str, Scenario]:
+        return {
+            "login": lambda client, i: client.post(
+                "/auth/login", json={"username": self.username(i), "password": PASSWORD}
+            ),
+            "auth_me": lambda client, i: client.get("/auth/me", headers=self.user_headers(i)),
+            "user_profile": lambda client, i: client.get("/user/profile", headers=self.user_headers(i)),
+            "admin_users": lambda client, i: client.get(
+                "/admin/users", params={"limit": page_size}, headers=self.admin_headers()
+            ),
+            "admin_stats": lambda client, i: client.get("/admin/stats", headers=self.admin_headers()),
+            "user_dashboard": lambda client, i: client.get("/user/dashboard", headers=self.user_headers(i)),
+            "admin_dashboard": lambda client, i: client.get(
+                "/admin/dashboard", params={"limit": page_size}, headers=self.admin_headers()
+            ),
+        }
+
+    async def close(self):
+        await self.stats_service.stop()
+        await self.activity_log.stop()
+
+
+async def run_scenario(client: httpx.AsyncClient, scenario: Scenario, requests: int,
+                       concurrency: int, warmup: int) -> dict:
+    """Issue requests from concurrency workers and summarise the latencies"""
+    for i in range(warmup):
+        await scenario(client, i)
+
+    latencies: List[float] = []
+    errors = 0
+    next_index = 0
+
+    async def worker():
+        nonlocal errors, next_index
+        while next_index < requests:
+            i = next_index
+            next_index += 1
+            start = time.perf_counter()
+            response = await scenario(client, i)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code != 200:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "requests": requests,
+        "errors": errors,
+        "throughput": requests / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+
+async def run_suite(args) -> Dict[str, dict]:
+    results: Dict[str, dict] = {}
+    for user_count in args.users:
+        bench = BenchmarkApp(user_count, args.ldap_latency, args.db_latency)
+        transport = httpx.ASGITransport(app=bench.app)
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+                for name, scenario in bench.scenarios(args.page_size).items():
+                    if args.scenarios and name not in args.scenarios:
+                        continue
+                    results[f"{name}@{user_count}"] = await run_scenario(
+                        client, scenario, args.requests, args.concurrency, args.warmup
+                    )
+        finally:
+            await bench.close()
+    return results
+
+
+def report(results: Dict[str, dict]):
+    print(f"{'scenario':<24} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for key, result in results.items():
+        print(
+            f"{key:<24} {result['throughput']:>9.1f} {result['p50_ms']:>8.2f} "
+            f"{result['p95_ms']:>8.2f} {result['p99_ms']:>8.2f} {result['errors']:>7}"
+        )
+
+
+def compare(results: Dict[str, dict], baseline: dict, tolerance: float) -> List[str]:
+    """Print the change against the baseline and return the scenarios that regressed"""
+    regressions = []
+    print(f"\n{'scenario':<24} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9}   vs {baseline.get('created_at', 'baseline')}")
+    for key, result in results.items():
+        before: Optional[dict] = baseline["results"].get(key)
+        if before is None:
+            print(f"{key:<24} {'new':>9}")
+            continue
+        throughput_change = result["throughput"] / before["throughput"] - 1
+        p50_change = result["p50_ms"] / before["p50_ms"] - 1
+        p95_change = result["p95_ms"] / before["p95_ms"] - 1
+        # Tail latency is too noisy on shared machines to gate on; it is shown for reference
+        regressed = throughput_change < -tolerance or p50_change > tolerance or result["errors"] > before["errors"]
+        print(
+            f"{key:<24} {throughput_change:>+9.1%} {p50_change:>+9.1%} {p95_change:>+9.1%}   "
+            f"{'REGRESSION' if regressed else 'ok'}"
+        )
+        if regressed:
+            regressions.append(key)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--scenarios", nargs="+", help="run only these scenarios")
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--page-size", type=int, default=settings.ADMIN_USERS_PAGE_SIZE)
+    parser.add_argument("--ldap-latency", type=float, default=0.002)
+    parser.add_argument("--db-latency", type=float, default=0.001)
+    parser.add_argument("--baseline", help="JSON file from --save-baseline to compare against")
+    parser.add_argument("--save-baseline", help="write the results to this JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative change before flagging")
+    args = parser.parse_args()
+
+    # Per-request client logging would dominate the timings
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    results = asyncio.run(run_suite(args))
+    report(results)
+
+    config = {
+        name: getattr(args, name)
+        for name in ("requests", "concurrency", "page_size", "ldap_latency", "db_latency")
+    }
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump({"created_at": time.strftime("%Y-%m-%d"), "config": config, "results": results}, f, indent=2)
+            f.write("\n")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get("config") != config:
+            print(f"\nwarning: baseline was recorded with {baseline.get('config')}", file=sys.stderr)
+        if compare(results, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Measure AsyncLDAPService throughput and event-loop stall across pool sizes.
+
+The group cache is disabled for every run, so each lookup is a directory
+round trip and the numbers reflect the pool rather than cache hits.
+
+Run from the backend directory:
+
+    python -m benchmarks.async_ldap_benchmark --operations 2000 --sizes 1 4 16
+"""
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from benchmarks.fake_ldap import FakeLDAPServer
+from core.config import settings
+from services.ldap_pool import LDAPConnectionPool
+from services.ldap_service import AsyncLDAPService, LDAPService
+from utils.cache import TTLCache
+
+
+async def watch_loop_lag(stop: asyncio.Event, interval: float = 0.001) -> float:
+    """Return the worst delay between scheduled wake-ups of the event loop"""
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - start - interval)
+    return worst
+
+
+async def run(size: int, operations: int):
+    pool = LDAPConnectionPool(
+        uri=f"ldap://{settings.LDAP_HOST}:{settings.LDAP_PORT}",
+        bind_dn=settings.LDAP_ADMIN_DN,
+        bind_password=settings.LDAP_ADMIN_PASSWORD,
+        size=size,
+    )
+    executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="ldap")
+    # A private, disabled cache - the process-wide one would answer every size after the first
+    service = AsyncLDAPService(LDAPService(pool=pool, group_cache=TTLCache(maxsize=0, ttl=0)), executor)
+
+    stop = asyncio.Event()
+    watcher = asyncio.create_task(watch_loop_lag(stop))
+    start = time.perf_counter()
+    await asyncio.gather(*(service.get_user_groups(f"user{i % 100 + 1}") for i in range(operations)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    lag = await watcher
+
+    executor.shutdown()
+    pool.close()
+    print(f"pool={size:<4} {operations / elapsed:>10.0f} ops/s  {elapsed:>7.2f}s  max loop lag={lag * 1000:.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--operations", type=int, default=2000)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--op-latency", type=float, default=0.002)
+    args = parser.parse_args()
+
+    server = FakeLDAPServer(op_latency=args.op_latency)
+    server.populate(100)
+
+    with mock.patch("ldap.initialize", server.initialize):
+        for size in args.sizes:
+            asyncio.run(run(size, args.operations))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""Check the directory mirror against a stand-in directory that keeps changing.
+
+A change emitter edits the FakeLDAPServer behind the mirror's back, the way
+another application or an administrator would: it adds users, adds and
+removes group members and deletes users. After each change the harness
+times how long LDAPService takes to report it through the mirror. At the end
+the mirror is compared with the directory entry by entry, and lookup
+latency is compared with and without the mirror. Run from the backend
+directory:
+
+    python -m benchmarks.directory_mirror_harness --changes 40 --poll-interval 0.2
+
+The run exits non-zero if a change took longer than its staleness bound to
+show up, or if the mirror and the directory disagree after the last sync.
+Additions and membership changes are bounded by the poll interval;
+deletions carry no modifyTimestamp and are bounded by the full resync
+interval.
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+from typing import Dict, List, Set, Tuple
+from unittest import mock
+
+import ldap
+
+from benchmarks.fake_ldap import FakeLDAPServer
+from benchmarks.login_benchmark import percentile
+from core.config import settings
+from services.directory_mirror import DirectoryMirror, mirror_drift
+from services.ldap_pool import LDAPConnectionPool
+from services.ldap_service import LDAPService
+from utils.cache import TTLCache
+
+
+GROUPS = ("Group_A", "Group_B")
+
+
+def directory_state(server: FakeLDAPServer) -> Tuple[Set[str], Dict[str, Set[str]]]:
+    """Usernames and username -> groups as the directory currently has them"""
+    people_suffix = f",{server.people_dn}".lower()
+    users, memberships = set(), {}
+    with server.lock:
+        for key, entry in server.entries.items():
+            if key.endswith(people_suffix) and key.startswith("uid="):
+                users.add(entry["dn"].split(",", 1)[0][4:])
+            if b"groupOfNames" in entry["attrs"].get("objectClass", []):
+                group = entry["attrs"]["cn"][0].decode("utf-8")
+                for member in entry["attrs"].get("member", []):
+                    username = member.decode("utf-8").split(",", 1)[0][4:]
+                    memberships.setdefault(username, set()).add(group)
+    return users, memberships
+
+
+class ChangeEmitter:
+    """Applies random changes straight to the stand-in directory"""
+
+    def __init__(self, server: FakeLDAPServer, user_count: int, seed: int):
+        self.server = server
+        self.random = random.Random(seed)
+        self.next_user = user_count + 1
+        self.users: List[str] = [f"user{i + 1}" for i in range(user_count)]
+
+    def _modify_group(self, group: str, op: int, username: str):
+        conn = self.server.initialize("ldap://stand-in")
+        member = f"uid={username},{self.server.people_dn}".encode("utf-8")
+        try:
+            conn.modify_s(f"cn={group},{self.server.groups_dn}", [(op, "member", [member])])
+        except (ldap.TYPE_OR_VALUE_EXISTS, ldap.NO_SUCH_ATTRIBUTE):
+            pass
+
+    def emit(self) -> Tuple[str, str, str]:
+        """Apply one change and return (kind, username, group)"""
+        kind = self.random.choice(("add_user", "add_member", "remove_member", "delete_user"))
+        group = self.random.choice(GROUPS)
+        if kind == "add_user":
+            username = f"user{self.next_user}"
+            self.next_user += 1
+            self.server.add_entry(f"uid={username},{self.server.people_dn}", {
+                "objectClass": [b"inetOrgPerson", b"posixAccount"],
+                "uid": [username.encode("utf-8")],
+            })
+            self._modify_group(group, ldap.MOD_ADD, username)
+            self.users.append(username)
+        elif kind == "delete_user":
+            username = self.users.pop(self.random.randrange(len(self.users)))
+            # No referential integrity overlay, so memberships are removed by hand first
+            for name in GROUPS:
+                self._modify_group(name, ldap.MOD_DELETE, username)
+            self.server.delete_entry(f"uid={username},{self.server.people_dn}")
+        else:
+            username = self.random.choice(self.users)
+            self._modify_group(group, ldap.MOD_ADD if kind == "add_member" else ldap.MOD_DELETE, username)
+        return kind, username, group
+
+
+def visible(service: LDAPService, kind: str, username: str, group: str) -> bool:
+    if kind == "add_user":
+        return service.user_exists(username) and group in service.get_user_groups(username)
+    if kind == "delete_user":
+        return not service.user_exists(username)
+    groups = service.get_user_groups(username)
+    return (group in groups) == (kind == "add_member")
+
+
+async def wait_until_visible(service: LDAPService, change: Tuple[str, str, str], limit: float) -> float:
+    start = time.monotonic()
+    while not visible(service, *change):
+        if time.monotonic() - start > limit:
+            return float("inf")
+        await asyncio.sleep(0.01)
+    return time.monotonic() - start
+
+
+def lookup_latency(service: LDAPService, usernames: List[str]) -> float:
+    start = time.perf_counter()
+    for username in usernames:
+        service.user_exists(username)
+        service.get_user_groups(username)
+    return (time.perf_counter() - start) / (2 * len(usernames))
+
+
+async def run(args, server: FakeLDAPServer) -> bool:
+    pool = LDAPConnectionPool(
+        uri=f"ldap://{settings.LDAP_HOST}:{settings.LDAP_PORT}",
+        bind_dn=settings.LDAP_ADMIN_DN,
+        bind_password=settings.LDAP_ADMIN_PASSWORD,
+    )
+    mirror = DirectoryMirror(
+        pool,
+        poll_interval=args.poll_interval,
+        # Existence checks need a full resync within the bound, as with the settings' defaults
+        max_staleness=args.full_sync_interval + 3 * args.poll_interval,
+        full_sync_interval=args.full_sync_interval,
+        page_size=args.page_size,
+    )
+    # Group caching would hide the lag being measured
+    service = LDAPService(pool=pool, group_cache=TTLCache(maxsize=0, ttl=0), mirror=mirror)
+    direct = LDAPService(pool=pool, group_cache=TTLCache(maxsize=0, ttl=0))
+
+    start = time.perf_counter()
+    await mirror.start()
+    print(f"bootstrap of {args.users} users: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    emitter = ChangeEmitter(server, args.users, args.seed)
+    lags: Dict[str, List[float]] = {}
+    late = 0
+    try:
+        for _ in range(args.changes):
+            kind, username, group = emitter.emit()
+            # A change lands in the poll that starts after it, or for deletions the next full
+            # resync; syncs only start on poll ticks, and the sync itself takes time
+            bound = args.full_sync_interval if kind == "delete_user" else args.poll_interval
+            bound += 2 * args.poll_interval
+            lag = await wait_until_visible(service, (kind, username, group), bound * 2)
+            lags.setdefault(kind, []).append(lag)
+            if lag > bound:
+                late += 1
+                print(f"late: {kind} {username} {group} took {lag:.2f}s (bound {bound:.2f}s)")
+
+        await mirror.stop()
+        mirror.full_sync()
+        users, memberships = directory_state(server)
+        mirrored = {username: set(groups) for username, groups in mirror.get_group_memberships().items()}
+        mismatches = sum(1 for username in users if not mirror.user_exists(username))
+        mismatches += mirror.stats()["users"] - len(users)
+        mismatches += sum(
+            1 for username in set(memberships) | set(mirrored)
+            if memberships.get(username) != mirrored.get(username)
+        )
+
+        print(f"\n{'change':<14} {'count':>6} {'p50 s':>8} {'max s':>8}")
+        for kind, values in sorted(lags.items()):
+            print(f"{kind:<14} {len(values):>6} {percentile(values, 50):>8.3f} {max(values):>8.3f}")
+        print(f"\nlate changes: {late}  final mismatches: {mismatches}  "
+              f"drift corrected by full resyncs: {mirror_drift.labels().value:.0f}")
+
+        sample = [f"user{i % args.users + 1}" for i in range(200)]
+        print(f"lookup latency: mirror {lookup_latency(service, sample) * 1e6:.1f} us, "
+              f"ldap {lookup_latency(direct, sample) * 1e6:.1f} us")
+        return late == 0 and mismatches == 0
+    finally:
+        await mirror.stop()
+        pool.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--changes", type=int, default=40)
+    parser.add_argument("--poll-interval", type=float, default=0.2)
+    parser.add_argument("--full-sync-interval", type=float, default=2.0)
+    parser.add_argument("--page-size", type=int, default=settings.LDAP_PAGE_SIZE)
+    parser.add_argument("--op-latency", type=float, default=0.001)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    server = FakeLDAPServer(0, 0, args.op_latency)
+    server.populate(args.users)
+    with mock.patch("ldap.initialize", server.initialize):
+        ok = asyncio.run(run(args, server))
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
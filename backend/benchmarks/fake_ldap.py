@@ -0,0 +1,330 @@
+"""In-memory stand-in for an OpenLDAP server used by the benchmarks.
+
+The stand-in mimics the parts of the python-ldap connection API that
+LDAPService relies on and injects configurable latency for connecting,
+binding and each directory operation, so that round-trip savings show up
+in wall-clock numbers without a real slapd. With memberof=True the server
+also answers memberOf reads the way the OpenLDAP memberof overlay does.
+Entries carry a modifyTimestamp that adds and modifies keep current, and
+searches honour the Simple Paged Results control. With size_limit set, a
+search returning more entries raises SIZELIMIT_EXCEEDED unless it is paged
+in pages no larger than the limit, as slapd's sizelimit does. The matched
+values control trims returned attribute values to those its filter matches.
+"""
+import itertools
+import threading
+import time
+from typing import Dict, List, Optional
+
+import ldap
+from ldap.controls import SimplePagedResultsControl
+from ldap.controls.libldap import MatchedValuesControl
+
+from core.config import settings
+
+
+class FakeLDAPServer:
+    """Thread-safe in-memory directory with injected latency"""
+
+    def __init__(
+        self,
+        connect_latency: float = 0.002,
+        bind_latency: float = 0.001,
+        op_latency: float = 0.001,
+        memberof: bool = False,
+        size_limit: Optional[int] = None,
+    ):
+        self.connect_latency = connect_latency
+        self.memberof = memberof
+        self.size_limit = size_limit
+        self.bind_latency = bind_latency
+        self.op_latency = op_latency
+        self.entries: Dict[str, Dict[str, List[bytes]]] = {}
+        self.lock = threading.Lock()
+        self.counters = {"connect": 0, "bind": 0, "search": 0, "add": 0, "modify": 0, "delete": 0}
+        self.base_dn = settings.LDAP_BASE_DN
+        self.people_dn = f"{settings.LDAP_USERS_OU},{self.base_dn}"
+        self.groups_dn = f"{settings.LDAP_GROUPS_OU},{self.base_dn}"
+
+        self.add_entry(self.base_dn, {"objectClass": [b"dcObject"]})
+        self.add_entry(self.people_dn, {"objectClass": [b"organizationalUnit"]})
+        self.add_entry(self.groups_dn, {"objectClass": [b"organizationalUnit"]})
+        self.add_entry(
+            settings.LDAP_ADMIN_DN,
+            {"objectClass": [b"person"], "userPassword": [settings.LDAP_ADMIN_PASSWORD.encode("utf-8")]},
+        )
+
+    def add_entry(self, dn: str, attrs: Dict[str, List[bytes]]):
+        with self.lock:
+            self.entries[dn.lower()] = {"dn": dn, "attrs": {**attrs, "modifyTimestamp": [_generalized_time()]}}
+
+    def populate(self, user_count: int, password: str = "password123"):
+        """Create user_count posix users split across Group_A and Group_B"""
+        members = {"Group_A": [], "Group_B": []}
+        for i in range(user_count):
+            username = f"user{i + 1}"
+            user_dn = f"uid={username},{self.people_dn}"
+            self.add_entry(user_dn, {
+                "objectClass": [b"inetOrgPerson", b"posixAccount"],
+                "uid": [username.encode("utf-8")],
+                "uidNumber": [str(1001 + i).encode("utf-8")],
+                "userPassword": [password.encode("utf-8")],
+            })
+            group = "Group_A" if i % 2 == 0 else "Group_B"
+            members[group].append(user_dn.encode("utf-8"))
+
+        for group, member_dns in members.items():
+            self.add_entry(f"cn={group},{self.groups_dn}", {
+                "objectClass": [b"groupOfNames"],
+                "cn": [group.encode("utf-8")],
+                "member": member_dns,
+            })
+
+    def initialize(self, uri: str, **kwargs) -> "FakeLDAPConnection":
+        """Drop-in replacement for ldap.initialize"""
+        time.sleep(self.connect_latency)
+        self._count("connect")
+        return FakeLDAPConnection(self)
+
+    def _count(self, name: str):
+        with self.lock:
+            self.counters[name] += 1
+
+    def search(self, base: str, scope: int, filterstr: str, attrlist: Optional[List[str]]):
+        return self.materialize(self.match(base, scope, filterstr), attrlist)
+
+    def match(self, base: str, scope: int, filterstr: str) -> List[str]:
+        """Keys of the entries a search returns"""
+        with self.lock:
+            if base.lower() not in self.entries:
+                raise ldap.NO_SUCH_OBJECT({"desc": "No such object", "matched": base})
+            return [
+                key for key, entry in self.entries.items()
+                if _in_scope(key, base.lower(), scope) and _matches(entry["attrs"], filterstr)
+            ]
+
+    def materialize(self, keys: List[str], attrlist: Optional[List[str]]):
+        """Search results for keys, skipping entries deleted since they matched"""
+        results = []
+        with self.lock:
+            for key in keys:
+                entry = self.entries.get(key)
+                if entry is None:
+                    continue
+                attrs = entry["attrs"]
+                if self.memberof and attrlist is not None and "memberOf" in attrlist:
+                    attrs = {**attrs, "memberOf": self._member_of(entry["dn"])}
+                if attrlist is not None:
+                    attrs = {name: values for name, values in attrs.items() if name in attrlist}
+                results.append((entry["dn"], dict(attrs)))
+        return results
+
+    def delete_entry(self, dn: str):
+        with self.lock:
+            if self.entries.pop(dn.lower(), None) is None:
+                raise ldap.NO_SUCH_OBJECT({"desc": "No such object"})
+
+    def _member_of(self, dn: str) -> List[bytes]:
+        """DNs of the groups listing dn as a member; caller holds the lock"""
+        member = dn.lower().encode("utf-8")
+        return [
+            entry["dn"].encode("utf-8") for entry in self.entries.values()
+            if member in (value.lower() for value in entry["attrs"].get("member", []))
+        ]
+
+
+class FakeLDAPConnection:
+    """Subset of ldap.ldapobject.LDAPObject backed by a FakeLDAPServer"""
+
+    def __init__(self, server: FakeLDAPServer):
+        self.server = server
+        self.protocol_version = ldap.VERSION3
+        self.bound_dn: Optional[str] = None
+        self.closed = False
+        # msgid -> (results or matched keys, paged results control, attrlist) awaiting result3,
+        # and cookie -> matched keys left to page
+        self._msgids = itertools.count(1)
+        self._pending: Dict[int, tuple] = {}
+        self._paged: Dict[bytes, list] = {}
+
+    def set_option(self, option, value):
+        pass
+
+    def _check_open(self):
+        if self.closed:
+            raise ldap.SERVER_DOWN({"desc": "Can't contact LDAP server"})
+
+    def simple_bind_s(self, who: str, cred: str):
+        self._check_open()
+        time.sleep(self.server.bind_latency)
+        self.server._count("bind")
+        with self.server.lock:
+            entry = self.server.entries.get(who.lower())
+            stored = entry["attrs"].get("userPassword", []) if entry else []
+        if cred.encode("utf-8") not in stored:
+            raise ldap.INVALID_CREDENTIALS({"desc": "Invalid credentials"})
+        self.bound_dn = who
+
+    def whoami_s(self) -> str:
+        self._check_open()
+        time.sleep(self.server.op_latency)
+        return f"dn:{self.bound_dn}" if self.bound_dn else ""
+
+    def search_s(self, base: str, scope: int, filterstr: str = "(objectClass=*)", attrlist=None, attrsonly=0):
+        self._check_open()
+        time.sleep(self.server.op_latency)
+        self.server._count("search")
+        results = self.server.search(base, scope, filterstr, attrlist)
+        if self.server.size_limit is not None and len(results) > self.server.size_limit:
+            raise ldap.SIZELIMIT_EXCEEDED({"desc": "Size limit exceeded"})
+        return results
+
+    def search_ext(self, base: str, scope: int, filterstr: str = "(objectClass=*)", attrlist=None,
+                   attrsonly=0, serverctrls=None):
+        self._check_open()
+        control = next(
+            (c for c in serverctrls or [] if c.controlType == SimplePagedResultsControl.controlType), None
+        )
+        matched_values = next(
+            (c for c in serverctrls or [] if c.controlType == MatchedValuesControl.controlType), None
+        )
+        if control is None:
+            remaining = self.search_s(base, scope, filterstr, attrlist)
+            if matched_values is not None:
+                remaining = [(dn, _matched_values(attrs, matched_values.filterstr)) for dn, attrs in remaining]
+        elif control.cookie:
+            remaining = self._paged.pop(control.cookie, None)
+            if remaining is None:
+                raise ldap.PROTOCOL_ERROR({"desc": "Protocol error", "info": "unknown paged results cookie"})
+        else:
+            # Only the matching keys are held; each page's entries are built when it is sent
+            time.sleep(self.server.op_latency)
+            self.server._count("search")
+            remaining = self.server.match(base, scope, filterstr)
+        msgid = next(self._msgids)
+        self._pending[msgid] = (remaining, control, attrlist)
+        return msgid
+
+    def result3(self, msgid: int, all=1, timeout=None):
+        self._check_open()
+        remaining, control, attrlist = self._pending.pop(msgid)
+        if control is None:
+            return ldap.RES_SEARCH_RESULT, remaining, msgid, []
+        if control.size == 0:
+            # Abandon the paged search
+            return ldap.RES_SEARCH_RESULT, [], msgid, [SimplePagedResultsControl(False, size=0, cookie=b"")]
+        if control.cookie:
+            time.sleep(self.server.op_latency)
+        page, rest = remaining[:control.size], remaining[control.size:]
+        if self.server.size_limit is not None and len(page) > self.server.size_limit:
+            raise ldap.SIZELIMIT_EXCEEDED({"desc": "Size limit exceeded"})
+        cookie = b""
+        if rest:
+            cookie = str(msgid).encode("ascii")
+            self._paged[cookie] = rest
+        return ldap.RES_SEARCH_RESULT, self.server.materialize(page, attrlist), msgid, [SimplePagedResultsControl(False, size=0, cookie=cookie)]
+
+    def add_s(self, dn: str, modlist):
+        self._check_open()
+        time.sleep(self.server.op_latency)
+        self.server._count("add")
+        if dn.lower() in self.server.entries:
+            raise ldap.ALREADY_EXISTS({"desc": "Already exists"})
+        self.server.add_entry(dn, {name: list(values) for name, values in modlist})
+
+    def modify_s(self, dn: str, modlist):
+        self._check_open()
+        time.sleep(self.server.op_latency)
+        self.server._count("modify")
+        with self.server.lock:
+            entry = self.server.entries.get(dn.lower())
+            if entry is None:
+                raise ldap.NO_SUCH_OBJECT({"desc": "No such object"})
+            attrs = entry["attrs"]
+            for op, name, values in modlist:
+                current = attrs.setdefault(name, [])
+                if op == ldap.MOD_ADD:
+                    for value in values:
+                        if value in current:
+                            raise ldap.TYPE_OR_VALUE_EXISTS({"desc": "Attribute or value exists"})
+                        current.append(value)
+                elif op == ldap.MOD_DELETE:
+                    attrs[name] = [value for value in current if value not in (values or current)]
+                elif op == ldap.MOD_REPLACE:
+                    attrs[name] = list(values)
+            attrs["modifyTimestamp"] = [_generalized_time()]
+
+    def delete_s(self, dn: str):
+        self._check_open()
+        time.sleep(self.server.op_latency)
+        self.server._count("delete")
+        self.server.delete_entry(dn)
+
+    def unbind_s(self):
+        self.closed = True
+
+    unbind = unbind_s
+
+
+def _generalized_time() -> bytes:
+    return time.strftime("%Y%m%d%H%M%SZ", time.gmtime()).encode("ascii")
+
+
+def _in_scope(dn: str, base: str, scope: int) -> bool:
+    if scope == ldap.SCOPE_BASE:
+        return dn == base
+    if not dn.endswith(base):
+        return False
+    if scope == ldap.SCOPE_ONELEVEL:
+        return dn != base and "," not in dn[: -len(base) - 1]
+    return True
+
+
+def _matches(attrs: Dict[str, List[bytes]], filterstr: str) -> bool:
+    """Evaluate the small filter subset LDAPService emits: (&..), (|..), (a=v), (a>=v), (a=*)"""
+    filterstr = filterstr.strip()
+    if not filterstr.startswith("(") or not filterstr.endswith(")"):
+        raise ldap.FILTER_ERROR({"desc": "Bad search filter"})
+    body = filterstr[1:-1]
+
+    if body[:1] in ("&", "|"):
+        parts = _split_filters(body[1:])
+        results = (_matches(attrs, part) for part in parts)
+        return all(results) if body[0] == "&" else any(results)
+
+    name, _, value = body.partition("=")
+    if name.endswith(">"):
+        return any(v >= value.encode("utf-8") for v in attrs.get(name[:-1], []))
+    values = [v.lower() for v in attrs.get(name, [])]
+    if value == "*":
+        return name == "objectClass" or bool(values)
+    return value.lower().encode("utf-8") in values
+
+
+def _matched_values(attrs: Dict[str, List[bytes]], filterstr: str) -> Dict[str, List[bytes]]:
+    """Keep only the values a ((a=v)(a=*)...) values return filter matches, as slapd does"""
+    items = [item[1:-1].partition("=") for item in _split_filters(filterstr.strip()[1:-1])]
+    kept = {}
+    for name, values in attrs.items():
+        wanted = [value.lower().encode("utf-8") for item_name, _, value in items if item_name == name]
+        if b"*" in wanted:
+            kept[name] = values
+        else:
+            matched = [value for value in values if value.lower() in wanted]
+            if matched:
+                kept[name] = matched
+    return kept
+
+
+def _split_filters(body: str) -> List[str]:
+    parts, depth, start = [], 0, 0
+    for index, char in enumerate(body):
+        if char == "(":
+            if depth == 0:
+                start = index
+            depth += 1
+        elif char == ")":
+            depth -= 1
+            if depth == 0:
+                parts.append(body[start:index + 1])
+    return parts
@@ -0,0 +1,295 @@
+"""In-memory service fakes with injected latency for in-process benchmarks.
+
+FakeLDAPService and FakeDatabaseService implement the same abstract classes
+as AsyncLDAPService and MongoDBService, so they can be swapped in through
+FastAPI dependency overrides or passed straight to the services that take
+them. Every call sleeps for the configured latency to model one network
+round trip.
+"""
+import asyncio
+import time
+from bisect import bisect_right
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from models.schemas import UserRegistration
+from services.interfaces import AsyncLDAPServiceAbstractClass, DatabaseServiceAbstractClass
+
+
+class FakeLDAPService(AsyncLDAPServiceAbstractClass):
+    """Async LDAP service backed by dictionaries"""
+
+    def __init__(self, latency: float = 0.002):
+        self.latency = latency
+        self.passwords: Dict[str, str] = {}
+        self.uid_numbers: Dict[str, int] = {}
+        self.groups: Dict[str, List[str]] = {}
+        self.memberships: Dict[str, List[str]] = {}
+        self.calls: Dict[str, int] = {}
+
+    async def _round_trip(self, name: str):
+        self.calls[name] = self.calls.get(name, 0) + 1
+        await asyncio.sleep(self.latency)
+
+    def add_user(self, username: str, password: str, group: str, uid_number: int):
+        self.passwords[username] = password
+        self.uid_numbers[username] = uid_number
+        self.groups.setdefault(group, []).append(username)
+        self.memberships.setdefault(username, []).append(group)
+
+    async def authenticate_user(self, username: str, password: str) -> bool:
+        await self._round_trip("authenticate_user")
+        return self.passwords.get(username) == password
+
+    async def authenticate_and_get_groups(self, username: str, password: str) -> Optional[List[str]]:
+        await self._round_trip("authenticate_and_get_groups")
+        if self.passwords.get(username) != password:
+            return None
+        return self._groups_of(username)
+
+    def _groups_of(self, username: str) -> List[str]:
+        return list(self.memberships.get(username, []))
+
+    async def get_user_groups(self, username: str) -> List[str]:
+        await self._round_trip("get_user_groups")
+        return self._groups_of(username)
+
+    async def create_user(self, user_data: UserRegistration, uid_number: Optional[int] = None) -> bool:
+        await self._round_trip("create_user")
+        if uid_number is None:
+            uid_number = max(self.uid_numbers.values(), default=1000) + 1
+        self.add_user(user_data.username, user_data.password, user_data.group, uid_number)
+        return True
+
+    async def create_users(self, users: List[Tuple[UserRegistration, int]]) -> List[Optional[str]]:
+        await self._round_trip("create_users")
+        errors: List[Optional[str]] = []
+        for user_data, uid_number in users:
+            if user_data.username in self.passwords:
+                errors.append("User already exists")
+                continue
+            self.add_user(user_data.username, user_data.password, user_data.group, uid_number)
+            errors.append(None)
+        return errors
+
+    async def user_exists(self, username: str) -> bool:
+        await self._round_trip("user_exists")
+        return username in self.passwords
+
+    async def user_is_missing(self, username: str) -> bool:
+        await self._round_trip("user_is_missing")
+        return username not in self.passwords
+
+    async def get_groups_for_users(self, usernames: List[str]) -> Dict[str, List[str]]:
+        await self._round_trip("get_groups_for_users")
+        return {username: self._groups_of(username) for username in usernames}
+
+    async def get_group_memberships(self) -> Dict[str, List[str]]:
+        await self._round_trip("get_group_memberships")
+        return {username: list(groups) for username, groups in self.memberships.items()}
+
+    async def get_group_member_counts(self) -> Dict[str, int]:
+        await self._round_trip("get_group_member_counts")
+        return {group: len(members) for group, members in self.groups.items()}
+
+    async def get_highest_uid_number(self) -> Optional[int]:
+        await self._round_trip("get_highest_uid_number")
+        return max(self.uid_numbers.values(), default=None)
+
+    async def health_check(self) -> bool:
+        await self._round_trip("health_check")
+        return True
+
+    async def warm_up(self) -> bool:
+        return True
+
+
+class FakeDatabaseService(DatabaseServiceAbstractClass):
+    """Async database service backed by dictionaries"""
+
+    def __init__(self, latency: float = 0.001):
+        self.latency = latency
+        self.users: Dict[str, dict] = {}
+        self.activities: List[dict] = []
+        self.counters: Dict[str, int] = {}
+        self.expiring_counters: Dict[str, Tuple[int, float]] = {}
+        self.sessions: Dict[str, dict] = {}
+        self.calls: Dict[str, int] = {}
+        self._usernames: List[str] = []
+
+    async def _round_trip(self, name: str):
+        self.calls[name] = self.calls.get(name, 0) + 1
+        await asyncio.sleep(self.latency)
+
+    async def ensure_indexes(self) -> bool:
+        return True
+
+    async def health_check(self) -> bool:
+        await self._round_trip("health_check")
+        return True
+
+    async def create_user(self, user_data: dict) -> bool:
+        await self._round_trip("create_user")
+        if user_data["username"] in self.users:
+            return False
+        self.users[user_data["username"]] = {
+            **user_data, "created_at": datetime.utcnow(), "is_active": True, "login_count": 0
+        }
+        return True
+
+    async def create_users(self, users_data: List[dict]) -> List[Optional[str]]:
+        await self._round_trip("create_users")
+        errors: List[Optional[str]] = []
+        for user_data in users_data:
+            if user_data["username"] in self.users:
+                errors.append("duplicate key")
+                continue
+            self.users[user_data["username"]] = {
+                **user_data, "created_at": datetime.utcnow(), "is_active": True, "login_count": 0
+            }
+            errors.append(None)
+        return errors
+
+    async def get_user(self, username: str) -> Optional[dict]:
+        await self._round_trip("get_user")
+        user = self.users.get(username)
+        return dict(user) if user else None
+
+    async def update_user_login(self, username: str) -> bool:
+        await self._round_trip("update_user_login")
+        return self._touch_login(username) is not None
+
+    async def record_login(self, username: str) -> Optional[dict]:
+        await self._round_trip("record_login")
+        return self._touch_login(username)
+
+    def _touch_login(self, username: str) -> Optional[dict]:
+        user = self.users.get(username)
+        if user is None:
+            return None
+        user["last_login"] = datetime.utcnow()
+        user["login_count"] = user.get("login_count", 0) + 1
+        return dict(user)
+
+    def _sorted_users(self, after: Optional[str], limit: Optional[int] = None) -> List[dict]:
+        # Users are only ever added, so the sorted index is stale exactly when the count changed
+        if len(self._usernames) != len(self.users):
+            self._usernames = sorted(self.users)
+        start = bisect_right(self._usernames, after) if after is not None else 0
+        end = start + limit if limit is not None else None
+        return [dict(self.users[username]) for username in self._usernames[start:end]]
+
+    async def get_all_users(self) -> List[dict]:
+        await self._round_trip("get_all_users")
+        return self._sorted_users(None)
+
+    async def get_users_page(self, limit: int, after: Optional[str] = None) -> List[dict]:
+        await self._round_trip("get_users_page")
+        return self._sorted_users(after, limit)
+
+    async def iter_users(self, after: Optional[str] = None, limit: Optional[int] = None) -> AsyncIterator[dict]:
+        await self._round_trip("iter_users")
+        for user in self._sorted_users(after, limit):
+            yield user
+
+    async def get_user_activities(self, username: str) -> List[dict]:
+        await self._round_trip("get_user_activities")
+        activities = [activity for activity in self.activities if activity["user_id"] == username]
+        return sorted(activities, key=lambda activity: activity["timestamp"], reverse=True)[:10]
+
+    async def log_user_activity(self, username: str, description: str) -> bool:
+        await self._round_trip("log_user_activity")
+        self.activities.append({"user_id": username, "description": description, "timestamp": datetime.utcnow()})
+        return True
+
+    async def log_user_activities(self, activities: List[dict]) -> bool:
+        await self._round_trip("log_user_activities")
+        self.activities.extend(activities)
+        return True
+
+    async def increment_counter(self, name: str, amount: int = 1) -> int:
+        await self._round_trip("increment_counter")
+        self.counters[name] = self.counters.get(name, 0) + amount
+        return self.counters[name]
+
+    async def seed_counter(self, name: str, value: int) -> bool:
+        await self._round_trip("seed_counter")
+        self.counters[name] = max(self.counters.get(name, 0), value)
+        return True
+
+    async def create_session(self, session: dict) -> bool:
+        await self._round_trip("create_session")
+        self.sessions[session["_id"]] = dict(session)
+        return True
+
+    async def get_session(self, session_id: str) -> Optional[dict]:
+        await self._round_trip("get_session")
+        session = self.sessions.get(session_id)
+        return dict(session) if session is not None else None
+
+    async def rotate_session(self, session_id: str, token_hash: str, new_token_hash: str) -> Optional[dict]:
+        await self._round_trip("rotate_session")
+        session = self.sessions.get(session_id)
+        now = datetime.utcnow()
+        if session is None or session["token_hash"] != token_hash or session["expires_at"] <= now:
+            return None
+        session.update(token_hash=new_token_hash, last_used_at=now)
+        return dict(session)
+
+    async def delete_session(self, session_id: str) -> bool:
+        await self._round_trip("delete_session")
+        return self.sessions.pop(session_id, None) is not None
+
+    async def increment_expiring_counter(self, key: str, ttl: float) -> int:
+        await self._round_trip("increment_expiring_counter")
+        now = time.monotonic()
+        count, expires_at = self.expiring_counters.get(key, (0, 0.0))
+        if expires_at <= now:
+            count, expires_at = 0, now + ttl
+        self.expiring_counters[key] = (count + 1, expires_at)
+        return count + 1
+
+    async def get_expiring_counters(self, keys: List[str]) -> Dict[str, int]:
+        await self._round_trip("get_expiring_counters")
+        now = time.monotonic()
+        return {
+            key: self.expiring_counters[key][0] for key in keys
+            if key in self.expiring_counters and self.expiring_counters[key][1] > now
+        }
+
+    async def delete_expiring_counters(self, keys: List[str]) -> bool:
+        await self._round_trip("delete_expiring_counters")
+        for key in keys:
+            self.expiring_counters.pop(key, None)
+        return True
+
+    async def get_admin_stats(self) -> dict:
+        await self._round_trip("get_admin_stats")
+        today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+        return {
+            "total_users": len(self.users),
+            "group_a_users": 0,
+            "group_b_users": 0,
+            "active_sessions": sum(
+                1 for user in self.users.values()
+                if user.get("last_login") and user["last_login"] >= today
+            )
+        }
+
+
+def populate(ldap_service: FakeLDAPService, db_service: FakeDatabaseService, user_count: int,
+             password: str = "password123"):
+    """Create user_count users in both fakes, alternating between Group_A and Group_B"""
+    for i in range(user_count):
+        username = f"user{i + 1}"
+        group = "Group_A" if i % 2 == 0 else "Group_B"
+        ldap_service.add_user(username, password, group, 1001 + i)
+        db_service.users[username] = {
+            "username": username,
+            "email": f"{username}@example.com",
+            "first_name": "User",
+            "last_name": str(i + 1),
+            "created_at": datetime.utcnow(),
+            "is_active": True,
+            "login_count": 0,
+        }
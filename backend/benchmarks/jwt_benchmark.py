@@ -0,0 +1,54 @@
+"""Token verifications per second for each JWT backend, with and without the cache.
+
+Tokens are verified round-robin from a pool the size of --tokens, the way a
+set of logged-in browsers re-present theirs. Run from the backend directory:
+
+    python -m benchmarks.jwt_benchmark --verifications 20000 --tokens 100
+"""
+import argparse
+import time
+from datetime import timedelta
+
+from core.config import settings
+from core.jwt_backends import JWT_BACKENDS, create_jwt_backend
+from core.security import SecurityService
+from utils.cache import TTLCache
+
+
+def measure(service: SecurityService, tokens: list, verifications: int) -> float:
+    """Verifications per second"""
+    start = time.perf_counter()
+    for i in range(verifications):
+        service.verify_token(tokens[i % len(tokens)])
+    return verifications / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--verifications", type=int, default=20000)
+    parser.add_argument("--tokens", type=int, default=100)
+    args = parser.parse_args()
+
+    print(f"{'backend':<10} {'uncached/s':>12} {'cached/s':>12}")
+    for name in JWT_BACKENDS:
+        try:
+            backend = create_jwt_backend(name, settings.SECRET_KEY, settings.ALGORITHM)
+        except ImportError:
+            print(f"{name:<10} {'not installed':>12}")
+            continue
+
+        issuer = SecurityService(jwt_backend=backend)
+        tokens = [
+            issuer.create_access_token({"sub": f"user{i}", "groups": ["Group_A"]}, timedelta(minutes=30))
+            for i in range(args.tokens)
+        ]
+        uncached = SecurityService(jwt_backend=backend, token_cache=TTLCache(maxsize=0, ttl=0))
+        cached = SecurityService(jwt_backend=backend)
+        print(
+            f"{name:<10} {measure(uncached, tokens, args.verifications):>12,.0f} "
+            f"{measure(cached, tokens, args.verifications):>12,.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Compare LDAP group lookups with and without the shared connection pool.
+
+Run from the backend directory:
+
+    python -m benchmarks.ldap_pool_benchmark --operations 2000 --concurrency 16
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import ldap
+
+from benchmarks.fake_ldap import FakeLDAPServer
+from core.config import settings
+from services.ldap_pool import LDAPConnectionPool
+from services.ldap_service import LDAPService
+
+
+def unpooled_get_user_groups(server: FakeLDAPServer, username: str):
+    """The pre-pool code path: connect, admin bind, search, unbind"""
+    conn = ldap.initialize(f"ldap://{settings.LDAP_HOST}:{settings.LDAP_PORT}")
+    conn.protocol_version = ldap.VERSION3
+    conn.simple_bind_s(settings.LDAP_ADMIN_DN, settings.LDAP_ADMIN_PASSWORD)
+    search_filter = f"(&(objectClass=groupOfNames)(member=uid={username},{server.people_dn}))"
+    conn.search_s(server.groups_dn, ldap.SCOPE_SUBTREE, search_filter, ['cn'])
+    conn.unbind()
+
+
+def run(label: str, operation, operations: int, concurrency: int, server: FakeLDAPServer):
+    before = dict(server.counters)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(operation, (f"user{i % 100 + 1}" for i in range(operations))))
+    elapsed = time.perf_counter() - start
+
+    connects = server.counters["connect"] - before["connect"]
+    binds = server.counters["bind"] - before["bind"]
+    print(
+        f"{label:<10} {operations / elapsed:>10.0f} ops/s  "
+        f"{elapsed:>7.2f}s  connects={connects:<6} binds={binds}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--operations", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--pool-size", type=int, default=settings.LDAP_POOL_SIZE)
+    parser.add_argument("--connect-latency", type=float, default=0.002)
+    parser.add_argument("--bind-latency", type=float, default=0.001)
+    parser.add_argument("--op-latency", type=float, default=0.001)
+    args = parser.parse_args()
+
+    server = FakeLDAPServer(args.connect_latency, args.bind_latency, args.op_latency)
+    server.populate(100)
+
+    with mock.patch("ldap.initialize", server.initialize):
+        run("unpooled", lambda username: unpooled_get_user_groups(server, username),
+            args.operations, args.concurrency, server)
+
+        pool = LDAPConnectionPool(
+            uri=f"ldap://{settings.LDAP_HOST}:{settings.LDAP_PORT}",
+            bind_dn=settings.LDAP_ADMIN_DN,
+            bind_password=settings.LDAP_ADMIN_PASSWORD,
+            size=args.pool_size,
+        )
+        service = LDAPService(pool=pool)
+        run("pooled", service.get_user_groups, args.operations, args.concurrency, server)
+        pool.close()
+
+
+if __name__ == "__main__":
+    main()
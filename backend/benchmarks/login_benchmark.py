@@ -0,0 +1,90 @@
+"""Per-stage login latency: the sequential pipeline vs AuthService.authenticate_user.
+
+Run from the backend directory:
+
+    python -m benchmarks.login_benchmark --logins 500 --ldap-latency 0.003 --db-latency 0.001
+"""
+import argparse
+import asyncio
+import statistics
+from datetime import timedelta
+from typing import Dict, List
+
+from benchmarks.fakes import FakeDatabaseService, FakeLDAPService, populate
+from core.config import settings
+from core.security import security_service
+from services.activity_log import ActivityLogWriter
+from services.auth_service import AuthService
+from services.uid_allocator import UIDAllocator
+from utils.timing import StageTimer
+
+
+async def sequential_login(ldap_service: FakeLDAPService, db_service: FakeDatabaseService,
+                           username: str, password: str) -> Dict[str, float]:
+    """The original pipeline: every lookup awaited in turn, groups fetched twice"""
+    timer = StageTimer()
+    with timer.stage("ldap_bind"):
+        await ldap_service.authenticate_user(username, password)
+    with timer.stage("groups"):
+        groups = await ldap_service.get_user_groups(username)
+    with timer.stage("login_update"):
+        await db_service.update_user_login(username)
+    with timer.stage("activity_log"):
+        await db_service.log_user_activity(username, "User logged in")
+    with timer.stage("current_user"):
+        await ldap_service.get_user_groups(username)
+        await db_service.get_user(username)
+    with timer.stage("token"):
+        security_service.create_access_token(
+            data={"sub": username, "groups": groups},
+            expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+        )
+    return {**timer.stages, "total": timer.total()}
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def report(label: str, timings: List[Dict[str, float]]):
+    print(f"\n{label}")
+    print(f"  {'stage':<26} {'p50 ms':>8} {'p99 ms':>8}")
+    for stage in timings[0]:
+        samples = [timing[stage] for timing in timings]
+        print(f"  {stage:<26} {statistics.median(samples) * 1000:>8.2f} {percentile(samples, 99) * 1000:>8.2f}")
+
+
+async def main_async(args):
+    ldap_service = FakeLDAPService(latency=args.ldap_latency)
+    db_service = FakeDatabaseService(latency=args.db_latency)
+    populate(ldap_service, db_service, 100)
+
+    sequential = [
+        await sequential_login(ldap_service, db_service, f"user{i % 100 + 1}", "password123")
+        for i in range(args.logins)
+    ]
+    report("sequential pipeline", sequential)
+
+    pipelined: List[Dict[str, float]] = []
+    activity_log = ActivityLogWriter(db_service)
+    auth_service = AuthService(
+        ldap_service, db_service, activity_log, UIDAllocator(ldap_service, db_service),
+        on_login_timings=pipelined.append
+    )
+    for i in range(args.logins):
+        await auth_service.authenticate_user(f"user{i % 100 + 1}", "password123")
+    await activity_log.stop()
+    report("AuthService.authenticate_user", pipelined)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=500)
+    parser.add_argument("--ldap-latency", type=float, default=0.003)
+    parser.add_argument("--db-latency", type=float, default=0.001)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
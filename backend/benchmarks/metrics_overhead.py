@@ -0,0 +1,102 @@
+"""Per-call cost of the metrics instrumentation.
+
+Times each recording primitive, an instrumented service method against the
+bare method, and a request through MetricsMiddleware against the bare ASGI
+app. Run from the backend directory:
+
+    python -m benchmarks.metrics_overhead --iterations 200000
+"""
+import argparse
+import asyncio
+import time
+
+from api.metrics import MetricsMiddleware
+from utils.metrics import Counter, Histogram, MetricsRegistry, instrument
+
+
+class NoopService:
+    def sync_call(self, value):
+        return value
+
+    async def async_call(self, value):
+        return value
+
+
+async def noop_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+def time_sync(func, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func(1)
+    return (time.perf_counter() - start) / iterations
+
+
+async def time_async(func, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await func(1)
+    return (time.perf_counter() - start) / iterations
+
+
+async def time_asgi(app, iterations: int) -> float:
+    scope = {"type": "http", "method": "GET", "path": "/"}
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        pass
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await app(dict(scope), receive, send)
+    return (time.perf_counter() - start) / iterations
+
+
+def report(label: str, seconds: float, baseline: float = 0.0):
+    overhead = f"  (+{(seconds - baseline) * 1e9:,.0f} ns)" if baseline else ""
+    print(f"  {label:<36} {seconds * 1e9:>8,.0f} ns{overhead}")
+
+
+async def main_async(iterations: int):
+    registry = MetricsRegistry()
+    histogram = registry.register(Histogram("bench_seconds", "benchmark", ("operation",)))
+    counter = registry.register(Counter("bench_total", "benchmark", ("operation",)))
+    child = histogram.labels("op")
+
+    print("recording primitives")
+    report("histogram child observe", time_sync(lambda _: child.observe(0.003), iterations))
+    report("histogram labels() + observe", time_sync(lambda _: histogram.labels("op").observe(0.003), iterations))
+    report("counter labels() + inc", time_sync(lambda _: counter.labels("op").inc(), iterations))
+
+    bare = NoopService()
+    wrapped = instrument(NoopService(), "bench")
+    print("service methods")
+    sync_bare = time_sync(bare.sync_call, iterations)
+    report("sync method", sync_bare)
+    report("sync method, instrumented", time_sync(wrapped.sync_call, iterations), sync_bare)
+    async_bare = await time_async(bare.async_call, iterations)
+    report("async method", async_bare)
+    report("async method, instrumented", await time_async(wrapped.async_call, iterations), async_bare)
+
+    print("ASGI requests")
+    app_bare = await time_asgi(noop_app, iterations // 10)
+    report("bare app", app_bare)
+    report("with MetricsMiddleware", await time_asgi(MetricsMiddleware(noop_app), iterations // 10), app_bare)
+
+    start = time.perf_counter()
+    registry.render()
+    print(f"  {'render registry':<36} {(time.perf_counter() - start) * 1e6:>8,.0f} us")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=200000)
+    asyncio.run(main_async(parser.parse_args().iterations))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Compare whole-directory scans with and without the Simple Paged Results control.
+
+Runs the scans LDAPService performs - the highest uidNumber and every
+group's members - against the stand-in directory, once with a single
+unpaged search_s and once per page size through the paged code path.
+Reports time and peak Python memory per scan, then repeats against a
+server with a sizelimit to show that only the paged scans still complete.
+Run from the backend directory:
+
+    python -m benchmarks.paged_search_benchmark --users 20000 --page-sizes 100 500 2000
+"""
+import argparse
+import time
+import tracemalloc
+from typing import Callable, Optional
+from unittest import mock
+
+import ldap
+
+from benchmarks.fake_ldap import FakeLDAPServer
+from core.config import settings
+from services.ldap_pool import LDAPConnectionPool
+from services.ldap_service import LDAPService
+
+
+def unpaged_highest_uid_number(service: LDAPService) -> Optional[int]:
+    """The pre-paging scan: one search_s returning every posixAccount"""
+    result = service.pool.run(lambda conn: conn.search_s(
+        f"{service.users_ou},{service.base_dn}", ldap.SCOPE_SUBTREE, "(objectClass=posixAccount)", ['uidNumber']
+    ))
+    uid_numbers = [int(attrs['uidNumber'][0]) for dn, attrs in result if 'uidNumber' in attrs]
+    return max(uid_numbers) if uid_numbers else None
+
+
+def measure(label: str, scan: Callable[[], object]):
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        scan()
+        outcome = "ok"
+    except Exception as e:
+        outcome = type(e).__name__
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<32} {elapsed * 1000:>9.1f} ms {peak / 1024:>10.0f} KiB   {outcome}")
+
+
+def run(server: FakeLDAPServer, page_sizes):
+    pool = LDAPConnectionPool(
+        uri=f"ldap://{settings.LDAP_HOST}:{settings.LDAP_PORT}",
+        bind_dn=settings.LDAP_ADMIN_DN,
+        bind_password=settings.LDAP_ADMIN_PASSWORD,
+    )
+    service = LDAPService(pool=pool)
+    pool.warm(1)
+    try:
+        measure("highest uid, unpaged", lambda: unpaged_highest_uid_number(service))
+        for page_size in page_sizes:
+            service.page_size = page_size
+            measure(f"highest uid, pages of {page_size}", service.get_highest_uid_number)
+        for page_size in page_sizes:
+            service.page_size = page_size
+            measure(f"group memberships, pages of {page_size}", service.get_group_memberships)
+    finally:
+        pool.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--page-sizes", type=int, nargs="+", default=[100, settings.LDAP_PAGE_SIZE, 2000])
+    parser.add_argument("--size-limit", type=int, default=500, help="sizelimit for the second run")
+    parser.add_argument("--op-latency", type=float, default=0.0005)
+    args = parser.parse_args()
+
+    for size_limit in (None, args.size_limit):
+        server = FakeLDAPServer(0, 0, args.op_latency, size_limit=size_limit)
+        server.populate(args.users)
+        print(f"\n{args.users} users, sizelimit {size_limit or 'unlimited'}")
+        print(f"{'scan':<32} {'time':>12} {'peak memory':>14}")
+        with mock.patch("ldap.initialize", server.initialize):
+            run(server, [size for size in args.page_sizes if size_limit is None or size <= size_limit])
+
+
+if __name__ == "__main__":
+    main()
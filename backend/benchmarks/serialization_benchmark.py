@@ -0,0 +1,126 @@
+"""Cost of turning a page of handler-built UserInfo models into a JSON response body.
+
+Compares FastAPI's response_model path - validate the returned models,
+dump them to primitives, encode with json or orjson - with the
+FAST_RESPONSES path, where api.responses.ModelResponse has pydantic-core
+write the bytes directly. Every path must produce the same JSON. Then
+repeats end to end through GET /admin/users against the service fakes with
+FAST_RESPONSES off and on. Run from the backend directory:
+
+    python -m benchmarks.serialization_benchmark --users 10000
+"""
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import time
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, List
+
+import httpx
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from api.responses import ModelResponse
+from benchmarks.app_benchmark import BenchmarkApp
+from core.config import settings
+from models.schemas import UserInfo
+
+
+def build_users(count: int) -> List[UserInfo]:
+    now = datetime(2024, 1, 1, 12, 0, 0, 123000)
+    return [
+        UserInfo(
+            username=f"user{i}",
+            email=f"user{i}@example.com",
+            first_name="First",
+            last_name=f"Last{i}",
+            groups=["Group_A"] if i % 2 else ["Group_B"],
+            created_at=now - timedelta(days=i % 365),
+            last_login=now if i % 3 else None,
+        )
+        for i in range(count)
+    ]
+
+
+async def fastapi_body(users: List[UserInfo], response_class) -> bytes:
+    """What FastAPI does with a handler's return value when the route has a response_model"""
+    field = create_response_field(name="Response_users", type_=List[UserInfo], mode="serialization")
+    content = await serialize_response(field=field, response_content=users)
+    return response_class(content).body
+
+
+async def model_response_body(users: List[UserInfo]) -> bytes:
+    return ModelResponse(users, List[UserInfo]).body
+
+
+async def time_path(render: Callable[[], Awaitable[bytes]], rounds: int) -> float:
+    await render()
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        await render()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+async def microbenchmark(args):
+    users = build_users(args.users)
+    paths = {
+        "response_model + JSONResponse": lambda: fastapi_body(users, JSONResponse),
+        "response_model + ORJSONResponse": lambda: fastapi_body(users, ORJSONResponse),
+        "ModelResponse (FAST_RESPONSES)": lambda: model_response_body(users),
+    }
+    expected = json.loads(await paths["response_model + JSONResponse"]())
+    print(f"{args.users} UserInfo models, median of {args.rounds} rounds")
+    print(f"{'path':<34} {'ms':>9} {'speedup':>8} {'bytes':>10}")
+    baseline = None
+    for label, render in paths.items():
+        body = await render()
+        if json.loads(body) != expected:
+            raise SystemExit(f"{label} produced different JSON")
+        elapsed = await time_path(render, args.rounds)
+        baseline = baseline or elapsed
+        print(f"{label:<34} {elapsed * 1000:>9.2f} {baseline / elapsed:>7.2f}x {len(body):>10}")
+
+
+async def end_to_end(args):
+    page_size = min(args.users, settings.ADMIN_USERS_MAX_PAGE_SIZE)
+    print(f"\nGET /admin/users?limit={page_size} with {args.users} users, median of {args.rounds} requests")
+    baseline = None
+    for fast in (False, True):
+        # The default response class is chosen when the app is built, so build one per mode
+        settings.FAST_RESPONSES = fast
+        bench = BenchmarkApp(args.users, 0, 0)
+        transport = httpx.ASGITransport(app=bench.app)
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                async def request() -> bytes:
+                    response = await client.get(
+                        "/admin/users", params={"limit": page_size}, headers=bench.admin_headers()
+                    )
+                    response.raise_for_status()
+                    return response.content
+
+                elapsed = await time_path(request, args.rounds)
+        finally:
+            await bench.close()
+        baseline = baseline or elapsed
+        print(f"FAST_RESPONSES={str(fast).lower():<6} {elapsed * 1000:>9.2f} ms {baseline / elapsed:>7.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    asyncio.run(microbenchmark(args))
+    asyncio.run(end_to_end(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+"""The app wired to the service fakes, for benchmarks that run real server processes.
+
+Each uvicorn worker imports this module and builds its own fakes, so run it
+with the lifespan off - the lifespan would reach for the real LDAP and
+MongoDB services. BENCH_USERS, BENCH_LDAP_LATENCY and BENCH_DB_LATENCY size
+the fakes.
+"""
+import os
+
+from benchmarks.app_benchmark import BenchmarkApp
+
+
+bench = BenchmarkApp(
+    int(os.getenv("BENCH_USERS", "1000")),
+    float(os.getenv("BENCH_LDAP_LATENCY", "0")),
+    float(os.getenv("BENCH_DB_LATENCY", "0")),
+)
+app = bench.app
@@ -0,0 +1,164 @@
+"""Throughput of the production server as the worker count grows.
+
+Starts `server.run` in a subprocess for each worker count, serving
+benchmarks.server_app (the app wired to the service fakes), and drives it
+over real TCP from several client processes with keep-alive connections.
+The client is a minimal HTTP/1.1 loop over asyncio streams so it costs as
+little CPU as possible. Run from the backend directory:
+
+    python -m benchmarks.server_scaling_benchmark --workers 1 2 4 8 --duration 10
+
+Scaling is bounded by the cores left over for the server once the client
+processes have theirs; on a machine with fewer cores than workers plus
+clients the numbers stay flat.
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import time
+from datetime import timedelta
+from typing import List, Tuple
+
+from benchmarks.login_benchmark import percentile
+from core.config import settings
+from core.security import security_service
+
+
+HOST = "127.0.0.1"
+
+
+def _request(path: str, token: str) -> bytes:
+    return (
+        f"GET {path} HTTP/1.1\r\nHost: {HOST}\r\nAuthorization: Bearer {token}\r\n\r\n"
+    ).encode("ascii")
+
+
+async def _connection(port: int, request: bytes, deadline: float, latencies: List[float]) -> int:
+    """Send request back to back on one keep-alive connection until deadline; return the errors"""
+    reader, writer = await asyncio.open_connection(HOST, port)
+    errors = 0
+    try:
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            writer.write(request)
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = 0
+            for line in head.split(b"\r\n")[1:]:
+                name, _, value = line.partition(b":")
+                if name.lower() == b"content-length":
+                    length = int(value)
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+            if head[9:12] != b"200":
+                errors += 1
+    finally:
+        writer.close()
+    return errors
+
+
+def _client_process(port: int, request: bytes, connections: int, duration: float) -> Tuple[int, int, List[float]]:
+    async def drive():
+        latencies: List[float] = []
+        deadline = time.perf_counter() + duration
+        errors = await asyncio.gather(*(
+            _connection(port, request, deadline, latencies) for _ in range(connections)
+        ))
+        return len(latencies), sum(errors), latencies[::10]
+
+    return asyncio.run(drive())
+
+
+def _wait_until_listening(port: int, server: subprocess.Popen, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"server exited with {server.returncode}")
+        try:
+            with socket.create_connection((HOST, port), timeout=1) as sock:
+                sock.sendall(b"GET /livez HTTP/1.1\r\nHost: 127.0.0.1\r\nConnection: close\r\n\r\n")
+                if sock.recv(12).endswith(b"200"):
+                    return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("server did not start in time")
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind((HOST, 0))
+        return sock.getsockname()[1]
+
+
+def run_workers(workers: int, args, request: bytes) -> dict:
+    port = _free_port()
+    env = {
+        **os.environ,
+        "SERVER_HOST": HOST,
+        "SERVER_PORT": str(port),
+        "WEB_CONCURRENCY": str(workers),
+        "SERVER_ACCESS_LOG": "false",
+        "SERVER_RELOAD": "false",
+        "LOG_LEVEL": "WARNING",
+        "BENCH_USERS": str(args.users),
+    }
+    # The fakes live in each worker, so the lifespan (which reaches for real services) stays off
+    command = "from server import run; run('benchmarks.server_app:app', lifespan='off', log_level='warning')"
+    server = subprocess.Popen([sys.executable, "-c", command], env=env)
+    try:
+        _wait_until_listening(port, server)
+        with multiprocessing.Pool(args.clients) as pool:
+            # A short warmup so every worker has imported and served before timing starts
+            pool.starmap(_client_process, [(port, request, args.connections, 1.0)] * args.clients)
+            results = pool.starmap(
+                _client_process, [(port, request, args.connections, args.duration)] * args.clients
+            )
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+    requests = sum(count for count, _, _ in results)
+    latencies = [latency for _, _, sample in results for latency in sample]
+    return {
+        "throughput": requests / args.duration,
+        "errors": sum(errors for _, errors, _ in results),
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+
+def main():
+    cores = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=sorted({1, 2, 4, cores}))
+    parser.add_argument("--path", default="/auth/me", help="endpoint every request hits")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--clients", type=int, default=max(1, cores // 2), help="client processes")
+    parser.add_argument("--connections", type=int, default=32, help="keep-alive connections per client process")
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+
+    token = security_service.create_access_token(
+        data={"sub": "user1", "groups": ["Group_A"]},
+        expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
+    )
+    request = _request(args.path, token)
+
+    print(f"{cores} cores, {args.clients} client processes x {args.connections} connections, GET {args.path}")
+    print(f"{'workers':>7} {'req/s':>10} {'speedup':>8} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    baseline = None
+    for workers in args.workers:
+        result = run_workers(workers, args, request)
+        baseline = baseline or result["throughput"]
+        print(
+            f"{workers:>7} {result['throughput']:>10.0f} {result['throughput'] / baseline:>7.2f}x "
+            f"{result['p50_ms']:>8.2f} {result['p99_ms']:>8.2f} {result['errors']:>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,20 @@ class Settings:
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-super-secret-key-change-in-production")
     ALGORITHM: str = os.getenv("ALGORITHM", "HS256")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+    # Refresh tokens are backed by the sessions collection; its TTL index is kept in line with this
+    REFRESH_TOKEN_EXPIRE_HOURS: float = float(os.getenv("REFRESH_TOKEN_EXPIRE_HOURS", "24"))
+    # "jose" (default), "hmac" (standard library, HS* only) or "pyjwt" (needs the pyjwt package)
+    JWT_BACKEND: str = os.getenv("JWT_BACKEND", "jose")
+    # Verified tokens are remembered by digest until they expire or this many seconds pass
+    TOKEN_CACHE_SIZE: int = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+    TOKEN_CACHE_TTL: float = float(os.getenv("TOKEN_CACHE_TTL", "300"))
+    
+    # Token claim authorization - trust the signed "groups" claim while the
+    # token is younger than TOKEN_CLAIMS_MAX_AGE_SECONDS instead of asking LDAP
+    TRUST_TOKEN_CLAIMS: bool = os.getenv("TRUST_TOKEN_CLAIMS", "false").lower() == "true"
+    TOKEN_CLAIMS_MAX_AGE_SECONDS: int = int(os.getenv("TOKEN_CLAIMS_MAX_AGE_SECONDS", "300"))
+    # Users whose claims were revoked within the last TOKEN_CLAIMS_MAX_AGE_SECONDS
+    TOKEN_REVOCATION_CACHE_SIZE: int = int(os.getenv("TOKEN_REVOCATION_CACHE_SIZE", "100000"))
     
     # LDAP Configuration
     LDAP_HOST: str = os.getenv("LDAP_HOST", "openldap")
@@ -18,7 +32,38 @@ class Settings:
     LDAP_ADMIN_PASSWORD: str = os.getenv("LDAP_ADMIN_PASSWORD", "admin123")
     LDAP_USERS_OU: str = "ou=people"
     LDAP_GROUPS_OU: str = "ou=groups"
-    
+
+    # LDAP Connection Pool Configuration
+    LDAP_POOL_SIZE: int = int(os.getenv("LDAP_POOL_SIZE", "10"))
+    LDAP_POOL_WARM_SIZE: int = int(os.getenv("LDAP_POOL_WARM_SIZE", "2"))
+    LDAP_POOL_ACQUIRE_TIMEOUT: float = float(os.getenv("LDAP_POOL_ACQUIRE_TIMEOUT", "5"))
+    LDAP_POOL_MAX_IDLE_SECONDS: float = float(os.getenv("LDAP_POOL_MAX_IDLE_SECONDS", "300"))
+    LDAP_POOL_HEALTH_CHECK_INTERVAL: float = float(os.getenv("LDAP_POOL_HEALTH_CHECK_INTERVAL", "30"))
+    LDAP_NETWORK_TIMEOUT: float = float(os.getenv("LDAP_NETWORK_TIMEOUT", "5"))
+    LDAP_USER_BIND_POOL_SIZE: int = int(os.getenv("LDAP_USER_BIND_POOL_SIZE", str(LDAP_POOL_SIZE)))
+    # Read groups from the memberOf overlay during login; falls back to a group search when absent
+    LDAP_USE_MEMBEROF: bool = os.getenv("LDAP_USE_MEMBEROF", "true").lower() == "true"
+    LDAP_EXECUTOR_WORKERS: int = int(os.getenv("LDAP_EXECUTOR_WORKERS", str(LDAP_POOL_SIZE)))
+
+    # LDAP Group Membership Cache (TTL of 0 disables caching)
+    LDAP_GROUP_CACHE_TTL: float = float(os.getenv("LDAP_GROUP_CACHE_TTL", "60"))
+    LDAP_GROUP_CACHE_SIZE: int = int(os.getenv("LDAP_GROUP_CACHE_SIZE", "10000"))
+    # Entries per page for directory scans that use the Simple Paged Results control;
+    # keep it at or below the server's sizelimit (500 by default in slapd)
+    LDAP_PAGE_SIZE: int = int(os.getenv("LDAP_PAGE_SIZE", "500"))
+    # Users per (|(member=...)) group search when reading the groups of a page of users
+    LDAP_MEMBER_FILTER_BATCH_SIZE: int = int(os.getenv("LDAP_MEMBER_FILTER_BATCH_SIZE", "200"))
+
+    # In-process mirror of the people and groups OUs, kept current by modifyTimestamp polling
+    LDAP_MIRROR_ENABLED: bool = os.getenv("LDAP_MIRROR_ENABLED", "false").lower() == "true"
+    LDAP_MIRROR_POLL_INTERVAL: float = float(os.getenv("LDAP_MIRROR_POLL_INTERVAL", "5"))
+    # Past this age lookups go back to LDAP until a sync succeeds
+    LDAP_MIRROR_MAX_STALENESS: float = float(os.getenv("LDAP_MIRROR_MAX_STALENESS", "30"))
+    # Deletions carry no modifyTimestamp, so they are only seen by a full resync; existence
+    # checks use the mirror only while the last one is within LDAP_MIRROR_MAX_STALENESS, so keep
+    # this plus two poll intervals below it
+    LDAP_MIRROR_FULL_SYNC_INTERVAL: float = float(os.getenv("LDAP_MIRROR_FULL_SYNC_INTERVAL", "20"))
+
     # MongoDB Configuration
     MONGODB_URL: str = os.getenv(
         "MONGODB_URL", 
@@ -26,6 +71,48 @@ class Settings:
     )
     MONGODB_DATABASE: str = os.getenv("MONGO_INITDB_DATABASE", "auth_db")
     
+    # Admin user listing - default/maximum page size and Motor batch size when streaming
+    ADMIN_USERS_PAGE_SIZE: int = int(os.getenv("ADMIN_USERS_PAGE_SIZE", "500"))
+    ADMIN_USERS_MAX_PAGE_SIZE: int = int(os.getenv("ADMIN_USERS_MAX_PAGE_SIZE", "5000"))
+    ADMIN_USERS_STREAM_BATCH_SIZE: int = int(os.getenv("ADMIN_USERS_STREAM_BATCH_SIZE", "500"))
+    
+    # Admin statistics - cached summary refreshed in the background
+    ADMIN_STATS_CACHE_TTL: float = float(os.getenv("ADMIN_STATS_CACHE_TTL", "15"))
+    ADMIN_STATS_REFRESH_INTERVAL: float = float(os.getenv("ADMIN_STATS_REFRESH_INTERVAL", "10"))
+    
+    # Login Limiter Configuration
+    LOGIN_RATE_LIMIT_ENABLED: bool = os.getenv("LOGIN_RATE_LIMIT_ENABLED", "true").lower() == "true"
+    # Failed attempts allowed per sliding window before logins are refused without asking LDAP
+    LOGIN_RATE_LIMIT_WINDOW: float = float(os.getenv("LOGIN_RATE_LIMIT_WINDOW", "300"))
+    LOGIN_MAX_FAILURES_PER_USERNAME: int = int(os.getenv("LOGIN_MAX_FAILURES_PER_USERNAME", "5"))
+    LOGIN_MAX_FAILURES_PER_IP: int = int(os.getenv("LOGIN_MAX_FAILURES_PER_IP", "50"))
+    # How long a username LDAP does not know is refused without a bind; 0 disables
+    LOGIN_MISSING_USER_TTL: float = float(os.getenv("LOGIN_MISSING_USER_TTL", "30"))
+    # "memory" keeps counts per worker; "mongodb" shares them across workers
+    LOGIN_RATE_LIMIT_BACKEND: str = os.getenv("LOGIN_RATE_LIMIT_BACKEND", "memory")
+    LOGIN_RATE_LIMIT_CACHE_SIZE: int = int(os.getenv("LOGIN_RATE_LIMIT_CACHE_SIZE", "100000"))
+    # Only enable behind a proxy that sets X-Forwarded-For; clients can forge it otherwise
+    TRUST_FORWARDED_FOR: bool = os.getenv("TRUST_FORWARDED_FOR", "false").lower() == "true"
+    
+    # Health Monitor Configuration
+    HEALTH_CHECK_INTERVAL: float = float(os.getenv("HEALTH_CHECK_INTERVAL", "10"))
+    HEALTH_CHECK_TIMEOUT: float = float(os.getenv("HEALTH_CHECK_TIMEOUT", "2"))
+    # Readiness fails once the cached result is older than this
+    HEALTH_STALE_AFTER: float = float(os.getenv("HEALTH_STALE_AFTER", "30"))
+    
+    # Bulk user import - rows are validated and written this many at a time
+    USER_IMPORT_BATCH_SIZE: int = int(os.getenv("USER_IMPORT_BATCH_SIZE", "500"))
+    # Uploads larger than this are spooled to a temporary file instead of memory
+    USER_IMPORT_SPOOL_MAX_BYTES: int = int(os.getenv("USER_IMPORT_SPOOL_MAX_BYTES", str(8 * 1024 * 1024)))
+    
+    # Activity log - events are buffered in memory and written with insert_many
+    ACTIVITY_LOG_BATCH_SIZE: int = int(os.getenv("ACTIVITY_LOG_BATCH_SIZE", "100"))
+    ACTIVITY_LOG_FLUSH_INTERVAL: float = float(os.getenv("ACTIVITY_LOG_FLUSH_INTERVAL", "1"))
+    ACTIVITY_LOG_QUEUE_SIZE: int = int(os.getenv("ACTIVITY_LOG_QUEUE_SIZE", "10000"))
+    ACTIVITY_LOG_ENQUEUE_TIMEOUT: float = float(os.getenv("ACTIVITY_LOG_ENQUEUE_TIMEOUT", "0.5"))
+    # Activity events older than this are expired by a TTL index (0 keeps them forever)
+    ACTIVITY_LOG_RETENTION_DAYS: int = int(os.getenv("ACTIVITY_LOG_RETENTION_DAYS", "90"))
+    
     # CORS Configuration
     CORS_ORIGINS: List[str] = [
         "http://localhost:3000",
@@ -38,11 +125,39 @@ class Settings:
     PROJECT_NAME: str = "OpenLDAP Authentication API"
     VERSION: str = "1.0.0"
     DEBUG: bool = os.getenv("DEBUG", "false").lower() == "true"
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO").upper()
+    
+    # Server Configuration (python -m server)
+    SERVER_HOST: str = os.getenv("SERVER_HOST", "0.0.0.0")
+    SERVER_PORT: int = int(os.getenv("SERVER_PORT", "8000"))
+    # Worker processes - each runs the startup warmup and holds its own LDAP and MongoDB pools,
+    # login limiter counts (with the memory backend), revoked claims, stats refresher and
+    # directory mirror. Set it explicitly; os.cpu_count() reports the host's CPUs in a container
+    WEB_CONCURRENCY: int = int(os.getenv("WEB_CONCURRENCY", "1"))
+    SERVER_LOOP: str = os.getenv("SERVER_LOOP", "uvloop")
+    SERVER_HTTP: str = os.getenv("SERVER_HTTP", "httptools")
+    # Keep above the idle timeout of any load balancer in front, so it never reuses a closed connection
+    SERVER_KEEPALIVE_TIMEOUT: int = int(os.getenv("SERVER_KEEPALIVE_TIMEOUT", "75"))
+    SERVER_BACKLOG: int = int(os.getenv("SERVER_BACKLOG", "2048"))
+    SERVER_ACCESS_LOG: bool = os.getenv("SERVER_ACCESS_LOG", "true").lower() == "true"
+    # Development only - watches the source tree and forces a single worker
+    SERVER_RELOAD: bool = os.getenv("SERVER_RELOAD", "false").lower() == "true"
+    
+    # Serialise handler-built response models with pydantic-core instead of revalidating them,
+    # and encode the other routes with orjson (optional dependency) when it is installed
+    FAST_RESPONSES: bool = os.getenv("FAST_RESPONSES", "false").lower() == "true"
+    
+    # Metrics Configuration
+    # /metrics exposes route names, latencies and backend error counts. Without METRICS_TOKEN
+    # it is unauthenticated, so either set a token for the scraper or keep the port off public networks
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    METRICS_TOKEN: str = os.getenv("METRICS_TOKEN", "")
     
     # Security Configuration
     CORS_ALLOW_CREDENTIALS: bool = True
     CORS_ALLOW_METHODS: List[str] = ["*"]
     CORS_ALLOW_HEADERS: List[str] = ["*"]
+    CORS_EXPOSE_HEADERS: List[str] = ["X-Next-Cursor"]
     
     class Config:
         case_sensitive = True
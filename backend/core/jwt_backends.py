@@ -0,0 +1,153 @@
+import base64
+import calendar
+import hashlib
+import hmac
+import json
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime
+
+
+class InvalidTokenError(Exception):
+    """Raised by every backend when a token cannot be trusted"""
+
+
+class JWTBackend(ABC):
+    """Signs and verifies JWTs for SecurityService"""
+
+    def __init__(self, secret_key: str, algorithm: str):
+        self.secret_key = secret_key
+        self.algorithm = algorithm
+
+    @abstractmethod
+    def encode(self, claims: dict) -> str:
+        """Sign claims into a compact JWT"""
+        pass
+
+    @abstractmethod
+    def decode(self, token: str) -> dict:
+        """Verify the signature and registered time claims and return the payload"""
+        pass
+
+
+class JoseBackend(JWTBackend):
+    """python-jose - supports every algorithm jose does"""
+
+    def encode(self, claims: dict) -> str:
+        from jose import jwt
+
+        return jwt.encode(claims, self.secret_key, algorithm=self.algorithm)
+
+    def decode(self, token: str) -> dict:
+        from jose import JWTError, jwt
+
+        try:
+            return jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
+        except JWTError as e:
+            raise InvalidTokenError(str(e))
+
+
+class PyJWTBackend(JWTBackend):
+    """PyJWT - needs the optional pyjwt package"""
+
+    def __init__(self, secret_key: str, algorithm: str):
+        import jwt
+
+        super().__init__(secret_key, algorithm)
+        self._jwt = jwt
+
+    def encode(self, claims: dict) -> str:
+        return self._jwt.encode(claims, self.secret_key, algorithm=self.algorithm)
+
+    def decode(self, token: str) -> dict:
+        try:
+            return self._jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
+        except self._jwt.PyJWTError as e:
+            raise InvalidTokenError(str(e))
+
+
+def _b64encode(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+def _b64decode(data: bytes) -> bytes:
+    return base64.urlsafe_b64decode(data + b"=" * (-len(data) % 4))
+
+
+def _timestamp(value) -> int:
+    if isinstance(value, datetime):
+        return calendar.timegm(value.utctimetuple())
+    return value
+
+
+class HMACBackend(JWTBackend):
+    """Standard-library HS256/HS384/HS512 - no third-party code on the verification path"""
+
+    DIGESTS = {"HS256": hashlib.sha256, "HS384": hashlib.sha384, "HS512": hashlib.sha512}
+
+    def __init__(self, secret_key: str, algorithm: str):
+        if algorithm not in self.DIGESTS:
+            raise ValueError(f"HMACBackend does not support {algorithm}")
+        super().__init__(secret_key, algorithm)
+        self._key = secret_key.encode("utf-8")
+        self._digest = self.DIGESTS[algorithm]
+        self._header = _b64encode(json.dumps(
+            {"alg": algorithm, "typ": "JWT"}, separators=(",", ":")
+        ).encode("utf-8"))
+
+    def _sign(self, signing_input: bytes) -> bytes:
+        return _b64encode(hmac.new(self._key, signing_input, self._digest).digest())
+
+    def encode(self, claims: dict) -> str:
+        claims = {
+            name: _timestamp(value) if name in ("exp", "iat", "nbf") else value
+            for name, value in claims.items()
+        }
+        payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode("utf-8"))
+        signing_input = self._header + b"." + payload
+        return (signing_input + b"." + self._sign(signing_input)).decode("ascii")
+
+    def decode(self, token: str) -> dict:
+        try:
+            signing_input, _, signature = token.encode("ascii").rpartition(b".")
+            header_segment, _, payload_segment = signing_input.partition(b".")
+            if not header_segment or not payload_segment or b"." in payload_segment:
+                raise InvalidTokenError("Not enough segments")
+            if not hmac.compare_digest(signature, self._sign(signing_input)):
+                raise InvalidTokenError("Signature verification failed")
+            header = json.loads(_b64decode(header_segment))
+            payload = json.loads(_b64decode(payload_segment))
+        except InvalidTokenError:
+            raise
+        except (ValueError, UnicodeError) as e:
+            raise InvalidTokenError(f"Malformed token: {e}")
+
+        if not isinstance(header, dict) or header.get("alg") != self.algorithm:
+            raise InvalidTokenError("The specified alg value is not allowed")
+        if not isinstance(payload, dict):
+            raise InvalidTokenError("Invalid payload")
+        self._validate_claims(payload, time.time())
+        return payload
+
+    @staticmethod
+    def _validate_claims(payload: dict, now: float):
+        for name in ("exp", "iat", "nbf"):
+            if name in payload and (not isinstance(payload[name], (int, float)) or isinstance(payload[name], bool)):
+                raise InvalidTokenError(f"{name} claim must be a number")
+        if "exp" in payload and payload["exp"] <= now:
+            raise InvalidTokenError("Signature has expired")
+        if "nbf" in payload and payload["nbf"] > now:
+            raise InvalidTokenError("The token is not yet valid (nbf)")
+        # No audience is configured, so tokens scoped to one must be refused
+        if "aud" in payload:
+            raise InvalidTokenError("Invalid audience")
+
+
+JWT_BACKENDS = {"jose": JoseBackend, "pyjwt": PyJWTBackend, "hmac": HMACBackend}
+
+
+def create_jwt_backend(name: str, secret_key: str, algorithm: str) -> JWTBackend:
+    """Instantiate the backend registered under name"""
+    if name not in JWT_BACKENDS:
+        raise ValueError(f"Unknown JWT backend {name!r} - expected one of {sorted(JWT_BACKENDS)}")
+    return JWT_BACKENDS[name](secret_key, algorithm)
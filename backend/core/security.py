@@ -1,17 +1,39 @@
 from passlib.context import CryptContext
-from jose import JWTError, jwt
 from datetime import datetime, timedelta
 from typing import Optional
+import hashlib
+import time
 from fastapi import HTTPException, status
 
 from core.config import settings
+from core.jwt_backends import InvalidTokenError, JWTBackend, create_jwt_backend
+from utils.cache import TTLCache
+from utils.logger import get_logger
+
+
+logger = get_logger(__name__)
 
 
 class SecurityService:
     """Security service for handling password hashing and JWT token management"""
     
-    def __init__(self):
+    def __init__(self, jwt_backend: Optional[JWTBackend] = None, token_cache: Optional[TTLCache] = None):
         self.pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+        self.jwt_backend = jwt_backend or create_jwt_backend(
+            settings.JWT_BACKEND, settings.SECRET_KEY, settings.ALGORITHM
+        )
+        # sha256(token) -> verified payload; entries never outlive the token's exp
+        self.token_cache = token_cache if token_cache is not None else TTLCache(
+            maxsize=settings.TOKEN_CACHE_SIZE, ttl=settings.TOKEN_CACHE_TTL
+        )
+        # username -> time claims were revoked; entries only need to outlive the freshness window
+        self.revoked_claims = TTLCache(
+            maxsize=settings.TOKEN_REVOCATION_CACHE_SIZE,
+            ttl=settings.TOKEN_CLAIMS_MAX_AGE_SECONDS,
+            on_evict=self._revocation_evicted
+        )
+        # Claims issued up to this time are not trusted for anyone, since a revocation was lost
+        self.revocations_lost_at = 0.0
     
     def hash_password(self, password: str) -> str:
         """Hash a password"""
@@ -30,27 +52,66 @@ class SecurityService:
             expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
         
         to_encode.update({"exp": expire, "iat": datetime.utcnow()})
-        encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+        encoded_jwt = self.jwt_backend.encode(to_encode)
         return encoded_jwt
     
     def verify_token(self, token: str) -> dict:
-        """Verify and decode JWT token"""
+        """Verify and decode JWT token, reusing the result for tokens seen before"""
+        key = hashlib.sha256(token.encode("utf-8")).digest()
+        payload = self.token_cache.get(key)
+        now = time.time()
+        if payload is None or payload.get("exp", now + 1) <= now:
+            payload = self._decode_token(token)
+            if "exp" in payload:
+                self.token_cache.set(key, payload, ttl=min(self.token_cache.ttl, payload["exp"] - now))
+            else:
+                self.token_cache.set(key, payload)
+        # A shallow copy, so callers adding or replacing claims cannot alter the cached payload
+        return dict(payload)
+    
+    def _decode_token(self, token: str) -> dict:
         try:
-            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-            username: str = payload.get("sub")
-            if username is None:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Could not validate credentials",
-                    headers={"WWW-Authenticate": "Bearer"},
-                )
-            return payload
-        except JWTError:
+            payload = self.jwt_backend.decode(token)
+        except InvalidTokenError:
+            payload = None
+        if payload is None or payload.get("sub") is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Could not validate credentials",
                 headers={"WWW-Authenticate": "Bearer"},
             )
+        return payload
+
+    
+    def _revocation_evicted(self, username: str, revoked_at: float):
+        """Keep a revocation that no longer fits from re-admitting the claims it covered"""
+        self.revocations_lost_at = max(self.revocations_lost_at, revoked_at)
+        logger.warning(
+            "Revoked claims for %s evicted before expiry - raise TOKEN_REVOCATION_CACHE_SIZE; "
+            "claims issued before the revocation go back to LDAP", username
+        )
+    
+    def revoke_claims(self, username: str):
+        """Stop trusting claims in tokens issued to username up to now"""
+        self.revoked_claims.set(username, time.time())
+    
+    def claims_are_fresh(self, payload: dict) -> bool:
+        """Whether the signed claims can be trusted without asking LDAP"""
+        if not settings.TRUST_TOKEN_CLAIMS or "groups" not in payload:
+            return False
+        
+        # Tokens minted by a refresh carry the time their groups were read from LDAP
+        issued_at = payload.get("groups_at", payload.get("iat"))
+        if issued_at is None:
+            return False
+        
+        if time.time() - issued_at > settings.TOKEN_CLAIMS_MAX_AGE_SECONDS:
+            return False
+        
+        if issued_at <= self.revocations_lost_at:
+            return False
+        revoked_at = self.revoked_claims.get(payload.get("sub"))
+        return revoked_at is None or issued_at > revoked_at
 
 
 security_service = SecurityService()
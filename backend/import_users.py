@@ -0,0 +1,60 @@
+"""Bulk import users from a CSV or NDJSON file.
+
+CSV input needs a header row naming the columns
+username,password,email,first_name,last_name,group. Results are written to
+stdout as one JSON object per input row.
+
+    python import_users.py users.csv
+    python import_users.py --format ndjson - < users.ndjson
+"""
+import argparse
+import asyncio
+import json
+import sys
+
+from services.activity_log import shutdown_activity_log_writer
+from services.database_service import close_database_service
+from services.import_service import PARSERS, get_import_service, iter_file_lines
+from services.ldap_service import close_ldap_service
+
+
+def detect_format(path: str) -> str:
+    return "ndjson" if path.endswith((".ndjson", ".jsonl")) else "csv"
+
+
+async def run(path: str, format: str) -> int:
+    """Import the file and return the number of rows that failed"""
+    failed = 0
+    created = 0
+    source = sys.stdin if path == "-" else open(path, encoding="utf-8", newline="")
+    try:
+        rows = PARSERS[format](iter_file_lines(source))
+        async for result in get_import_service().import_rows(rows):
+            print(json.dumps(result))
+            if result["status"] == "created":
+                created += 1
+            else:
+                failed += 1
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        await shutdown_activity_log_writer()
+        close_database_service()
+        close_ldap_service()
+
+    print(f"{created} created, {failed} failed", file=sys.stderr)
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", help="CSV or NDJSON file, or - for stdin")
+    parser.add_argument("--format", choices=sorted(PARSERS), help="defaults to the file extension")
+    args = parser.parse_args()
+
+    failed = asyncio.run(run(args.path, args.format or detect_format(args.path)))
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
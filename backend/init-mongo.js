@@ -10,6 +10,10 @@ db.users.createIndex({ "created_at": 1 });
 db.sessions.createIndex({ "username": 1 });
 db.sessions.createIndex({ "created_at": 1 }, { expireAfterSeconds: 86400 }); // 24 hours
 
+// Create user_activities indexes (the backend also ensures these, plus a
+// retention TTL index, at startup)
+db.user_activities.createIndex({ "user_id": 1, "timestamp": -1 }, { name: "user_id_timestamp" });
+
 // Create logs collection for audit trails
 db.logs.createIndex({ "username": 1 });
 db.logs.createIndex({ "timestamp": 1 });
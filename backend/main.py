@@ -1,8 +1,63 @@
+import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from core.config import settings
-from api import auth, admin, user, health
+from api import auth, admin, user, health, metrics
+from api.responses import get_default_response_class
+from services.activity_log import shutdown_activity_log_writer
+from services.database_service import get_database_service, close_database_service
+from services.directory_mirror import get_directory_mirror, shutdown_directory_mirror
+from services.health_monitor import get_health_monitor, shutdown_health_monitor
+from services.ldap_service import get_ldap_service, close_ldap_service
+from services.stats_service import shutdown_admin_stats_service
+from services.uid_allocator import get_uid_allocator, reset_uid_allocator
+from utils.logger import get_logger, setup_logging
+
+
+logger = get_logger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Own the shared service instances for the lifetime of the application"""
+    # Here rather than at import time, so importing main for tooling leaves logging alone
+    setup_logging()
+    db_service = get_database_service()
+    ldap_service = get_ldap_service()
+    
+    # Warm connections and make sure query paths are index-backed before serving traffic
+    if not await db_service.ensure_indexes():
+        logger.warning("Could not ensure MongoDB indexes at startup")
+    if not await ldap_service.warm_up():
+        logger.warning("Could not pre-open LDAP connections at startup")
+    
+    # Seed the UID counter from the directory once instead of scanning per registration
+    try:
+        if not await get_uid_allocator().seed():
+            logger.warning("Could not seed the UID counter at startup")
+    except Exception:
+        logger.warning("Could not seed the UID counter at startup", exc_info=True)
+    
+    # Load the directory mirror before traffic so lookups start out served from memory
+    mirror = get_directory_mirror()
+    if mirror is not None:
+        await mirror.start()
+    
+    # Probes read the monitor's cached state instead of hitting LDAP and Mongo themselves
+    await get_health_monitor().start()
+    logger.info("Worker %d warmed up and ready", os.getpid())
+    
+    yield
+    
+    await shutdown_health_monitor()
+    await shutdown_directory_mirror()
+    await shutdown_admin_stats_service()
+    await shutdown_activity_log_writer()
+    reset_uid_allocator()
+    close_database_service()
+    close_ldap_service()
 
 
 def create_application() -> FastAPI:
@@ -10,7 +65,9 @@ def create_application() -> FastAPI:
     app = FastAPI(
         title=settings.PROJECT_NAME,
         version=settings.VERSION,
-        debug=settings.DEBUG
+        debug=settings.DEBUG,
+        default_response_class=get_default_response_class(),
+        lifespan=lifespan
     )
     
     # Configure CORS
@@ -20,13 +77,19 @@ def create_application() -> FastAPI:
         allow_credentials=settings.CORS_ALLOW_CREDENTIALS,
         allow_methods=settings.CORS_ALLOW_METHODS,
         allow_headers=settings.CORS_ALLOW_HEADERS,
+        expose_headers=settings.CORS_EXPOSE_HEADERS,
     )
     
+    if settings.METRICS_ENABLED:
+        app.add_middleware(metrics.MetricsMiddleware)
+    
     # Include routers
     app.include_router(auth.router, prefix="/auth", tags=["authentication"])
     app.include_router(admin.router, prefix="/admin", tags=["admin"])
     app.include_router(user.router, prefix="/user", tags=["user"])
     app.include_router(health.router, tags=["health"])
+    if settings.METRICS_ENABLED:
+        app.include_router(metrics.router, tags=["metrics"])
     
     @app.get("/")
     async def root():
@@ -45,10 +108,5 @@ app = create_application()
 
 
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(
-        "main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=settings.DEBUG
-    )
+    from server import run
+    run()
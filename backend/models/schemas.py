@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr
-from typing import Optional, List
+from typing import Dict, Optional, List
 from datetime import datetime
 
 
@@ -29,9 +29,23 @@ class Token(BaseModel):
     access_token: str
     token_type: str = "bearer"
     expires_in: int
+    refresh_token: Optional[str] = None
+    refresh_expires_in: Optional[int] = None
     user: "UserInfo"
 
 
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+
+class RefreshedToken(BaseModel):
+    access_token: str
+    token_type: str = "bearer"
+    expires_in: int
+    refresh_token: str
+    refresh_expires_in: int
+
+
 class UserInfo(BaseModel):
     username: str
     email: str
@@ -65,6 +79,20 @@ class HealthStatus(BaseModel):
     timestamp: datetime
 
 
+class ServiceHealth(BaseModel):
+    status: str
+    latency_ms: Optional[float] = None
+    checked_at: Optional[datetime] = None
+    error: Optional[str] = None
+
+
+class ReadinessStatus(BaseModel):
+    status: str
+    stale: bool
+    age_seconds: Optional[float] = None
+    services: Dict[str, ServiceHealth]
+
+
 class AdminStats(BaseModel):
     total_users: int
     group_a_users: int
@@ -91,5 +119,16 @@ class UserProfile(BaseModel):
     last_activity: Optional[datetime] = None
 
 
+class UserDashboard(BaseModel):
+    profile: UserProfile
+    activities: List[UserActivity]
+
+
+class AdminDashboard(BaseModel):
+    users: List[UserInfo]
+    next_cursor: Optional[str] = None
+    stats: AdminStats
+
+
 # Update forward references
 Token.model_rebuild()
@@ -0,0 +1,75 @@
+"""Production entry point: python -m server
+
+Runs uvicorn with WEB_CONCURRENCY worker processes sharing one listening
+socket, uvloop and httptools when they are installed, and the keep-alive
+and backlog settings from core.config. Every worker runs the application
+lifespan - pool warmup, index checks, UID seeding, the health monitor and
+the directory mirror - before it accepts connections, so no request lands
+on a cold worker. Pools are per worker: N workers open up to N times
+LDAP_POOL_SIZE directory connections. So are the login limiter's memory
+backend, revoked token claims, the stats refresher and the directory
+mirror, which is why WEB_CONCURRENCY defaults to 1 and has to be raised
+deliberately.
+"""
+import importlib.util
+
+import uvicorn
+
+from core.config import settings
+from utils.logger import get_logger, setup_logging
+
+
+logger = get_logger(__name__)
+
+
+def _available(implementation: str, module: str) -> str:
+    """Use implementation only if its module is installed, otherwise let uvicorn pick"""
+    if implementation == module and importlib.util.find_spec(module) is None:
+        logger.warning("%s is not installed - falling back to uvicorn's default", module)
+        return "auto"
+    return implementation
+
+
+def uvicorn_options(**overrides) -> dict:
+    """Keyword arguments for uvicorn.run built from settings"""
+    options = {
+        "host": settings.SERVER_HOST,
+        "port": settings.SERVER_PORT,
+        "workers": max(1, settings.WEB_CONCURRENCY),
+        "loop": _available(settings.SERVER_LOOP, "uvloop"),
+        "http": _available(settings.SERVER_HTTP, "httptools"),
+        "timeout_keep_alive": settings.SERVER_KEEPALIVE_TIMEOUT,
+        "backlog": settings.SERVER_BACKLOG,
+        "access_log": settings.SERVER_ACCESS_LOG,
+        # A failing startup must stop the worker rather than serve without its services
+        "lifespan": "on",
+        "reload": settings.SERVER_RELOAD,
+    }
+    options.update(overrides)
+    if options["reload"]:
+        options["workers"] = 1
+    if options["workers"] > 1:
+        _warn_per_worker_state(options["workers"])
+    return options
+
+
+def _warn_per_worker_state(workers: int):
+    """Point out state that each worker keeps to itself"""
+    if settings.LOGIN_RATE_LIMIT_ENABLED and settings.LOGIN_RATE_LIMIT_BACKEND == "memory":
+        logger.warning(
+            "%d workers with LOGIN_RATE_LIMIT_BACKEND=memory: every worker counts failed logins "
+            "separately, so the limits are effectively multiplied by %d - use the mongodb backend",
+            workers, workers
+        )
+    if settings.LDAP_MIRROR_ENABLED:
+        logger.warning("%d workers each run their own directory mirror and its full resyncs", workers)
+
+
+def run(app: str = "main:app", **overrides):
+    """Serve app, given as an import string so worker processes can load it"""
+    setup_logging()
+    uvicorn.run(app, **uvicorn_options(**overrides))
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,142 @@
+import asyncio
+from datetime import datetime
+from typing import List, Optional
+
+from core.config import settings
+from services.interfaces import DatabaseServiceAbstractClass
+from utils.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+# Queue sentinel telling the flusher to write its current batch and exit
+_STOP = object()
+
+
+class ActivityLogWriter:
+    """Buffers user activity events and writes them to the database in batches"""
+
+    def __init__(
+        self,
+        db_service: DatabaseServiceAbstractClass,
+        batch_size: int = settings.ACTIVITY_LOG_BATCH_SIZE,
+        flush_interval: float = settings.ACTIVITY_LOG_FLUSH_INTERVAL,
+        max_queue_size: int = settings.ACTIVITY_LOG_QUEUE_SIZE,
+        enqueue_timeout: float = settings.ACTIVITY_LOG_ENQUEUE_TIMEOUT
+    ):
+        self.db_service = db_service
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue_size = max_queue_size
+        self.enqueue_timeout = enqueue_timeout
+        self.dropped = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def _ensure_started(self) -> asyncio.Queue:
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        return self._queue
+
+    async def log_user_activity(self, username: str, description: str) -> bool:
+        """Queue an activity event; only waits when the queue is full"""
+        queue = self._ensure_started()
+        activity = {
+            "user_id": username,
+            "description": description,
+            "timestamp": datetime.utcnow()
+        }
+        try:
+            queue.put_nowait(activity)
+            return True
+        except asyncio.QueueFull:
+            pass
+
+        # Backpressure: wait a bounded time for the flusher to make room
+        try:
+            await asyncio.wait_for(queue.put(activity), timeout=self.enqueue_timeout)
+            return True
+        except asyncio.TimeoutError:
+            self.dropped += 1
+            logger.warning("Activity log queue full, dropped event for %s", username)
+            return False
+
+    def _drain(self, batch: List[dict]):
+        while len(batch) < self.batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+
+    async def _write(self, batch: List[dict]):
+        if not batch:
+            return
+        try:
+            written = await self.db_service.log_user_activities(batch)
+        except Exception:
+            written = False
+        if not written:
+            logger.error("Failed to write %d activity log events", len(batch))
+
+    async def _run(self):
+        """Flush when a batch fills up or flush_interval passes, whichever is first"""
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is _STOP:
+                break
+
+            batch = [item]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            await self._write(batch)
+
+    async def flush(self):
+        """Write everything currently queued"""
+        if self._queue is None:
+            return
+        while not self._queue.empty():
+            batch: List[dict] = []
+            self._drain(batch)
+            await self._write([item for item in batch if item is not _STOP])
+
+    async def stop(self):
+        """Stop the background flusher after it has written everything queued"""
+        if self._task is not None and not self._task.done():
+            await self._queue.put(_STOP)
+            await self._task
+        self._task = None
+        await self.flush()
+
+
+_activity_log_writer: Optional[ActivityLogWriter] = None
+
+
+def get_activity_log_writer() -> ActivityLogWriter:
+    """Factory function for the process-wide activity log writer"""
+    global _activity_log_writer
+    if _activity_log_writer is None:
+        from services.database_service import get_database_service
+
+        _activity_log_writer = ActivityLogWriter(get_database_service())
+    return _activity_log_writer
+
+
+async def shutdown_activity_log_writer():
+    """Flush queued events and drop the shared writer"""
+    global _activity_log_writer
+    if _activity_log_writer is not None:
+        await _activity_log_writer.stop()
+        _activity_log_writer = None
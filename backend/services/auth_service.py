@@ -1,24 +1,47 @@
+import asyncio
 from datetime import timedelta
+from typing import Callable, Dict, List, Optional
 from fastapi import HTTPException, status, Depends
 
-from models.schemas import UserRegistration, UserInfo, Token
-from services.interfaces import AuthServiceAbstractClass, LDAPServiceAbstractClass, DatabaseServiceAbstractClass
+from models.schemas import UserRegistration, UserInfo, Token, RefreshedToken
+from services.interfaces import AuthServiceAbstractClass, AsyncLDAPServiceAbstractClass, DatabaseServiceAbstractClass
+from services.activity_log import ActivityLogWriter
+from services.login_guard import LoginGuard
+from services.session_service import SessionService
+from services.uid_allocator import UIDAllocator
 from core.security import security_service
 from core.config import settings
+from utils.timing import StageTimer
 
 
 class AuthService(AuthServiceAbstractClass):
     """Authentication Service implementation"""
     
-    def __init__(self, ldap_service: LDAPServiceAbstractClass, db_service: DatabaseServiceAbstractClass):
+    def __init__(
+        self,
+        ldap_service: AsyncLDAPServiceAbstractClass,
+        db_service: DatabaseServiceAbstractClass,
+        activity_log: ActivityLogWriter,
+        uid_allocator: UIDAllocator,
+        login_guard: Optional[LoginGuard] = None,
+        session_service: Optional[SessionService] = None,
+        on_login_timings: Optional[Callable[[Dict[str, float]], None]] = None
+    ):
         self.ldap_service = ldap_service
         self.db_service = db_service
+        self.activity_log = activity_log
+        self.uid_allocator = uid_allocator
+        self.login_guard = login_guard
+        self.session_service = session_service
+        # Receives per-stage login durations in seconds, e.g. for metrics or benchmarks
+        self.on_login_timings = on_login_timings
     
     async def register_user(self, user_data: UserRegistration) -> dict:
         """Register a new user"""
         try:
-            # Create user in LDAP
-            self.ldap_service.create_user(user_data)
+            # Create user in LDAP with a UID from the atomic counter
+            uid_number = await self.uid_allocator.allocate()
+            await self.ldap_service.create_user(user_data, uid_number)
             
             # Store additional user data in MongoDB
             user_doc = {
@@ -30,8 +53,11 @@ class AuthService(AuthServiceAbstractClass):
             
             await self.db_service.create_user(user_doc)
             
+            if self.login_guard is not None:
+                await self.login_guard.reset(user_data.username)
+            
             # Log activity
-            await self.db_service.log_user_activity(
+            await self.activity_log.log_user_activity(
                 user_data.username, 
                 "User account created"
             )
@@ -43,64 +69,139 @@ class AuthService(AuthServiceAbstractClass):
         except Exception as e:
             raise HTTPException(status_code=400, detail=str(e))
     
-    async def authenticate_user(self, username: str, password: str) -> Token:
+    async def authenticate_user(self, username: str, password: str, client_ip: Optional[str] = None) -> Token:
         """Authenticate user and return JWT token"""
-        # Authenticate against LDAP
-        if not self.ldap_service.authenticate_user(username, password):
+        timer = StageTimer()
+        
+        # Refuse throttled attempts and known-unknown users before touching LDAP
+        recent_failures = 0.0
+        if self.login_guard is not None:
+            with timer.stage("login_guard"):
+                recent_failures = await self.login_guard.check(username, client_ip)
+        
+        # Bind as the user and read their groups on the same pooled connection
+        with timer.stage("ldap_bind_and_groups"):
+            groups = await self.ldap_service.authenticate_and_get_groups(username, password)
+        if groups is None:
+            if self.login_guard is not None:
+                failures = await self.login_guard.record_failure(username, client_ip)
+                # One existence lookup per username and window, for real and unknown users alike
+                if failures == 1 and await self.ldap_service.user_is_missing(username):
+                    await self.login_guard.remember_missing_user(username)
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect username or password",
                 headers={"WWW-Authenticate": "Bearer"},
             )
         
-        # Get user groups
-        groups = self.ldap_service.get_user_groups(username)
+        if recent_failures:
+            await self.login_guard.reset(username)
         
-        # Update last login
-        await self.db_service.update_user_login(username)
+        # record_login returns the updated document, so no separate fetch is needed
+        with timer.stage("login_update"):
+            user_doc = await self.db_service.record_login(username)
         
-        # Log activity
-        await self.db_service.log_user_activity(username, "User logged in")
+        if not user_doc:
+            raise HTTPException(status_code=404, detail="User not found")
         
-        # Get user info for token
-        user_info = await self.get_current_user(username)
+        # Only a login that is going to succeed gets a refresh session
+        refresh_token = None
+        if self.session_service is not None:
+            with timer.stage("session"):
+                refresh_token = await self.session_service.create(username, groups)
+        
+        # Log activity
+        with timer.stage("activity_log"):
+            await self.activity_log.log_user_activity(username, "User logged in")
         
         # Create JWT token
-        access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-        access_token = security_service.create_access_token(
-            data={"sub": username, "groups": groups},
-            expires_delta=access_token_expires
-        )
+        with timer.stage("token"):
+            user_info = self._build_user_info(username, user_doc, groups)
+            access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+            token_data = {"sub": username, "groups": groups}
+            if refresh_token:
+                token_data["sid"] = refresh_token.partition(".")[0]
+            access_token = security_service.create_access_token(
+                data=token_data,
+                expires_delta=access_token_expires
+            )
+        
+        timer.report(self.on_login_timings)
         
         return Token(
             access_token=access_token,
             token_type="bearer",
             expires_in=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+            refresh_token=refresh_token,
+            refresh_expires_in=self.session_service.expires_in if refresh_token else None,
             user=user_info
         )
     
+    async def refresh_access_token(self, refresh_token: str) -> RefreshedToken:
+        """Exchange a refresh token for a new access token and a rotated refresh token"""
+        rotated = None
+        if self.session_service is not None:
+            rotated = await self.session_service.rotate(refresh_token)
+        if rotated is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid refresh token",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        session, new_refresh_token = rotated
+        
+        # Groups come from the session, not LDAP; groups_at lets them age out of
+        # claims_are_fresh on the same clock as the login token's
+        access_token = security_service.create_access_token(
+            data={
+                "sub": session["username"],
+                "groups": session["groups"],
+                "groups_at": session["groups_at"],
+                "sid": session["_id"],
+            },
+            expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+        )
+        return RefreshedToken(
+            access_token=access_token,
+            token_type="bearer",
+            expires_in=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+            refresh_token=new_refresh_token,
+            refresh_expires_in=self.session_service.expires_in
+        )
+    
+    async def logout(self, username: str, session_id: Optional[str] = None):
+        """Revoke the token's refresh session and log the logout"""
+        if session_id and self.session_service is not None:
+            await self.session_service.revoke(session_id)
+        await self.activity_log.log_user_activity(username, "User logged out")
+    
+    @staticmethod
+    def _build_user_info(username: str, user_doc: dict, groups: List[str]) -> UserInfo:
+        """Combine the MongoDB profile with LDAP groups"""
+        return UserInfo(
+            username=username,
+            email=user_doc["email"],
+            first_name=user_doc["first_name"],
+            last_name=user_doc["last_name"],
+            groups=groups,
+            created_at=user_doc.get("created_at"),
+            last_login=user_doc.get("last_login"),
+            is_active=user_doc.get("is_active", True)
+        )
+    
     async def get_current_user(self, username: str) -> UserInfo:
         """Get current user information"""
         try:
-            # Get user groups from LDAP
-            groups = self.ldap_service.get_user_groups(username)
-            
-            # Get additional user data from MongoDB
-            user_doc = await self.db_service.get_user(username)
+            # Get user groups from LDAP and additional user data from MongoDB together
+            groups, user_doc = await asyncio.gather(
+                self.ldap_service.get_user_groups(username),
+                self.db_service.get_user(username)
+            )
             
             if not user_doc:
                 raise HTTPException(status_code=404, detail="User not found")
             
-            return UserInfo(
-                username=username,
-                email=user_doc["email"],
-                first_name=user_doc["first_name"],
-                last_name=user_doc["last_name"],
-                groups=groups,
-                created_at=user_doc.get("created_at"),
-                last_login=user_doc.get("last_login"),
-                is_active=user_doc.get("is_active", True)
-            )
+            return self._build_user_info(username, user_doc, groups)
             
         except HTTPException:
             raise
@@ -113,7 +214,15 @@ def get_auth_service() -> AuthServiceAbstractClass:
     """Factory function for auth service dependency injection"""
     from services.ldap_service import get_ldap_service
     from services.database_service import get_database_service
+    from services.activity_log import get_activity_log_writer
+    from services.uid_allocator import get_uid_allocator
+    from services.login_guard import get_login_guard
+    from services.session_service import get_session_service
     
+    # Stateless wrapper around the shared services, so building one per request is cheap
     ldap_service = get_ldap_service()
     db_service = get_database_service()
-    return AuthService(ldap_service, db_service)
+    return AuthService(
+        ldap_service, db_service, get_activity_log_writer(), get_uid_allocator(), get_login_guard(),
+        get_session_service()
+    )
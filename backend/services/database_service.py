@@ -1,9 +1,17 @@
 from motor.motor_asyncio import AsyncIOMotorClient
-from typing import List, Optional
-from datetime import datetime
+from pymongo import ASCENDING, DESCENDING, ReturnDocument
+from pymongo.errors import BulkWriteError, OperationFailure
+from typing import AsyncIterator, Dict, List, Optional
+from datetime import datetime, timedelta
 
 from core.config import settings
 from services.interfaces import DatabaseServiceAbstractClass
+from utils.metrics import instrument, record_backend_error
+
+
+def _failed(operation: str):
+    """Count an error that a method below swallows - the metrics wrapper only sees the ones raised"""
+    record_backend_error("mongodb", operation)
 
 
 class MongoDBService(DatabaseServiceAbstractClass):
@@ -20,6 +28,61 @@ class MongoDBService(DatabaseServiceAbstractClass):
             self.database = self.client[settings.MONGODB_DATABASE]
         return self.database
     
+    def close(self):
+        """Close the client and its connection pool"""
+        if self.client is not None:
+            self.client.close()
+            self.client = None
+            self.database = None
+    
+    async def ensure_indexes(self) -> bool:
+        """Create the indexes the query paths rely on - safe to run on every startup"""
+        try:
+            db = await self._get_database()
+            
+            # Serves get_user_activities: equality on user_id, newest first
+            await db.user_activities.create_index(
+                [("user_id", ASCENDING), ("timestamp", DESCENDING)],
+                name="user_id_timestamp"
+            )
+            
+            # Login limiter counters carry their own expiry time
+            await db.expiring_counters.create_index(
+                [("expires_at", ASCENDING)],
+                name="expires_at_ttl",
+                expireAfterSeconds=0
+            )
+            
+            # Refresh token sessions are looked up by _id and expire with their refresh token
+            await db.sessions.create_index([("username", ASCENDING)], name="username_1")
+            await self._ensure_ttl_index(
+                db, "sessions", "created_at", "created_at_1",
+                int(settings.REFRESH_TOKEN_EXPIRE_HOURS * 3600)
+            )
+            
+            retention = settings.ACTIVITY_LOG_RETENTION_DAYS * 86400
+            if retention > 0:
+                await self._ensure_ttl_index(db, "user_activities", "timestamp", "timestamp_ttl", retention)
+            return True
+        except Exception:
+            _failed("ensure_indexes")
+            return False
+    
+    async def _ensure_ttl_index(self, db, collection: str, field: str, name: str, seconds: int):
+        """Expire documents the given number of seconds after field"""
+        try:
+            await db[collection].create_index(
+                [(field, ASCENDING)],
+                name=name,
+                expireAfterSeconds=seconds
+            )
+        except OperationFailure:
+            # Index exists with a different expiry - update it in place
+            await db.command(
+                "collMod", collection,
+                index={"name": name, "expireAfterSeconds": seconds}
+            )
+    
     async def create_user(self, user_data: dict) -> bool:
         """Create user in database"""
         try:
@@ -34,14 +97,35 @@ class MongoDBService(DatabaseServiceAbstractClass):
             await db.users.insert_one(user_doc)
             return True
         except Exception:
+            _failed("create_user")
             return False
     
+    async def create_users(self, users_data: List[dict]) -> List[Optional[str]]:
+        """Create many users in one unordered insert, returning an error message or None per user"""
+        now = datetime.utcnow()
+        user_docs = [
+            {**user_data, "created_at": now, "is_active": True, "login_count": 0}
+            for user_data in users_data
+        ]
+        errors: List[Optional[str]] = [None] * len(user_docs)
+        try:
+            db = await self._get_database()
+            await db.users.insert_many(user_docs, ordered=False)
+        except BulkWriteError as e:
+            for write_error in e.details.get("writeErrors", []):
+                errors[write_error["index"]] = write_error.get("errmsg", "Database write failed")
+        except Exception as e:
+            _failed("create_users")
+            errors = [str(e)] * len(user_docs)
+        return errors
+    
     async def get_user(self, username: str) -> Optional[dict]:
         """Get user from database"""
         try:
             db = await self._get_database()
             return await db.users.find_one({"username": username})
         except Exception:
+            _failed("get_user")
             return None
     
     async def update_user_login(self, username: str) -> bool:
@@ -58,8 +142,25 @@ class MongoDBService(DatabaseServiceAbstractClass):
             )
             return result.modified_count > 0
         except Exception:
+            _failed("update_user_login")
             return False
     
+    async def record_login(self, username: str) -> Optional[dict]:
+        """Update last login and return the updated user document in one round trip"""
+        try:
+            db = await self._get_database()
+            return await db.users.find_one_and_update(
+                {"username": username},
+                {
+                    "$set": {"last_login": datetime.utcnow()},
+                    "$inc": {"login_count": 1}
+                },
+                return_document=ReturnDocument.AFTER
+            )
+        except Exception:
+            _failed("record_login")
+            return None
+    
     async def get_all_users(self) -> List[dict]:
         """Get all users from database"""
         try:
@@ -67,8 +168,42 @@ class MongoDBService(DatabaseServiceAbstractClass):
             cursor = db.users.find({}, {"_id": 0})
             return await cursor.to_list(length=None)
         except Exception:
+            _failed("get_all_users")
             return []
     
+    async def get_users_page(self, limit: int, after: Optional[str] = None) -> List[dict]:
+        """Get up to limit users ordered by username, starting after the given username"""
+        try:
+            db = await self._get_database()
+            query = {"username": {"$gt": after}} if after is not None else {}
+            cursor = db.users.find(query, {"_id": 0}).sort("username", 1).limit(limit)
+            return await cursor.to_list(length=limit)
+        except Exception:
+            _failed("get_users_page")
+            return []
+    
+    async def iter_users(self, after: Optional[str] = None, limit: Optional[int] = None) -> AsyncIterator[dict]:
+        """Stream users ordered by username without materialising the collection.
+
+        Failing to reach the database before the cursor is built yields
+        nothing, like the other reads. An error while reading the cursor is
+        raised, so a stream cut short aborts instead of passing for a
+        complete listing.
+        """
+        try:
+            db = await self._get_database()
+            query = {"username": {"$gt": after}} if after is not None else {}
+            cursor = db.users.find(query, {"_id": 0}).sort("username", 1)
+            cursor = cursor.batch_size(settings.ADMIN_USERS_STREAM_BATCH_SIZE)
+            if limit is not None:
+                cursor = cursor.limit(limit)
+        except Exception:
+            _failed("iter_users")
+            return
+        # Raised, not swallowed - the metrics wrapper counts it
+        async for user in cursor:
+            yield user
+    
     async def get_user_activities(self, username: str) -> List[dict]:
         """Get user activities from database"""
         try:
@@ -79,6 +214,7 @@ class MongoDBService(DatabaseServiceAbstractClass):
             ).sort("timestamp", -1).limit(10)
             return await cursor.to_list(length=10)
         except Exception:
+            _failed("get_user_activities")
             return []
     
     async def log_user_activity(self, username: str, description: str) -> bool:
@@ -93,6 +229,120 @@ class MongoDBService(DatabaseServiceAbstractClass):
             await db.user_activities.insert_one(activity)
             return True
         except Exception:
+            _failed("log_user_activity")
+            return False
+    
+    async def log_user_activities(self, activities: List[dict]) -> bool:
+        """Write a batch of activity events in one unordered insert"""
+        try:
+            db = await self._get_database()
+            await db.user_activities.insert_many(activities, ordered=False)
+            return True
+        except Exception:
+            _failed("log_user_activities")
+            return False
+    
+    async def increment_counter(self, name: str, amount: int = 1) -> int:
+        """Atomically add amount to a named counter and return the new value"""
+        db = await self._get_database()
+        counter = await db.counters.find_one_and_update(
+            {"_id": name},
+            {"$inc": {"value": amount}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        return counter["value"]
+    
+    async def seed_counter(self, name: str, value: int) -> bool:
+        """Raise a named counter to at least value - idempotent across workers"""
+        try:
+            db = await self._get_database()
+            await db.counters.update_one(
+                {"_id": name},
+                {"$max": {"value": value}},
+                upsert=True
+            )
+            return True
+        except Exception:
+            _failed("seed_counter")
+            return False
+    
+    async def create_session(self, session: dict) -> bool:
+        """Store a new refresh token session"""
+        try:
+            db = await self._get_database()
+            await db.sessions.insert_one(session)
+            return True
+        except Exception:
+            _failed("create_session")
+            return False
+    
+    async def get_session(self, session_id: str) -> Optional[dict]:
+        """Get a refresh token session by id"""
+        try:
+            db = await self._get_database()
+            return await db.sessions.find_one({"_id": session_id})
+        except Exception:
+            _failed("get_session")
+            return None
+    
+    async def rotate_session(self, session_id: str, token_hash: str, new_token_hash: str) -> Optional[dict]:
+        """Swap a live session's token hash if it matches and return the session - one _id lookup.
+
+        Raises on database errors, so callers can tell a failed write from a token that does not match.
+        """
+        db = await self._get_database()
+        now = datetime.utcnow()
+        return await db.sessions.find_one_and_update(
+            {"_id": session_id, "token_hash": token_hash, "expires_at": {"$gt": now}},
+            {"$set": {"token_hash": new_token_hash, "last_used_at": now}},
+            return_document=ReturnDocument.AFTER
+        )
+    
+    async def delete_session(self, session_id: str) -> bool:
+        """Revoke a refresh token session"""
+        try:
+            db = await self._get_database()
+            result = await db.sessions.delete_one({"_id": session_id})
+            return result.deleted_count > 0
+        except Exception:
+            _failed("delete_session")
+            return False
+    
+    async def increment_expiring_counter(self, key: str, ttl: float) -> int:
+        """Add one to a counter that expires ttl seconds after it was created and return the new value"""
+        db = await self._get_database()
+        now = datetime.utcnow()
+        # The TTL monitor only sweeps once a minute, so an expired document restarts at one
+        live = {"$gt": ["$expires_at", now]}
+        counter = await db.expiring_counters.find_one_and_update(
+            {"_id": key},
+            [{"$set": {
+                "count": {"$cond": [live, {"$add": ["$count", 1]}, 1]},
+                "expires_at": {"$cond": [live, "$expires_at", now + timedelta(seconds=ttl)]},
+            }}],
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        return counter["count"]
+    
+    async def get_expiring_counters(self, keys: List[str]) -> Dict[str, int]:
+        """Get the live values of the given expiring counters - missing keys are left out"""
+        db = await self._get_database()
+        cursor = db.expiring_counters.find(
+            {"_id": {"$in": keys}, "expires_at": {"$gt": datetime.utcnow()}},
+            {"count": 1}
+        )
+        return {counter["_id"]: counter["count"] async for counter in cursor}
+    
+    async def delete_expiring_counters(self, keys: List[str]) -> bool:
+        """Delete expiring counters"""
+        try:
+            db = await self._get_database()
+            await db.expiring_counters.delete_many({"_id": {"$in": keys}})
+            return True
+        except Exception:
+            _failed("delete_expiring_counters")
             return False
     
     async def get_admin_stats(self) -> dict:
@@ -100,14 +350,21 @@ class MongoDBService(DatabaseServiceAbstractClass):
         try:
             db = await self._get_database()
             
-            # Count total users
-            total_users = await db.users.count_documents({})
-            
-            # Count active sessions
-            yesterday = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-            active_sessions = await db.users.count_documents({
-                "last_login": {"$gte": yesterday}
-            })
+            # Count total users and today's logins in a single aggregation
+            today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+            pipeline = [
+                {"$facet": {
+                    "total_users": [{"$count": "count"}],
+                    "active_sessions": [
+                        {"$match": {"last_login": {"$gte": today}}},
+                        {"$count": "count"}
+                    ]
+                }}
+            ]
+            result = await db.users.aggregate(pipeline).to_list(length=1)
+            facets = result[0] if result else {}
+            total_users = self._facet_count(facets, "total_users")
+            active_sessions = self._facet_count(facets, "active_sessions")
             
             return {
                 "total_users": total_users,
@@ -116,6 +373,7 @@ class MongoDBService(DatabaseServiceAbstractClass):
                 "active_sessions": active_sessions
             }
         except Exception:
+            _failed("get_admin_stats")
             return {
                 "total_users": 0,
                 "group_a_users": 0,
@@ -123,6 +381,12 @@ class MongoDBService(DatabaseServiceAbstractClass):
                 "active_sessions": 0
             }
     
+    @staticmethod
+    def _facet_count(facets: dict, name: str) -> int:
+        """Read a $count result out of a $facet stage - empty facets mean zero"""
+        rows = facets.get(name) or []
+        return rows[0]["count"] if rows else 0
+    
     async def health_check(self) -> bool:
         """Check MongoDB connection health"""
         try:
@@ -130,9 +394,26 @@ class MongoDBService(DatabaseServiceAbstractClass):
             await db.command("ping")
             return True
         except Exception:
+            _failed("health_check")
             return False
 
 
+_database_service: Optional[MongoDBService] = None
+
+
 def get_database_service() -> DatabaseServiceAbstractClass:
-    """Factory function for database service"""
-    return MongoDBService()
+    """Factory function for database service - hands out the shared instance"""
+    global _database_service
+    if _database_service is None:
+        _database_service = MongoDBService()
+        if settings.METRICS_ENABLED:
+            instrument(_database_service, "mongodb", exclude=["close"])
+    return _database_service
+
+
+def close_database_service():
+    """Close the shared MongoDB client"""
+    global _database_service
+    if _database_service is not None:
+        _database_service.close()
+        _database_service = None
@@ -0,0 +1,365 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Executor
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+import ldap
+import ldap.dn
+
+from core.config import settings
+from services.ldap_pool import LDAPConnectionPool, paged_search
+from utils.logger import get_logger
+from utils.metrics import Counter, registry
+
+
+logger = get_logger(__name__)
+
+mirror_syncs = registry.register(Counter(
+    "ldap_mirror_syncs_total",
+    "Directory mirror syncs by kind and result",
+    ("kind", "result"),
+))
+mirror_drift = registry.register(Counter(
+    "ldap_mirror_drift_total",
+    "Users and memberships a full resync found missing from, or extra in, the mirror",
+))
+mirror_lookups = registry.register(Counter(
+    "ldap_mirror_lookups_total",
+    "Lookups answered from the mirror, or passed to LDAP because it was stale",
+    ("result",),
+))
+
+Entry = Tuple[str, Dict[str, List[bytes]]]
+
+SYNC_ATTRS = ["uid", "cn", "member", "objectClass", "modifyTimestamp"]
+
+
+class DirectoryMirror:
+    """In-process read replica of the people and groups OUs.
+
+    Holds the set of usernames and a member -> groups index. It is
+    bootstrapped with one paged search and kept current by polling for
+    entries whose modifyTimestamp is at or after the newest one seen so far.
+    Deletions do not show up in that delta, so a full resync runs on a
+    longer interval and counts what it had to correct as drift. Group
+    lookups are answered from memory while the last successful sync of
+    either kind is younger than max_staleness, existence checks only while
+    the last full resync is; callers fall back to LDAP otherwise.
+    """
+
+    def __init__(
+        self,
+        pool: LDAPConnectionPool,
+        executor: Optional[Executor] = None,
+        poll_interval: float = settings.LDAP_MIRROR_POLL_INTERVAL,
+        max_staleness: float = settings.LDAP_MIRROR_MAX_STALENESS,
+        full_sync_interval: float = settings.LDAP_MIRROR_FULL_SYNC_INTERVAL,
+        page_size: int = settings.LDAP_PAGE_SIZE
+    ):
+        self.pool = pool
+        self.executor = executor
+        self.poll_interval = poll_interval
+        self.max_staleness = max_staleness
+        self.full_sync_interval = full_sync_interval
+        self.page_size = page_size
+        self.base_dn = settings.LDAP_BASE_DN
+        self.users_dn = f"{settings.LDAP_USERS_OU},{settings.LDAP_BASE_DN}".lower()
+        self.groups_dn = f"{settings.LDAP_GROUPS_OU},{settings.LDAP_BASE_DN}".lower()
+
+        self._users: Set[str] = set()
+        self._group_members: Dict[str, FrozenSet[str]] = {}
+        # Values are tuples replaced whole, so single-user reads need no lock
+        self._memberships: Dict[str, Tuple[str, ...]] = {}
+        self._lock = threading.Lock()
+        self._high_water: Optional[str] = None
+        self._synced_at: Optional[float] = None
+        self._full_synced_at: Optional[float] = None
+        # (time, kind, name, members) for write-throughs a sync that started earlier could undo
+        self._writes: List[Tuple[float, str, str, FrozenSet[str]]] = []
+        self._task: Optional[asyncio.Task] = None
+
+        if full_sync_interval + 2 * poll_interval > max_staleness:
+            logger.warning(
+                "Directory mirror full resyncs every %ss exceed the %ss staleness bound - "
+                "existence checks will fall back to LDAP between resyncs",
+                full_sync_interval, max_staleness
+            )
+
+    # Lookups
+
+    def staleness(self) -> Optional[float]:
+        """Seconds since the start of the last successful sync, or None before the first"""
+        return None if self._synced_at is None else time.monotonic() - self._synced_at
+
+    def full_staleness(self) -> Optional[float]:
+        """Seconds since the start of the last successful full resync - the bound on missed deletions"""
+        return None if self._full_synced_at is None else time.monotonic() - self._full_synced_at
+
+    def is_fresh(self) -> bool:
+        staleness = self.staleness()
+        return staleness is not None and staleness <= self.max_staleness
+
+    def existence_is_fresh(self) -> bool:
+        staleness = self.full_staleness()
+        return staleness is not None and staleness <= self.max_staleness
+
+    def user_exists(self, username: str) -> Optional[bool]:
+        """Whether the user exists, or None if the last full resync is too old to rule out a deletion"""
+        if not self.existence_is_fresh():
+            mirror_lookups.labels("stale").inc()
+            return None
+        mirror_lookups.labels("hit").inc()
+        return username in self._users
+
+    def get_user_groups(self, username: str) -> Optional[List[str]]:
+        """The user's groups, or None if the mirror is too stale to say"""
+        if not self.is_fresh():
+            mirror_lookups.labels("stale").inc()
+            return None
+        mirror_lookups.labels("hit").inc()
+        return list(self._memberships.get(username, ()))
+
+    def get_group_memberships(self) -> Optional[Dict[str, List[str]]]:
+        """Every user's groups, or None if the mirror is too stale to say"""
+        if not self.is_fresh():
+            mirror_lookups.labels("stale").inc()
+            return None
+        mirror_lookups.labels("hit").inc()
+        with self._lock:
+            return {username: list(groups) for username, groups in self._memberships.items()}
+
+    def get_group_member_counts(self) -> Optional[Dict[str, int]]:
+        """Every group's number of user members, or None if the mirror is too stale to say"""
+        if not self.is_fresh():
+            mirror_lookups.labels("stale").inc()
+            return None
+        mirror_lookups.labels("hit").inc()
+        with self._lock:
+            return {group: len(members) for group, members in self._group_members.items()}
+
+    def stats(self) -> dict:
+        return {"users": len(self._users), "groups": len(self._group_members)}
+
+    # Write-through from LDAPService, so this process sees its own writes at once
+
+    def add_user(self, username: str):
+        with self._lock:
+            self._users.add(username)
+            self._writes.append((time.monotonic(), "user", username, frozenset()))
+
+    def add_members(self, group: str, usernames: Iterable[str]):
+        usernames = frozenset(usernames)
+        with self._lock:
+            members = self._group_members.get(group, frozenset())
+            self._set_group_members(group, members | usernames)
+            self._writes.append((time.monotonic(), "members", group, usernames))
+
+    def _writes_since(self, started: float) -> List[Tuple[float, str, str, FrozenSet[str]]]:
+        """Write-throughs made since started, dropping older ones - caller holds the lock"""
+        self._writes = [write for write in self._writes if write[0] >= started]
+        return self._writes
+
+    # Syncing
+
+    def _classify(self, dn: str, attrs: Dict[str, List[bytes]]) -> Tuple[Optional[str], Optional[str]]:
+        """("user", username) or ("group", name) for entries directly below the two OUs"""
+        try:
+            rdns = ldap.dn.str2dn(dn)
+        except ldap.DECODING_ERROR:
+            return None, None
+        if not rdns:
+            return None, None
+        attr, value = rdns[0][0][0].lower(), rdns[0][0][1]
+        parent = ldap.dn.dn2str(rdns[1:]).lower()
+        if parent == self.users_dn and attr == "uid":
+            return "user", value
+        object_classes = {value.lower() for value in attrs.get("objectClass", [])}
+        if parent == self.groups_dn and attr == "cn" and b"groupofnames" in object_classes:
+            return "group", value
+        return None, None
+
+    def _member_usernames(self, member_dns: List[bytes]) -> FrozenSet[str]:
+        usernames = set()
+        for member in member_dns:
+            try:
+                rdns = ldap.dn.str2dn(member.decode("utf-8"))
+            except (ldap.DECODING_ERROR, UnicodeDecodeError):
+                continue
+            if rdns and rdns[0][0][0].lower() == "uid" and ldap.dn.dn2str(rdns[1:]).lower() == self.users_dn:
+                usernames.add(rdns[0][0][1])
+        return frozenset(usernames)
+
+    def _search(self, filterstr: str) -> List[Entry]:
+        """One paged subtree search from the base DN"""
+        return self.pool.run(lambda conn: list(paged_search(
+            conn, self.base_dn, ldap.SCOPE_SUBTREE, filterstr, SYNC_ATTRS, self.page_size
+        )))
+
+    @staticmethod
+    def _newest(entries: List[Entry], current: Optional[str]) -> Optional[str]:
+        # Generalized time in UTC sorts lexically
+        timestamps = [
+            attrs["modifyTimestamp"][0].decode("ascii")
+            for _, attrs in entries if attrs.get("modifyTimestamp")
+        ]
+        return max(timestamps + ([current] if current else []), default=None)
+
+    def _set_group_members(self, group: str, members: FrozenSet[str]):
+        """Replace a group's members and patch the reverse index; caller holds the lock"""
+        previous = self._group_members.get(group, frozenset())
+        if members:
+            self._group_members[group] = members
+        else:
+            self._group_members.pop(group, None)
+        for username in previous - members:
+            remaining = tuple(name for name in self._memberships.get(username, ()) if name != group)
+            if remaining:
+                self._memberships[username] = remaining
+            else:
+                self._memberships.pop(username, None)
+        for username in members - previous:
+            self._memberships[username] = self._memberships.get(username, ()) + (group,)
+
+    def full_sync(self):
+        """Reload both OUs with one paged search and swap the result in"""
+        started = time.monotonic()
+        try:
+            entries = self._search("(|(objectClass=posixAccount)(objectClass=inetOrgPerson)(objectClass=groupOfNames))")
+        except ldap.LDAPError:
+            mirror_syncs.labels("full", "error").inc()
+            raise
+
+        users: Set[str] = set()
+        group_members: Dict[str, FrozenSet[str]] = {}
+        for dn, attrs in entries:
+            kind, name = self._classify(dn, attrs)
+            if kind == "user":
+                users.add(name)
+            elif kind == "group":
+                group_members[name] = self._member_usernames(attrs.get("member", []))
+
+        with self._lock:
+            # Writes made after the search began may be missing from its results
+            for _, kind, name, members in self._writes_since(started):
+                if kind == "user":
+                    users.add(name)
+                else:
+                    group_members[name] = group_members.get(name, frozenset()) | members
+
+            memberships: Dict[str, Tuple[str, ...]] = {}
+            for group, members in group_members.items():
+                for username in members:
+                    memberships[username] = memberships.get(username, ()) + (group,)
+
+            if self._full_synced_at is not None:
+                drift = len(users ^ self._users) + len(_pairs(memberships) ^ _pairs(self._memberships))
+                if drift:
+                    mirror_drift.labels().inc(drift)
+                    logger.info("Directory mirror full resync corrected %d entries", drift)
+            self._users = users
+            self._group_members = group_members
+            self._memberships = memberships
+            self._high_water = self._newest(entries, None)
+            self._synced_at = self._full_synced_at = started
+        mirror_syncs.labels("full", "ok").inc()
+
+    def poll(self):
+        """Apply entries modified since the newest timestamp seen so far"""
+        if self._high_water is None:
+            self.full_sync()
+            return
+
+        started = time.monotonic()
+        # >= rather than > because timestamps have one-second resolution;
+        # re-applying an entry that was already seen is harmless
+        try:
+            entries = self._search(
+                f"(&(modifyTimestamp>={self._high_water})"
+                f"(|(objectClass=posixAccount)(objectClass=inetOrgPerson)(objectClass=groupOfNames)))"
+            )
+        except ldap.LDAPError:
+            mirror_syncs.labels("delta", "error").inc()
+            raise
+
+        with self._lock:
+            for dn, attrs in entries:
+                kind, name = self._classify(dn, attrs)
+                if kind == "user":
+                    self._users.add(name)
+                elif kind == "group":
+                    self._set_group_members(name, self._member_usernames(attrs.get("member", [])))
+            for _, kind, name, members in self._writes_since(started):
+                if kind == "user":
+                    self._users.add(name)
+                else:
+                    self._set_group_members(name, self._group_members.get(name, frozenset()) | members)
+            self._high_water = self._newest(entries, self._high_water)
+            self._synced_at = started
+        mirror_syncs.labels("delta", "ok").inc()
+
+    def sync(self):
+        """A full resync when one is due, otherwise a delta poll"""
+        if self._full_synced_at is None or time.monotonic() - self._full_synced_at >= self.full_sync_interval:
+            self.full_sync()
+        else:
+            self.poll()
+
+    async def _run_sync(self):
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self.executor, self.sync)
+
+    async def _sync_forever(self):
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                await self._run_sync()
+            except Exception:
+                logger.warning("Directory mirror sync failed", exc_info=True)
+
+    async def start(self):
+        """Bootstrap the mirror, then keep it current in the background"""
+        if self._task is None or self._task.done():
+            try:
+                await self._run_sync()
+            except Exception:
+                # Lookups fall back to LDAP until a later sync succeeds
+                logger.warning("Directory mirror bootstrap failed", exc_info=True)
+            self._task = asyncio.get_running_loop().create_task(self._sync_forever())
+
+    async def stop(self):
+        """Cancel the background sync"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+def _pairs(memberships: Dict[str, Tuple[str, ...]]) -> Set[Tuple[str, str]]:
+    return {(username, group) for username, groups in memberships.items() for group in groups}
+
+
+_directory_mirror: Optional[DirectoryMirror] = None
+
+
+def get_directory_mirror() -> Optional[DirectoryMirror]:
+    """Factory function for the process-wide directory mirror, or None when it is disabled"""
+    global _directory_mirror
+    if not settings.LDAP_MIRROR_ENABLED:
+        return None
+    if _directory_mirror is None:
+        from services.ldap_pool import get_ldap_pool
+
+        _directory_mirror = DirectoryMirror(get_ldap_pool())
+    return _directory_mirror
+
+
+async def shutdown_directory_mirror():
+    """Stop the background sync and drop the shared instance"""
+    global _directory_mirror
+    if _directory_mirror is not None:
+        await _directory_mirror.stop()
+        _directory_mirror = None
@@ -0,0 +1,127 @@
+import asyncio
+import time
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, Optional
+
+from core.config import settings
+from models.schemas import ReadinessStatus, ServiceHealth
+from services.interfaces import AsyncLDAPServiceAbstractClass, DatabaseServiceAbstractClass
+from utils.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+
+class HealthMonitor:
+    """Checks dependencies on an interval so probes can read a cached result"""
+
+    def __init__(
+        self,
+        ldap_service: AsyncLDAPServiceAbstractClass,
+        db_service: DatabaseServiceAbstractClass,
+        interval: float = settings.HEALTH_CHECK_INTERVAL,
+        timeout: float = settings.HEALTH_CHECK_TIMEOUT,
+        stale_after: float = settings.HEALTH_STALE_AFTER
+    ):
+        self.checks: Dict[str, Callable[[], Awaitable[bool]]] = {
+            "ldap": ldap_service.health_check,
+            "mongodb": db_service.health_check,
+        }
+        self.interval = interval
+        self.timeout = timeout
+        self.stale_after = stale_after
+        self._services: Dict[str, ServiceHealth] = {}
+        self._checked_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    async def _probe(self, check: Callable[[], Awaitable[bool]]) -> ServiceHealth:
+        start = time.perf_counter()
+        error = None
+        try:
+            healthy = await asyncio.wait_for(check(), self.timeout)
+        except asyncio.TimeoutError:
+            healthy, error = False, f"Timed out after {self.timeout}s"
+        except Exception as e:
+            healthy, error = False, str(e)
+        return ServiceHealth(
+            status="connected" if healthy else "disconnected",
+            latency_ms=round((time.perf_counter() - start) * 1000, 3),
+            checked_at=datetime.utcnow(),
+            error=error
+        )
+
+    async def check(self) -> Dict[str, ServiceHealth]:
+        """Probe every dependency concurrently and cache the results"""
+        async with self._lock:
+            results = await asyncio.gather(*(self._probe(check) for check in self.checks.values()))
+            self._services = dict(zip(self.checks, results))
+            self._checked_at = time.monotonic()
+            return self._services
+
+    def age(self) -> Optional[float]:
+        """Seconds since the last completed check, or None if none has run"""
+        return None if self._checked_at is None else time.monotonic() - self._checked_at
+
+    def services(self) -> Dict[str, ServiceHealth]:
+        return self._services
+
+    def readiness(self) -> ReadinessStatus:
+        """Cached readiness - never touches a dependency"""
+        age = self.age()
+        stale = age is None or age > self.stale_after
+        healthy = bool(self._services) and all(
+            service.status == "connected" for service in self._services.values()
+        )
+        return ReadinessStatus(
+            status="ready" if healthy and not stale else "not_ready",
+            stale=stale,
+            age_seconds=None if age is None else round(age, 3),
+            services=self._services
+        )
+
+    async def _check_forever(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.check()
+            except Exception:
+                logger.exception("Health check failed")
+
+    async def start(self):
+        """Run a first check, then keep checking in the background"""
+        if self._task is None or self._task.done():
+            await self.check()
+            self._task = asyncio.get_running_loop().create_task(self._check_forever())
+
+    async def stop(self):
+        """Cancel the background checker"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+_health_monitor: Optional[HealthMonitor] = None
+
+
+def get_health_monitor() -> HealthMonitor:
+    """Factory function for the process-wide health monitor"""
+    global _health_monitor
+    if _health_monitor is None:
+        from services.ldap_service import get_ldap_service
+        from services.database_service import get_database_service
+
+        _health_monitor = HealthMonitor(get_ldap_service(), get_database_service())
+    return _health_monitor
+
+
+async def shutdown_health_monitor():
+    """Stop the background checker and drop the shared instance"""
+    global _health_monitor
+    if _health_monitor is not None:
+        await _health_monitor.stop()
+        _health_monitor = None
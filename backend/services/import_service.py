@@ -0,0 +1,197 @@
+import csv
+import json
+from collections import deque
+from typing import IO, AsyncIterator, Deque, List, Optional, Tuple
+
+from pydantic import ValidationError
+
+from core.config import settings
+from models.schemas import UserRegistration
+from services.activity_log import ActivityLogWriter
+from services.interfaces import AsyncLDAPServiceAbstractClass, DatabaseServiceAbstractClass
+from services.login_guard import LoginGuard
+from services.uid_allocator import UIDAllocator
+from utils.validators import validate_user_registration_data
+
+
+IMPORT_FIELDS = ["username", "password", "email", "first_name", "last_name", "group"]
+
+# A parsed row: the field mapping, or None with a parse error message
+ParsedRow = Tuple[Optional[dict], Optional[str]]
+
+
+async def iter_file_lines(file: IO) -> AsyncIterator[str]:
+    """Yield decoded lines from a text or binary file object, without a leading byte order mark"""
+    first = True
+    for line in file:
+        if isinstance(line, bytes):
+            line = line.decode("utf-8-sig" if first else "utf-8")
+        elif first:
+            line = line.removeprefix("\ufeff")
+        first = False
+        yield line.rstrip("\r\n")
+
+
+class _RecordFeed:
+    """Lines of complete CSV records, handed to a single csv.reader as they arrive"""
+
+    def __init__(self):
+        self.lines: Deque[str] = deque()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        if not self.lines:
+            raise StopIteration
+        return self.lines.popleft()
+
+
+async def parse_csv(lines: AsyncIterator[str]) -> AsyncIterator[ParsedRow]:
+    """Parse CSV lines whose first line is a header naming the import fields.
+
+    A quoted field may span lines, so physical lines are collected until
+    their quotes balance and only whole records reach the reader.
+    """
+    feed = _RecordFeed()
+    reader = csv.reader(feed)
+    header: Optional[List[str]] = None
+    quotes = 0
+    async for line in lines:
+        if not quotes and not line.strip():
+            continue
+        feed.lines.append(line + "\n")
+        quotes += line.count('"')
+        if quotes % 2:
+            continue
+        quotes = 0
+        values = next(reader)
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        if len(values) != len(header):
+            yield None, f"Expected {len(header)} columns, got {len(values)}"
+            continue
+        yield dict(zip(header, values)), None
+    if quotes:
+        yield None, "Unterminated quoted field"
+
+
+async def parse_ndjson(lines: AsyncIterator[str]) -> AsyncIterator[ParsedRow]:
+    """Parse one JSON object per line"""
+    async for line in lines:
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield None, f"Invalid JSON: {e.msg}"
+            continue
+        if not isinstance(row, dict):
+            yield None, "Each line must be a JSON object"
+            continue
+        yield row, None
+
+
+PARSERS = {"csv": parse_csv, "ndjson": parse_ndjson}
+
+
+class UserImportService:
+    """Bulk user import - validates rows and creates users a batch at a time"""
+
+    def __init__(
+        self,
+        ldap_service: AsyncLDAPServiceAbstractClass,
+        db_service: DatabaseServiceAbstractClass,
+        activity_log: ActivityLogWriter,
+        uid_allocator: UIDAllocator,
+        login_guard: Optional[LoginGuard] = None,
+        batch_size: int = settings.USER_IMPORT_BATCH_SIZE
+    ):
+        self.ldap_service = ldap_service
+        self.db_service = db_service
+        self.activity_log = activity_log
+        self.uid_allocator = uid_allocator
+        self.login_guard = login_guard
+        self.batch_size = batch_size
+
+    @staticmethod
+    def _validate(row: dict) -> Tuple[Optional[UserRegistration], Optional[str]]:
+        """Apply the registration rules, returning the user or an error message"""
+        data = {field: str(row.get(field, "") or "") for field in IMPORT_FIELDS}
+        errors = validate_user_registration_data(data)
+        if errors:
+            return None, "; ".join(f"{field}: {message}" for field, message in errors.items())
+        try:
+            return UserRegistration(**data), None
+        except ValidationError as e:
+            return None, "; ".join(error["msg"] for error in e.errors())
+
+    async def import_rows(self, rows: AsyncIterator[ParsedRow]) -> AsyncIterator[dict]:
+        """Yield one result per input row as batches complete"""
+        batch: List[Tuple[int, UserRegistration]] = []
+        row_number = 0
+        async for row, parse_error in rows:
+            row_number += 1
+            user, error = (None, parse_error) if parse_error else self._validate(row)
+            if error:
+                username = row.get("username") if row else None
+                yield {"row": row_number, "username": username, "status": "error", "error": error}
+                continue
+
+            batch.append((row_number, user))
+            if len(batch) >= self.batch_size:
+                for result in await self._import_batch(batch):
+                    yield result
+                batch = []
+
+        if batch:
+            for result in await self._import_batch(batch):
+                yield result
+
+    async def _import_batch(self, batch: List[Tuple[int, UserRegistration]]) -> List[dict]:
+        """One UID range, one LDAP pass, one insert_many for the whole batch"""
+        first_uid = await self.uid_allocator.allocate(len(batch))
+        ldap_errors = await self.ldap_service.create_users(
+            [(user, first_uid + offset) for offset, (_, user) in enumerate(batch)]
+        )
+
+        created = [item for item, error in zip(batch, ldap_errors) if error is None]
+        db_errors = await self.db_service.create_users([
+            {
+                "username": user.username,
+                "email": user.email,
+                "first_name": user.first_name,
+                "last_name": user.last_name,
+            }
+            for _, user in created
+        ]) if created else []
+        db_error_by_row = {row: error for (row, _), error in zip(created, db_errors)}
+
+        results = []
+        for (row, user), ldap_error in zip(batch, ldap_errors):
+            error = ldap_error
+            if error is None and db_error_by_row.get(row):
+                error = f"Created in LDAP but not stored in database: {db_error_by_row[row]}"
+            if error:
+                results.append({"row": row, "username": user.username, "status": "error", "error": error})
+                continue
+            await self.activity_log.log_user_activity(user.username, "User account created")
+            if self.login_guard is not None:
+                await self.login_guard.reset(user.username)
+            results.append({"row": row, "username": user.username, "status": "created"})
+        return results
+
+
+def get_import_service() -> UserImportService:
+    """Factory function for the bulk import service"""
+    from services.ldap_service import get_ldap_service
+    from services.database_service import get_database_service
+    from services.activity_log import get_activity_log_writer
+    from services.uid_allocator import get_uid_allocator
+    from services.login_guard import get_login_guard
+
+    return UserImportService(
+        get_ldap_service(), get_database_service(), get_activity_log_writer(), get_uid_allocator(),
+        get_login_guard()
+    )
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 from models.schemas import UserRegistration, UserInfo
 
 
@@ -11,20 +11,114 @@ class LDAPServiceAbstractClass(ABC):
         """Authenticate user against LDAP"""
         pass
     
+    @abstractmethod
+    def authenticate_and_get_groups(self, username: str, password: str) -> Optional[List[str]]:
+        """Authenticate user and return their groups, or None if the credentials are rejected"""
+        pass
+    
     @abstractmethod
     def get_user_groups(self, username: str) -> List[str]:
         """Get user's group memberships"""
         pass
     
     @abstractmethod
-    def create_user(self, user_data: UserRegistration) -> bool:
-        """Create new user in LDAP"""
+    def create_user(self, user_data: UserRegistration, uid_number: Optional[int] = None) -> bool:
+        """Create new user in LDAP, scanning for a free UID number if none is given"""
         pass
     
     @abstractmethod
     def user_exists(self, username: str) -> bool:
         """Check if user exists in LDAP"""
         pass
+    
+    @abstractmethod
+    def user_is_missing(self, username: str) -> bool:
+        """True only when LDAP answers that the user does not exist"""
+        pass
+    
+    @abstractmethod
+    def get_groups_for_users(self, usernames: List[str]) -> Dict[str, List[str]]:
+        """Get the group memberships of just these users"""
+        pass
+    
+    @abstractmethod
+    def get_group_memberships(self) -> Dict[str, List[str]]:
+        """Get every user's group memberships with a single directory search"""
+        pass
+    
+    @abstractmethod
+    def get_group_member_counts(self) -> Dict[str, int]:
+        """Get the number of members of every group with a single directory search"""
+        pass
+    
+    @abstractmethod
+    def get_highest_uid_number(self) -> Optional[int]:
+        """Get the highest uidNumber in use, or None if there are no posix accounts"""
+        pass
+    
+    @abstractmethod
+    def create_users(self, users: List[Tuple[UserRegistration, int]]) -> List[Optional[str]]:
+        """Create many users, returning an error message or None per user"""
+        pass
+
+
+class AsyncLDAPServiceAbstractClass(ABC):
+    """Async LDAP Service Abstract Class - safe to await from the event loop"""
+    
+    @abstractmethod
+    async def authenticate_user(self, username: str, password: str) -> bool:
+        """Authenticate user against LDAP"""
+        pass
+    
+    @abstractmethod
+    async def authenticate_and_get_groups(self, username: str, password: str) -> Optional[List[str]]:
+        """Authenticate user and return their groups, or None if the credentials are rejected"""
+        pass
+    
+    @abstractmethod
+    async def get_user_groups(self, username: str) -> List[str]:
+        """Get user's group memberships"""
+        pass
+    
+    @abstractmethod
+    async def create_user(self, user_data: UserRegistration, uid_number: Optional[int] = None) -> bool:
+        """Create new user in LDAP, scanning for a free UID number if none is given"""
+        pass
+    
+    @abstractmethod
+    async def user_exists(self, username: str) -> bool:
+        """Check if user exists in LDAP"""
+        pass
+    
+    @abstractmethod
+    async def user_is_missing(self, username: str) -> bool:
+        """True only when LDAP answers that the user does not exist"""
+        pass
+    
+    @abstractmethod
+    async def get_groups_for_users(self, usernames: List[str]) -> Dict[str, List[str]]:
+        """Get the group memberships of just these users"""
+        pass
+    
+    @abstractmethod
+    async def get_group_memberships(self) -> Dict[str, List[str]]:
+        """Get every user's group memberships with a single directory search"""
+        pass
+    
+    @abstractmethod
+    async def get_group_member_counts(self) -> Dict[str, int]:
+        """Get the number of members of every group with a single directory search"""
+        pass
+    
+    @abstractmethod
+    async def get_highest_uid_number(self) -> Optional[int]:
+        """Get the highest uidNumber in use, or None if there are no posix accounts"""
+        pass
+    
+    @abstractmethod
+    async def create_users(self, users: List[Tuple[UserRegistration, int]]) -> List[Optional[str]]:
+        """Create many users, returning an error message or None per user"""
+        pass
 
 
 class DatabaseServiceAbstractClass(ABC):
@@ -35,6 +129,11 @@ class DatabaseServiceAbstractClass(ABC):
         """Create user in database"""
         pass
     
+    @abstractmethod
+    async def create_users(self, users_data: List[dict]) -> List[Optional[str]]:
+        """Create many users in database, returning an error message or None per user"""
+        pass
+    
     @abstractmethod
     async def get_user(self, username: str) -> Optional[dict]:
         """Get user from database"""
@@ -45,15 +144,99 @@ class DatabaseServiceAbstractClass(ABC):
         """Update user last login timestamp"""
         pass
     
+    @abstractmethod
+    async def record_login(self, username: str) -> Optional[dict]:
+        """Update last login and return the updated user document in one round trip"""
+        pass
+    
     @abstractmethod
     async def get_all_users(self) -> List[dict]:
         """Get all users from database"""
         pass
     
+    @abstractmethod
+    async def get_users_page(self, limit: int, after: Optional[str] = None) -> List[dict]:
+        """Get up to limit users ordered by username, starting after the given username"""
+        pass
+    
+    @abstractmethod
+    def iter_users(self, after: Optional[str] = None, limit: Optional[int] = None) -> AsyncIterator[dict]:
+        """Stream users ordered by username without materialising the collection"""
+        pass
+    
     @abstractmethod
     async def get_user_activities(self, username: str) -> List[dict]:
         """Get user activities from database"""
         pass
+    
+    @abstractmethod
+    async def log_user_activities(self, activities: List[dict]) -> bool:
+        """Write a batch of activity events"""
+        pass
+    
+    @abstractmethod
+    async def increment_counter(self, name: str, amount: int = 1) -> int:
+        """Atomically add amount to a named counter and return the new value"""
+        pass
+    
+    @abstractmethod
+    async def seed_counter(self, name: str, value: int) -> bool:
+        """Raise a named counter to at least value"""
+        pass
+    
+    @abstractmethod
+    async def create_session(self, session: dict) -> bool:
+        """Store a new refresh token session"""
+        pass
+    
+    @abstractmethod
+    async def get_session(self, session_id: str) -> Optional[dict]:
+        """Get a refresh token session by id"""
+        pass
+    
+    @abstractmethod
+    async def rotate_session(self, session_id: str, token_hash: str, new_token_hash: str) -> Optional[dict]:
+        """Swap a live session's token hash if it matches and return the session, or None - raises on database errors"""
+        pass
+    
+    @abstractmethod
+    async def delete_session(self, session_id: str) -> bool:
+        """Revoke a refresh token session"""
+        pass
+    
+    @abstractmethod
+    async def increment_expiring_counter(self, key: str, ttl: float) -> int:
+        """Add one to a counter that expires ttl seconds after it was created and return the new value"""
+        pass
+    
+    @abstractmethod
+    async def get_expiring_counters(self, keys: List[str]) -> Dict[str, int]:
+        """Get the live values of the given expiring counters - missing keys are left out"""
+        pass
+    
+    @abstractmethod
+    async def delete_expiring_counters(self, keys: List[str]) -> bool:
+        """Delete expiring counters"""
+        pass
+
+
+class CounterStoreAbstractClass(ABC):
+    """Expiring counter store backing the login limiter"""
+    
+    @abstractmethod
+    async def increment(self, key: str, ttl: float) -> int:
+        """Add one to a counter that expires ttl seconds after it was created and return the new value"""
+        pass
+    
+    @abstractmethod
+    async def get_many(self, keys: List[str]) -> Dict[str, int]:
+        """Get the live values of the given counters - missing keys are left out"""
+        pass
+    
+    @abstractmethod
+    async def delete(self, keys: List[str]):
+        """Delete counters"""
+        pass
 
 
 class AuthServiceAbstractClass(ABC):
@@ -65,10 +248,20 @@ class AuthServiceAbstractClass(ABC):
         pass
     
     @abstractmethod
-    async def authenticate_user(self, username: str, password: str) -> dict:
+    async def authenticate_user(self, username: str, password: str, client_ip: Optional[str] = None) -> dict:
         """Authenticate user and return token"""
         pass
     
+    @abstractmethod
+    async def refresh_access_token(self, refresh_token: str) -> dict:
+        """Exchange a refresh token for a new access token and a rotated refresh token"""
+        pass
+    
+    @abstractmethod
+    async def logout(self, username: str, session_id: Optional[str] = None):
+        """Revoke the refresh session behind an access token"""
+        pass
+    
     @abstractmethod
     async def get_current_user(self, username: str) -> UserInfo:
         """Get current user information"""
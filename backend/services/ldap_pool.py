@@ -0,0 +1,305 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
+
+import ldap
+from ldap.controls import SimplePagedResultsControl
+
+from core.config import settings
+
+
+T = TypeVar("T")
+
+
+class LDAPPoolTimeout(ldap.LDAPError):
+    """Raised when no pooled connection becomes available in time"""
+    pass
+
+
+def create_admin_connection(uri: str, bind_dn: str, bind_password: str):
+    """Open a new LDAP connection and bind it with the given credentials"""
+    conn = ldap.initialize(uri)
+    conn.protocol_version = ldap.VERSION3
+    conn.set_option(ldap.OPT_NETWORK_TIMEOUT, settings.LDAP_NETWORK_TIMEOUT)
+    conn.simple_bind_s(bind_dn, bind_password)
+    return conn
+
+
+def create_unbound_connection(uri: str, bind_dn: str = "", bind_password: str = ""):
+    """Open a new LDAP connection without binding - used for user binds"""
+    conn = ldap.initialize(uri)
+    conn.protocol_version = ldap.VERSION3
+    conn.set_option(ldap.OPT_NETWORK_TIMEOUT, settings.LDAP_NETWORK_TIMEOUT)
+    return conn
+
+
+def paged_search(
+    conn,
+    base: str,
+    scope: int,
+    filterstr: str = "(objectClass=*)",
+    attrlist: Optional[List[str]] = None,
+    page_size: int = settings.LDAP_PAGE_SIZE
+) -> Iterator[Tuple[str, Dict[str, List[bytes]]]]:
+    """Yield the entries of a search a page at a time with the Simple Paged Results control.
+
+    Only one page is held in memory and the server's sizelimit applies per
+    page. The connection stays busy until the generator is exhausted or closed.
+    """
+    control = SimplePagedResultsControl(True, size=page_size, cookie=b"")
+    cookie = None
+    try:
+        while True:
+            msgid = conn.search_ext(base, scope, filterstr, attrlist, serverctrls=[control])
+            _, entries, _, response_controls = conn.result3(msgid)
+            cookie = None
+            for response_control in response_controls or []:
+                if response_control.controlType == SimplePagedResultsControl.controlType:
+                    cookie = response_control.cookie
+            for dn, attrs in entries:
+                # Search references come back without a DN
+                if dn is not None:
+                    yield dn, attrs
+            if not cookie:
+                return
+            control.cookie = cookie
+    finally:
+        if cookie:
+            # Abandoned part-way - a zero-size request releases the server's paging state
+            control.size, control.cookie = 0, cookie
+            try:
+                conn.result3(conn.search_ext(base, scope, filterstr, attrlist, serverctrls=[control]))
+            except ldap.LDAPError:
+                pass
+
+
+class LDAPConnectionPool:
+    """Bounded pool of pre-bound LDAP connections shared across threads"""
+
+    def __init__(
+        self,
+        uri: str,
+        bind_dn: str,
+        bind_password: str,
+        size: int = settings.LDAP_POOL_SIZE,
+        acquire_timeout: float = settings.LDAP_POOL_ACQUIRE_TIMEOUT,
+        max_idle: float = settings.LDAP_POOL_MAX_IDLE_SECONDS,
+        health_check_interval: float = settings.LDAP_POOL_HEALTH_CHECK_INTERVAL,
+        connect: Optional[Callable[[str, str, str], object]] = None,
+    ):
+        self.uri = uri
+        self.bind_dn = bind_dn
+        self.bind_password = bind_password
+        self.size = max(1, size)
+        self.acquire_timeout = acquire_timeout
+        self.max_idle = max_idle
+        self.health_check_interval = health_check_interval
+        self._connect = connect or create_admin_connection
+
+        # Idle connections as (conn, last_used) - most recently used on the right
+        self._idle = deque()
+        self._cond = threading.Condition()
+        self._open = 0
+        self._closed = False
+
+    def _new_connection(self):
+        """Create a bound connection, releasing the reserved slot on failure"""
+        try:
+            return self._connect(self.uri, self.bind_dn, self.bind_password)
+        except Exception:
+            with self._cond:
+                self._open -= 1
+                self._cond.notify()
+            raise
+
+    def _evict_idle(self, now: float) -> list:
+        """Remove idle connections past max_idle - caller must hold the lock"""
+        expired = []
+        while self._idle and now - self._idle[0][1] > self.max_idle:
+            expired.append(self._idle.popleft()[0])
+            self._open -= 1
+        return expired
+
+    def _is_healthy(self, conn) -> bool:
+        """Cheap liveness probe for a connection that sat idle for a while"""
+        try:
+            conn.whoami_s()
+            return True
+        except ldap.LDAPError:
+            return False
+
+    def acquire(self):
+        """Check out a bound connection, opening a new one if below size"""
+        deadline = time.monotonic() + self.acquire_timeout
+        while True:
+            with self._cond:
+                if self._closed:
+                    raise ldap.SERVER_DOWN({"desc": "LDAP connection pool is closed"})
+
+                now = time.monotonic()
+                expired = self._evict_idle(now)
+                conn = None
+                last_used = now
+                reserved = False
+                if self._idle:
+                    conn, last_used = self._idle.pop()
+                elif self._open < self.size:
+                    self._open += 1
+                    reserved = True
+                else:
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        raise LDAPPoolTimeout({"desc": "Timed out waiting for an LDAP connection"})
+                    self._cond.wait(remaining)
+
+            for stale in expired:
+                self._unbind_quietly(stale)
+
+            if reserved:
+                return self._new_connection()
+
+            if conn is None:
+                continue
+
+            if now - last_used > self.health_check_interval and not self._is_healthy(conn):
+                self.release(conn, discard=True)
+                continue
+
+            return conn
+
+    def release(self, conn, discard: bool = False):
+        """Return a connection to the pool, or drop it if it is broken"""
+        with self._cond:
+            if discard or self._closed:
+                self._open -= 1
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+        if discard or self._closed:
+            self._unbind_quietly(conn)
+
+    def discard_idle(self):
+        """Unbind every idle connection - after SERVER_DOWN they are most likely dead too"""
+        with self._cond:
+            idle = [conn for conn, _ in self._idle]
+            self._idle.clear()
+            self._open -= len(idle)
+            self._cond.notify_all()
+
+        for conn in idle:
+            self._unbind_quietly(conn)
+
+    @contextmanager
+    def connection(self):
+        """Context manager yielding a pooled connection"""
+        conn = self.acquire()
+        try:
+            yield conn
+        except ldap.SERVER_DOWN:
+            self.release(conn, discard=True)
+            self.discard_idle()
+            raise
+        except BaseException:
+            self.release(conn)
+            raise
+        else:
+            self.release(conn)
+
+    def run(self, operation: Callable[[object], T]) -> T:
+        """Run operation(conn) on a pooled connection, reconnecting once on SERVER_DOWN"""
+        try:
+            with self.connection() as conn:
+                return operation(conn)
+        except ldap.SERVER_DOWN:
+            # The idle connections were dropped with the failed one, so this opens a new one
+            with self.connection() as conn:
+                return operation(conn)
+
+    def warm(self, count: int):
+        """Pre-open up to count connections so the first requests skip connect and bind"""
+        conns = []
+        try:
+            for _ in range(min(count, self.size)):
+                conns.append(self.acquire())
+        finally:
+            for conn in conns:
+                self.release(conn)
+
+    def stats(self) -> dict:
+        """Current pool utilisation"""
+        with self._cond:
+            idle = len(self._idle)
+            return {
+                "size": self.size,
+                "open": self._open,
+                "idle": idle,
+                "in_use": self._open - idle,
+            }
+
+    def close(self):
+        """Unbind all idle connections and refuse further checkouts"""
+        with self._cond:
+            self._closed = True
+        self.discard_idle()
+
+    @staticmethod
+    def _unbind_quietly(conn):
+        try:
+            conn.unbind_s()
+        except Exception:
+            pass
+
+
+_pool: Optional[LDAPConnectionPool] = None
+_user_bind_pool: Optional[LDAPConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_ldap_pool() -> LDAPConnectionPool:
+    """Return the process-wide admin connection pool, creating it on first use"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = LDAPConnectionPool(
+                    uri=f"ldap://{settings.LDAP_HOST}:{settings.LDAP_PORT}",
+                    bind_dn=settings.LDAP_ADMIN_DN,
+                    bind_password=settings.LDAP_ADMIN_PASSWORD,
+                )
+    return _pool
+
+
+def get_user_bind_pool() -> LDAPConnectionPool:
+    """Return the process-wide pool of connections that are rebound per login"""
+    global _user_bind_pool
+    if _user_bind_pool is None:
+        with _pool_lock:
+            if _user_bind_pool is None:
+                _user_bind_pool = LDAPConnectionPool(
+                    uri=f"ldap://{settings.LDAP_HOST}:{settings.LDAP_PORT}",
+                    bind_dn="",
+                    bind_password="",
+                    size=settings.LDAP_USER_BIND_POOL_SIZE,
+                    connect=create_unbound_connection,
+                )
+    return _user_bind_pool
+
+
+def get_pool_stats() -> Dict[str, dict]:
+    """Utilisation of each process-wide pool that has been created"""
+    pools = {"admin": _pool, "user_bind": _user_bind_pool}
+    return {name: pool.stats() for name, pool in pools.items() if pool is not None}
+
+
+def close_ldap_pool():
+    """Close the process-wide pools if they were created"""
+    global _pool, _user_bind_pool
+    with _pool_lock:
+        for pool in (_pool, _user_bind_pool):
+            if pool is not None:
+                pool.close()
+        _pool = None
+        _user_bind_pool = None
@@ -1,18 +1,49 @@
+import asyncio
+import functools
+import threading
 import ldap
+import ldap.dn
 import ldap.modlist as modlist
-from typing import List
+from ldap.controls.libldap import MatchedValuesControl
+from ldap.filter import escape_filter_chars
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
 from fastapi import HTTPException
 
 from core.config import settings
 from core.security import security_service
-from services.interfaces import LDAPServiceAbstractClass
+from services.directory_mirror import DirectoryMirror, get_directory_mirror
+from services.interfaces import LDAPServiceAbstractClass, AsyncLDAPServiceAbstractClass
+from services.ldap_pool import LDAPConnectionPool, get_ldap_pool, get_user_bind_pool, close_ldap_pool, paged_search
 from models.schemas import UserRegistration
+from utils.cache import TTLCache
+from utils.logger import get_logger
+from utils.metrics import instrument, record_backend_error
+
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
 
 
 class LDAPService(LDAPServiceAbstractClass):
     """LDAP Service"""
     
-    def __init__(self):
+    def __init__(
+        self,
+        pool: Optional[LDAPConnectionPool] = None,
+        group_cache: Optional[TTLCache] = None,
+        user_bind_pool: Optional[LDAPConnectionPool] = None,
+        mirror: Optional[DirectoryMirror] = None
+    ):
+        self.pool = pool or get_ldap_pool()
+        self.user_bind_pool = user_bind_pool or get_user_bind_pool()
+        # None until the first login shows whether the memberOf overlay is present
+        self.memberof_supported: Optional[bool] = None if settings.LDAP_USE_MEMBEROF else False
+        self.group_cache = group_cache if group_cache is not None else get_group_cache()
+        # Answers existence and group lookups from memory while it is fresh
+        self.mirror = mirror
         self.host = settings.LDAP_HOST
         self.port = settings.LDAP_PORT
         self.base_dn = settings.LDAP_BASE_DN
@@ -20,132 +51,437 @@ class LDAPService(LDAPServiceAbstractClass):
         self.admin_password = settings.LDAP_ADMIN_PASSWORD
         self.users_ou = settings.LDAP_USERS_OU
         self.groups_ou = settings.LDAP_GROUPS_OU
+        self.page_size = settings.LDAP_PAGE_SIZE
+        self.member_filter_batch_size = max(1, settings.LDAP_MEMBER_FILTER_BATCH_SIZE)
 
+    @contextmanager
     def _get_connection(self):
-        """Get LDAP connection"""
+        """Borrow a pre-bound admin connection from the shared pool"""
         try:
-            conn = ldap.initialize(f"ldap://{self.host}:{self.port}")
-            conn.protocol_version = ldap.VERSION3
-            conn.simple_bind_s(self.admin_dn, self.admin_password)
-            return conn
+            conn = self.pool.acquire()
         except ldap.LDAPError as e:
             raise HTTPException(status_code=500, detail=f"LDAP connection error: {str(e)}")
 
+        discard = False
+        try:
+            yield conn
+        except ldap.SERVER_DOWN:
+            discard = True
+            raise
+        finally:
+            self.pool.release(conn, discard=discard)
+            if discard:
+                self.pool.discard_idle()
+
+    def _scan(self, conn, base: str, filterstr: str, attrlist: List[str]):
+        """Page through a subtree search on an already bound connection"""
+        return paged_search(conn, base, ldap.SCOPE_SUBTREE, filterstr, attrlist, self.page_size)
+
+    def health_check(self) -> bool:
+        """Check LDAP connection health"""
+        try:
+            self.pool.run(lambda conn: conn.whoami_s())
+            return True
+        except ldap.LDAPError:
+            record_backend_error("ldap", "health_check")
+            return False
+
+    def warm_up(self, connections: int = settings.LDAP_POOL_WARM_SIZE) -> bool:
+        """Open and bind pooled connections ahead of the first request"""
+        try:
+            self.pool.warm(connections)
+            return True
+        except ldap.LDAPError:
+            record_backend_error("ldap", "warm_up")
+            return False
+
     def authenticate_user(self, username: str, password: str) -> bool:
         """Authenticate user against LDAP"""
         try:
-            conn = ldap.initialize(f"ldap://{self.host}:{self.port}")
-            conn.protocol_version = ldap.VERSION3
-            print(f"Authenticating user {username} against LDAP")
+            logger.debug("Authenticating user %s against LDAP", username)
             user_dn = f"uid={username},{self.users_ou},{self.base_dn}"
-            conn.simple_bind_s(user_dn, password)
-            conn.unbind()
+            self.user_bind_pool.run(lambda conn: conn.simple_bind_s(user_dn, password))
             return True
         except ldap.INVALID_CREDENTIALS:
             return False
         except ldap.LDAPError:
+            record_backend_error("ldap", "authenticate_user")
             return False
 
+    def authenticate_and_get_groups(self, username: str, password: str) -> Optional[List[str]]:
+        """Bind as the user and read their groups on the same connection.
+
+        With the memberOf overlay this is one bind plus one base-scope read of
+        the user's own entry. Returns None when the credentials are rejected.
+        """
+        user_dn = f"uid={username},{self.users_ou},{self.base_dn}"
+
+        def bind_and_read(conn) -> Optional[List[str]]:
+            conn.simple_bind_s(user_dn, password)
+            if self.memberof_supported is False:
+                return None
+            try:
+                result = conn.search_s(user_dn, ldap.SCOPE_BASE, "(objectClass=*)", ['memberOf'])
+            except ldap.LDAPError:
+                # The bind succeeded; the user just cannot read their own entry
+                return None
+            member_of = result[0][1].get('memberOf', []) if result else []
+            return self._groups_from_dns(member_of) if member_of else None
+
+        try:
+            groups = self.user_bind_pool.run(bind_and_read)
+        except ldap.INVALID_CREDENTIALS:
+            return None
+
+        if groups is not None:
+            self.memberof_supported = True
+            self.group_cache.set(username, tuple(groups))
+            return groups
+
+        # No memberOf values: either the overlay is absent or the user has no groups
+        self.group_cache.invalidate(username)
+        groups = self.get_user_groups(username)
+        if groups and self.memberof_supported is None:
+            self.memberof_supported = False
+        return groups
+
+    def _groups_from_dns(self, group_dns: List[bytes]) -> List[str]:
+        """Extract group names from memberOf DNs under the groups OU"""
+        groups_suffix = f"{self.groups_ou},{self.base_dn}".lower()
+        groups = []
+        for group_dn in group_dns:
+            try:
+                rdns = ldap.dn.str2dn(group_dn.decode('utf-8'))
+            except ldap.DECODING_ERROR:
+                continue
+            if rdns and rdns[0][0][0].lower() == 'cn' and ldap.dn.dn2str(rdns[1:]).lower() == groups_suffix:
+                groups.append(rdns[0][0][1])
+        return groups
+
     def get_user_groups(self, username: str) -> List[str]:
         """Get user's group memberships"""
+        if self.mirror is not None:
+            groups = self.mirror.get_user_groups(username)
+            if groups is not None:
+                return groups
+
+        cached = self.group_cache.get(username)
+        if cached is not None:
+            return list(cached)
+
+        return self.search_user_groups(username)
+
+    def search_user_groups(self, username: str) -> List[str]:
+        """Search LDAP for the user's groups without consulting the cache, then cache them"""
+        search_filter = f"(&(objectClass=groupOfNames)(member=uid={username},{self.users_ou},{self.base_dn}))"
         try:
-            conn = self._get_connection()
-            search_filter = f"(&(objectClass=groupOfNames)(member=uid={username},{self.users_ou},{self.base_dn}))"
-            result = conn.search_s(f"{self.groups_ou},{self.base_dn}", ldap.SCOPE_SUBTREE, search_filter, ['cn'])
+            result = self.pool.run(
+                lambda conn: conn.search_s(f"{self.groups_ou},{self.base_dn}", ldap.SCOPE_SUBTREE, search_filter, ['cn'])
+            )
             
             groups = []
             for dn, attrs in result:
                 if 'cn' in attrs:
                     groups.extend([group.decode('utf-8') for group in attrs['cn']])
             
-            conn.unbind()
+            self.group_cache.set(username, tuple(groups))
             return groups
         except ldap.LDAPError as e:
             raise HTTPException(status_code=500, detail=f"Error getting user groups: {str(e)}")
 
+    def get_groups_for_users(self, usernames: List[str]) -> Dict[str, List[str]]:
+        """Get the group memberships of just these users.
+
+        Answers from the mirror or the group cache where it can, and looks the
+        rest up with one group search per LDAP_MEMBER_FILTER_BATCH_SIZE
+        users, so the cost follows the number of users asked about rather
+        than the size of the directory.
+        """
+        groups: Dict[str, List[str]] = {}
+        missing: List[str] = []
+        for username in usernames:
+            found = self.mirror.get_user_groups(username) if self.mirror is not None else None
+            if found is None:
+                cached = self.group_cache.get(username)
+                found = list(cached) if cached is not None else None
+            if found is None:
+                missing.append(username)
+            else:
+                groups[username] = found
+
+        try:
+            for start in range(0, len(missing), self.member_filter_batch_size):
+                batch = missing[start:start + self.member_filter_batch_size]
+                found = self.pool.run(lambda conn: self._search_groups_for_users(conn, batch))
+                for username in batch:
+                    groups[username] = found.get(username, [])
+                    self.group_cache.set(username, tuple(groups[username]))
+        except ldap.LDAPError as e:
+            raise HTTPException(status_code=500, detail=f"Error getting user groups: {str(e)}")
+        return groups
+
+    def _search_groups_for_users(self, conn, usernames: List[str]) -> Dict[str, List[str]]:
+        """One search for the groups listing any of usernames as a member"""
+        people = f"{self.users_ou},{self.base_dn}"
+        member_filters = "".join(
+            f"(member={escape_filter_chars(f'uid={username},{people}')})" for username in usernames
+        )
+        # Without the control every member of each matching group would come back; servers
+        # that ignore it still give correct results since members are filtered below
+        control = MatchedValuesControl(criticality=False, filterstr=f"((cn=*){member_filters})")
+        msgid = conn.search_ext(
+            f"{self.groups_ou},{self.base_dn}", ldap.SCOPE_SUBTREE,
+            f"(&(objectClass=groupOfNames)(|{member_filters}))", ['cn', 'member'],
+            serverctrls=[control]
+        )
+        _, entries, _, _ = conn.result3(msgid)
+
+        wanted = set(usernames)
+        memberships: Dict[str, List[str]] = {}
+        for dn, attrs in entries:
+            if dn is None:
+                continue
+            group_names = [group.decode('utf-8') for group in attrs.get('cn', [])]
+            for member in attrs.get('member', []):
+                username = self._username_from_dn(member.decode('utf-8'))
+                if username in wanted:
+                    memberships.setdefault(username, []).extend(group_names)
+        return memberships
+
+    def get_group_memberships(self) -> Dict[str, List[str]]:
+        """Get every user's group memberships with a single directory search"""
+        if self.mirror is not None:
+            memberships = self.mirror.get_group_memberships()
+            if memberships is not None:
+                return memberships
+
+        try:
+            return self.pool.run(self._get_group_memberships)
+        except ldap.LDAPError as e:
+            raise HTTPException(status_code=500, detail=f"Error getting group memberships: {str(e)}")
+
+    def _scan_groups(self, conn) -> Iterator[Tuple[List[str], List[str]]]:
+        """Page through every group, yielding its names and the usernames of its members"""
+        groups_base = f"{self.groups_ou},{self.base_dn}"
+        for dn, attrs in self._scan(conn, groups_base, "(objectClass=groupOfNames)", ['cn', 'member']):
+            group_names = [group.decode('utf-8') for group in attrs.get('cn', [])]
+            usernames = [self._username_from_dn(member.decode('utf-8')) for member in attrs.get('member', [])]
+            yield group_names, [username for username in usernames if username is not None]
+
+    def _get_group_memberships(self, conn) -> Dict[str, List[str]]:
+        memberships: Dict[str, List[str]] = {}
+        for group_names, usernames in self._scan_groups(conn):
+            for username in usernames:
+                memberships.setdefault(username, []).extend(group_names)
+        return memberships
+
+    def get_group_member_counts(self) -> Dict[str, int]:
+        """Get the number of user members of every group with a single directory search"""
+        if self.mirror is not None:
+            counts = self.mirror.get_group_member_counts()
+            if counts is not None:
+                return counts
+
+        try:
+            return self.pool.run(self._get_group_member_counts)
+        except ldap.LDAPError as e:
+            raise HTTPException(status_code=500, detail=f"Error counting group members: {str(e)}")
+
+    def _get_group_member_counts(self, conn) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for group_names, usernames in self._scan_groups(conn):
+            for group in group_names:
+                counts[group] = len(usernames)
+        return counts
+
+    def _username_from_dn(self, dn: str) -> Optional[str]:
+        """Extract the uid from a member DN under the people OU"""
+        try:
+            rdns = ldap.dn.str2dn(dn)
+        except ldap.DECODING_ERROR:
+            return None
+
+        if not rdns or rdns[0][0][0].lower() != 'uid':
+            return None
+        parent = ldap.dn.dn2str(rdns[1:])
+        if parent.lower() != f"{self.users_ou},{self.base_dn}".lower():
+            return None
+        return rdns[0][0][1]
+
     def user_exists(self, username: str) -> bool:
         """Check if user exists in LDAP"""
+        if self.mirror is not None:
+            exists = self.mirror.user_exists(username)
+            if exists is not None:
+                return exists
+
+        try:
+            return self.pool.run(lambda conn: self._user_exists(conn, username))
+        except ldap.LDAPError:
+            record_backend_error("ldap", "user_exists")
+            return False
+
+    def user_is_missing(self, username: str) -> bool:
+        """True only when LDAP answers that the user does not exist - an error is not an answer"""
+        if self.mirror is not None:
+            exists = self.mirror.user_exists(username)
+            if exists is not None:
+                return not exists
+
+        try:
+            return not self.pool.run(lambda conn: self._user_exists(conn, username))
+        except ldap.LDAPError:
+            record_backend_error("ldap", "user_is_missing")
+            return False
+
+    def _user_exists(self, conn, username: str) -> bool:
+        """Check if user exists using an already bound connection"""
         try:
-            conn = self._get_connection()
             result = conn.search_s(
                 f"uid={username},{self.users_ou},{self.base_dn}", 
-                ldap.SCOPE_BASE
+                ldap.SCOPE_BASE,
+                "(objectClass=*)",
+                ['1.1']
             )
-            conn.unbind()
             return len(result) > 0
         except ldap.NO_SUCH_OBJECT:
             return False
-        except ldap.LDAPError:
-            return False
 
-    def create_user(self, user_data: UserRegistration) -> bool:
-        """Create new user in LDAP"""
+    def create_user(self, user_data: UserRegistration, uid_number: Optional[int] = None) -> bool:
+        """Create new user in LDAP, scanning for a free UID number if none is given"""
         try:
-            conn = self._get_connection()
-            
-            # Check if user already exists
-            if self.user_exists(user_data.username):
-                raise HTTPException(status_code=400, detail="User already exists")
-            
-            # Get next UID number
+            with self._get_connection() as conn:
+                return self._create_user(conn, user_data, uid_number)
+        except ldap.LDAPError as e:
+            raise HTTPException(status_code=500, detail=f"Error creating user: {str(e)}")
+
+    def _create_user(self, conn, user_data: UserRegistration, uid_number: Optional[int] = None) -> bool:
+        """Create new user on an already bound connection"""
+        self.group_cache.invalidate(user_data.username)
+
+        # Check if user already exists
+        if self._user_exists(conn, user_data.username):
+            raise HTTPException(status_code=400, detail="User already exists")
+        
+        # Fall back to scanning for the next UID number when none was allocated
+        if uid_number is None:
             uid_number = self._get_next_uid_number(conn)
-            
-            password = user_data.password  # Store plaintext for LDAP authentication
-            
-            # Create user entry
+        
+        # Create user entry
+        user_dn = f"uid={user_data.username},{self.users_ou},{self.base_dn}"
+        attrs = self._user_entry_attrs(user_data, uid_number)
+        
+        ldif = modlist.addModlist(attrs)
+        conn.add_s(user_dn, ldif)
+        if self.mirror is not None:
+            self.mirror.add_user(user_data.username)
+        
+        # Add user to specified group
+        self._add_user_to_group(conn, user_data.username, user_data.group)
+        
+        return True
+
+    def _user_entry_attrs(self, user_data: UserRegistration, uid_number: int) -> Dict[str, List[bytes]]:
+        """Build the attributes of a posix user entry"""
+        password = user_data.password  # Store plaintext for LDAP authentication
+        return {
+            'objectClass': [b'inetOrgPerson', b'posixAccount', b'shadowAccount'],
+            'cn': [user_data.username.encode('utf-8')],
+            'sn': [user_data.last_name.encode('utf-8')],
+            'givenName': [user_data.first_name.encode('utf-8')],
+            'displayName': [f"{user_data.first_name} {user_data.last_name}".encode('utf-8')],
+            'uid': [user_data.username.encode('utf-8')],
+            'uidNumber': [str(uid_number).encode('utf-8')],
+            'gidNumber': [str(uid_number).encode('utf-8')],
+            'homeDirectory': [f"/home/{user_data.username}".encode('utf-8')],
+            'loginShell': [b'/bin/bash'],
+            'mail': [user_data.email.encode('utf-8')],
+            'userPassword': [password.encode('utf-8')]
+        }
+
+    def create_users(self, users: List[Tuple[UserRegistration, int]]) -> List[Optional[str]]:
+        """Create many users on one connection with one member modify per group"""
+        try:
+            with self._get_connection() as conn:
+                return self._create_users(conn, users)
+        except ldap.LDAPError as e:
+            record_backend_error("ldap", "create_users")
+            return [f"Error creating user: {str(e)}"] * len(users)
+
+    def _create_users(self, conn, users: List[Tuple[UserRegistration, int]]) -> List[Optional[str]]:
+        """Add each entry, then batch the group memberships of the ones that succeeded"""
+        errors: List[Optional[str]] = []
+        members_by_group: Dict[str, List[str]] = {}
+        
+        for user_data, uid_number in users:
             user_dn = f"uid={user_data.username},{self.users_ou},{self.base_dn}"
-            attrs = {
-                'objectClass': [b'inetOrgPerson', b'posixAccount', b'shadowAccount'],
-                'cn': [user_data.username.encode('utf-8')],
-                'sn': [user_data.last_name.encode('utf-8')],
-                'givenName': [user_data.first_name.encode('utf-8')],
-                'displayName': [f"{user_data.first_name} {user_data.last_name}".encode('utf-8')],
-                'uid': [user_data.username.encode('utf-8')],
-                'uidNumber': [str(uid_number).encode('utf-8')],
-                'gidNumber': [str(uid_number).encode('utf-8')],
-                'homeDirectory': [f"/home/{user_data.username}".encode('utf-8')],
-                'loginShell': [b'/bin/bash'],
-                'mail': [user_data.email.encode('utf-8')],
-                'userPassword': [password.encode('utf-8')]
-            }
-            
-            ldif = modlist.addModlist(attrs)
-            conn.add_s(user_dn, ldif)
-            
-            # Add user to specified group
-            self._add_user_to_group(conn, user_data.username, user_data.group)
-            
-            conn.unbind()
-            return True
-            
+            try:
+                conn.add_s(user_dn, modlist.addModlist(self._user_entry_attrs(user_data, uid_number)))
+            except ldap.ALREADY_EXISTS:
+                errors.append("User already exists")
+                continue
+            except ldap.SERVER_DOWN:
+                raise
+            except ldap.LDAPError as e:
+                errors.append(f"Error creating user: {str(e)}")
+                continue
+            errors.append(None)
+            if self.mirror is not None:
+                self.mirror.add_user(user_data.username)
+            members_by_group.setdefault(user_data.group, []).append(user_data.username)
+        
+        for group_name, usernames in members_by_group.items():
+            try:
+                self._add_users_to_group(conn, usernames, group_name)
+            except HTTPException as e:
+                failed = set(usernames)
+                for index, (user_data, _) in enumerate(users):
+                    if errors[index] is None and user_data.username in failed:
+                        errors[index] = e.detail
+        
+        return errors
+
+    def get_highest_uid_number(self) -> Optional[int]:
+        """Get the highest uidNumber in use, or None if there are no posix accounts"""
+        try:
+            return self.pool.run(self._get_highest_uid_number)
         except ldap.LDAPError as e:
-            raise HTTPException(status_code=500, detail=f"Error creating user: {str(e)}")
+            raise HTTPException(status_code=500, detail=f"Error reading UID numbers: {str(e)}")
+
+    def _get_highest_uid_number(self, conn) -> Optional[int]:
+        """Scan every posixAccount for the highest uidNumber, a page at a time"""
+        highest = None
+        users_base = f"{self.users_ou},{self.base_dn}"
+        for dn, attrs in self._scan(conn, users_base, "(objectClass=posixAccount)", ['uidNumber']):
+            if 'uidNumber' in attrs:
+                uid_number = int(attrs['uidNumber'][0].decode('utf-8'))
+                if highest is None or uid_number > highest:
+                    highest = uid_number
+        
+        return highest
 
     def _get_next_uid_number(self, conn) -> int:
         """Get next available UID number"""
         try:
-            result = conn.search_s(
-                f"{self.users_ou},{self.base_dn}", 
-                ldap.SCOPE_SUBTREE, 
-                "(objectClass=posixAccount)", 
-                ['uidNumber']
-            )
-            
-            uid_numbers = []
-            for dn, attrs in result:
-                if 'uidNumber' in attrs:
-                    uid_numbers.append(int(attrs['uidNumber'][0].decode('utf-8')))
-            
-            return max(uid_numbers) + 1 if uid_numbers else 1001
-            
+            highest = self._get_highest_uid_number(conn)
+            return highest + 1 if highest is not None else 1001
         except ldap.LDAPError:
             return 1001
 
     def _add_user_to_group(self, conn, username: str, group_name: str):
         """Add user to a group - private method"""
+        self._add_users_to_group(conn, [username], group_name)
+
+    def _add_users_to_group(self, conn, usernames: List[str], group_name: str):
+        """Add users to a group with a single modify, creating the group if needed"""
+        for username in usernames:
+            self.group_cache.invalidate(username)
         try:
             group_dn = f"cn={group_name},{self.groups_ou},{self.base_dn}"
-            user_dn = f"uid={username},{self.users_ou},{self.base_dn}"
+            user_dns = [
+                f"uid={username},{self.users_ou},{self.base_dn}".encode('utf-8')
+                for username in usernames
+            ]
             
             # Check if group exists, create if not
             try:
@@ -156,22 +492,183 @@ class LDAPService(LDAPServiceAbstractClass):
                     'objectClass': [b'groupOfNames'],
                     'cn': [group_name.encode('utf-8')],
                     'description': [f"{group_name} group".encode('utf-8')],
-                    'member': [user_dn.encode('utf-8')]
+                    'member': user_dns
                 }
                 ldif = modlist.addModlist(attrs)
                 conn.add_s(group_dn, ldif)
+                self._mirror_members(group_name, usernames)
                 return
             
-            # Add user to existing group
-            mod_attrs = [(ldap.MOD_ADD, 'member', [user_dn.encode('utf-8')])]
-            conn.modify_s(group_dn, mod_attrs)
+            # Add users to existing group
+            mod_attrs = [(ldap.MOD_ADD, 'member', user_dns)]
+            try:
+                conn.modify_s(group_dn, mod_attrs)
+                self._mirror_members(group_name, usernames)
+            except ldap.TYPE_OR_VALUE_EXISTS:
+                if len(usernames) == 1:
+                    raise
+                # Some are members already - fall back to one modify per user
+                for username in usernames:
+                    self._add_users_to_group(conn, [username], group_name)
             
         except ldap.LDAPError as e:
             # If user is already in group, ignore the error
-            if "Attribute or value exists" not in str(e):
+            if not isinstance(e, ldap.TYPE_OR_VALUE_EXISTS) and "Attribute or value exists" not in str(e):
                 raise HTTPException(status_code=500, detail=f"Error adding user to group: {str(e)}")
+        finally:
+            # Drop any lookup cached while the modify was in flight and
+            # stop trusting group claims already signed into tokens
+            for username in usernames:
+                self.group_cache.invalidate(username)
+                security_service.revoke_claims(username)
+
+
+    def _mirror_members(self, group_name: str, usernames: List[str]):
+        if self.mirror is not None:
+            self.mirror.add_members(group_name, usernames)
+
+
+class AsyncLDAPService(AsyncLDAPServiceAbstractClass):
+    """Async LDAP Service - runs the blocking python-ldap calls on a bounded thread pool"""
+    
+    def __init__(self, ldap_service: Optional[LDAPService] = None, executor: Optional[ThreadPoolExecutor] = None):
+        self.sync = ldap_service or LDAPService()
+        self.executor = executor or get_ldap_executor()
+
+    async def _run(self, func: Callable[..., T], *args) -> T:
+        """Run a blocking LDAP call off the event loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(func, *args))
+
+    async def health_check(self) -> bool:
+        """Check LDAP connection health"""
+        return await self._run(self.sync.health_check)
+
+    async def warm_up(self) -> bool:
+        """Open and bind pooled connections ahead of the first request"""
+        return await self._run(self.sync.warm_up)
+
+    async def authenticate_user(self, username: str, password: str) -> bool:
+        """Authenticate user against LDAP"""
+        return await self._run(self.sync.authenticate_user, username, password)
+
+    async def authenticate_and_get_groups(self, username: str, password: str) -> Optional[List[str]]:
+        """Bind as the user and read their groups, or None if the credentials are rejected"""
+        return await self._run(self.sync.authenticate_and_get_groups, username, password)
+
+    async def get_user_groups(self, username: str) -> List[str]:
+        """Get user's group memberships"""
+        # Answer from memory without a thread hop when possible
+        mirror = self.sync.mirror
+        if mirror is not None and mirror.is_fresh():
+            groups = mirror.get_user_groups(username)
+            if groups is not None:
+                return groups
+        cached = self.sync.group_cache.get(username)
+        if cached is not None:
+            return list(cached)
+        # The cache was just checked - a second lookup would count this miss twice
+        return await self._run(self.sync.search_user_groups, username)
+
+    async def user_exists(self, username: str) -> bool:
+        """Check if user exists in LDAP"""
+        mirror = self.sync.mirror
+        if mirror is not None and mirror.existence_is_fresh():
+            exists = mirror.user_exists(username)
+            if exists is not None:
+                return exists
+        return await self._run(self.sync.user_exists, username)
+
+    async def user_is_missing(self, username: str) -> bool:
+        """True only when LDAP answers that the user does not exist"""
+        mirror = self.sync.mirror
+        if mirror is not None and mirror.existence_is_fresh():
+            exists = mirror.user_exists(username)
+            if exists is not None:
+                return not exists
+        return await self._run(self.sync.user_is_missing, username)
+
+    async def create_user(self, user_data: UserRegistration, uid_number: Optional[int] = None) -> bool:
+        """Create new user in LDAP, scanning for a free UID number if none is given"""
+        return await self._run(self.sync.create_user, user_data, uid_number)
+
+    async def get_groups_for_users(self, usernames: List[str]) -> Dict[str, List[str]]:
+        """Get the group memberships of just these users"""
+        return await self._run(self.sync.get_groups_for_users, usernames)
+
+    async def get_group_memberships(self) -> Dict[str, List[str]]:
+        """Get every user's group memberships with a single directory search"""
+        return await self._run(self.sync.get_group_memberships)
+
+    async def get_group_member_counts(self) -> Dict[str, int]:
+        """Get the number of members of every group with a single directory search"""
+        return await self._run(self.sync.get_group_member_counts)
+
+    async def get_highest_uid_number(self) -> Optional[int]:
+        """Get the highest uidNumber in use, or None if there are no posix accounts"""
+        return await self._run(self.sync.get_highest_uid_number)
+
+    async def create_users(self, users: List[Tuple[UserRegistration, int]]) -> List[Optional[str]]:
+        """Create many users with one member modify per group"""
+        return await self._run(self.sync.create_users, users)
+
+
+_ldap_service: Optional[AsyncLDAPService] = None
+_group_cache: Optional[TTLCache] = None
+_executor: Optional[ThreadPoolExecutor] = None
+_singleton_lock = threading.RLock()
+
+
+def get_group_cache() -> TTLCache:
+    """Return the process-wide username -> groups cache"""
+    global _group_cache
+    if _group_cache is None:
+        with _singleton_lock:
+            if _group_cache is None:
+                size = settings.LDAP_GROUP_CACHE_SIZE if settings.LDAP_GROUP_CACHE_TTL > 0 else 0
+                _group_cache = TTLCache(maxsize=size, ttl=settings.LDAP_GROUP_CACHE_TTL)
+    return _group_cache
+
+
+def get_ldap_executor() -> ThreadPoolExecutor:
+    """Return the process-wide thread pool for blocking LDAP calls"""
+    global _executor
+    if _executor is None:
+        with _singleton_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.LDAP_EXECUTOR_WORKERS,
+                    thread_name_prefix="ldap"
+                )
+    return _executor
+
+
+def shutdown_ldap_executor():
+    """Stop the LDAP thread pool if it was created"""
+    global _executor
+    with _singleton_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
+
+
+def get_ldap_service() -> AsyncLDAPServiceAbstractClass:
+    """Factory function for LDAP service - hands out the shared instance"""
+    global _ldap_service
+    if _ldap_service is None:
+        with _singleton_lock:
+            if _ldap_service is None:
+                ldap_service = LDAPService(mirror=get_directory_mirror())
+                if settings.METRICS_ENABLED:
+                    instrument(ldap_service, "ldap")
+                _ldap_service = AsyncLDAPService(ldap_service)
+    return _ldap_service
 
 
-def get_ldap_service() -> LDAPServiceAbstractClass:
-    """Factory function for LDAP service"""
-    return LDAPService()
+def close_ldap_service():
+    """Release the shared LDAP service, its thread pool and its connections"""
+    global _ldap_service
+    with _singleton_lock:
+        _ldap_service = None
+    shutdown_ldap_executor()
+    close_ldap_pool()
@@ -0,0 +1,203 @@
+import asyncio
+import math
+import time
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+
+from core.config import settings
+from services.interfaces import CounterStoreAbstractClass, DatabaseServiceAbstractClass
+from utils.cache import TTLCache
+from utils.logger import get_logger
+from utils.metrics import Counter, registry
+
+
+logger = get_logger(__name__)
+
+login_rejections = registry.register(Counter(
+    "login_rejections_total",
+    "Login attempts refused without an LDAP bind",
+    ("reason",),
+))
+
+
+class MemoryCounterStore(CounterStoreAbstractClass):
+    """Per-process counters in a size-bounded TTL cache"""
+
+    def __init__(self, maxsize: int = settings.LOGIN_RATE_LIMIT_CACHE_SIZE):
+        # Every entry is stored with its own TTL
+        self.cache = TTLCache(maxsize=maxsize, ttl=0)
+
+    async def increment(self, key: str, ttl: float) -> int:
+        counter = self.cache.get(key)
+        if counter is None:
+            counter = [0]
+            self.cache.set(key, counter, ttl=ttl)
+        counter[0] += 1
+        return counter[0]
+
+    async def get_many(self, keys: List[str]) -> Dict[str, int]:
+        counts = {}
+        for key in keys:
+            counter = self.cache.get(key)
+            if counter is not None:
+                counts[key] = counter[0]
+        return counts
+
+    async def delete(self, keys: List[str]):
+        for key in keys:
+            self.cache.invalidate(key)
+
+
+class DatabaseCounterStore(CounterStoreAbstractClass):
+    """Counters kept in MongoDB so every worker sees the same counts"""
+
+    def __init__(self, db_service: DatabaseServiceAbstractClass):
+        self.db_service = db_service
+
+    async def increment(self, key: str, ttl: float) -> int:
+        return await self.db_service.increment_expiring_counter(key, ttl)
+
+    async def get_many(self, keys: List[str]) -> Dict[str, int]:
+        return await self.db_service.get_expiring_counters(keys)
+
+    async def delete(self, keys: List[str]):
+        await self.db_service.delete_expiring_counters(keys)
+
+
+class LoginGuard:
+    """Refuses logins without an LDAP bind after repeated failures or for unknown users.
+
+    Failures are counted per username and per client IP with a sliding
+    window counter: the current fixed window plus the previous one weighted
+    by how much of it still overlaps the sliding window. Usernames that LDAP
+    does not know are remembered for a short time and refused without a
+    bind, but with the same 401 and the same counting as a wrong password,
+    so the responses never reveal which accounts are real.
+    """
+
+    def __init__(
+        self,
+        store: CounterStoreAbstractClass,
+        window: float = settings.LOGIN_RATE_LIMIT_WINDOW,
+        max_failures_per_username: int = settings.LOGIN_MAX_FAILURES_PER_USERNAME,
+        max_failures_per_ip: int = settings.LOGIN_MAX_FAILURES_PER_IP,
+        missing_user_ttl: float = settings.LOGIN_MISSING_USER_TTL
+    ):
+        self.store = store
+        self.window = window
+        self.max_failures_per_username = max_failures_per_username
+        self.max_failures_per_ip = max_failures_per_ip
+        self.missing_user_ttl = missing_user_ttl
+
+    def _window_keys(self, scope: str, value: str, now: float) -> Tuple[str, str, float]:
+        """Current and previous window keys, and the weight of the previous window"""
+        window_index = int(now // self.window)
+        weight = 1 - (now % self.window) / self.window
+        return f"{scope}:{value}:{window_index}", f"{scope}:{value}:{window_index - 1}", weight
+
+    @staticmethod
+    def _missing_key(username: str) -> str:
+        return f"missing:{username}"
+
+    def _reject(self, reason: str, now: float):
+        login_rejections.labels(reason).inc()
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many failed login attempts. Try again later.",
+            headers={"Retry-After": str(math.ceil(self.window - now % self.window))},
+        )
+
+    async def check(self, username: str, client_ip: Optional[str]) -> float:
+        """Raise if the attempt should be refused, otherwise return the username's recent failures"""
+        now = time.time()
+        user_current, user_previous, weight = self._window_keys("user", username, now)
+        keys = [user_current, user_previous, self._missing_key(username)]
+        if client_ip:
+            ip_current, ip_previous, _ = self._window_keys("ip", client_ip, now)
+            keys += [ip_current, ip_previous]
+
+        try:
+            counts = await self.store.get_many(keys)
+        except Exception:
+            # Fail open - an unavailable store must not lock every user out
+            logger.warning("Login limiter store unavailable", exc_info=True)
+            return 0.0
+
+        user_failures = counts.get(user_current, 0) + counts.get(user_previous, 0) * weight
+        if user_failures >= self.max_failures_per_username:
+            self._reject("username", now)
+        if client_ip:
+            ip_failures = counts.get(ip_current, 0) + counts.get(ip_previous, 0) * weight
+            if ip_failures >= self.max_failures_per_ip:
+                self._reject("ip", now)
+
+        if counts.get(self._missing_key(username)):
+            # Exactly what a failed bind would have produced, just without the bind
+            login_rejections.labels("unknown_user").inc()
+            await self.record_failure(username, client_ip)
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Incorrect username or password",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        return user_failures
+
+    async def _increment_all(self, counters: List[Tuple[str, float]]) -> List[int]:
+        """New counts in the order given, 0 for any the store could not increment"""
+        results = await asyncio.gather(
+            *(self.store.increment(key, ttl) for key, ttl in counters), return_exceptions=True
+        )
+        if any(isinstance(result, Exception) for result in results):
+            logger.warning("Could not record failed login attempt")
+        return [0 if isinstance(result, Exception) else result for result in results]
+
+    async def record_failure(self, username: str, client_ip: Optional[str]) -> int:
+        """Count a failed attempt against the username and the client IP.
+
+        Returns the username's failures in the current fixed window, so the
+        caller can look the username up once per window rather than per attempt.
+        """
+        now = time.time()
+        # Window counters live for two windows so the previous one can still be read
+        counters = [(self._window_keys("user", username, now)[0], 2 * self.window)]
+        if client_ip:
+            counters.append((self._window_keys("ip", client_ip, now)[0], 2 * self.window))
+        return (await self._increment_all(counters))[0]
+
+    async def remember_missing_user(self, username: str):
+        """Refuse a username LDAP does not know without a bind for missing_user_ttl seconds"""
+        if self.missing_user_ttl > 0:
+            await self._increment_all([(self._missing_key(username), self.missing_user_ttl)])
+
+    async def reset(self, username: str):
+        """Clear a username's failures after a successful login or when the account is created"""
+        now = time.time()
+        current, previous, _ = self._window_keys("user", username, now)
+        try:
+            await self.store.delete([current, previous, self._missing_key(username)])
+        except Exception:
+            logger.warning("Could not reset failed logins for %s", username, exc_info=True)
+
+
+_login_guard: Optional[LoginGuard] = None
+
+
+def get_login_guard() -> Optional[LoginGuard]:
+    """Factory function for the process-wide login guard, or None when limiting is disabled"""
+    global _login_guard
+    if not settings.LOGIN_RATE_LIMIT_ENABLED:
+        return None
+    if _login_guard is None:
+        if settings.LOGIN_RATE_LIMIT_BACKEND == "mongodb":
+            from services.database_service import get_database_service
+
+            store: CounterStoreAbstractClass = DatabaseCounterStore(get_database_service())
+        else:
+            if settings.LOGIN_RATE_LIMIT_BACKEND != "memory":
+                logger.warning(
+                    "Unknown LOGIN_RATE_LIMIT_BACKEND %r - using memory", settings.LOGIN_RATE_LIMIT_BACKEND
+                )
+            store = MemoryCounterStore()
+        _login_guard = LoginGuard(store)
+    return _login_guard
@@ -0,0 +1,105 @@
+import hashlib
+import secrets
+import time
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException, status
+
+from core.config import settings
+from services.interfaces import DatabaseServiceAbstractClass
+from utils.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+
+class SessionService:
+    """Refresh token sessions stored in the sessions collection.
+
+    A refresh token is "<session id>.<secret>". Only a hash of the secret is
+    stored, and every refresh swaps it for a new one, so a refresh token
+    works once. Presenting a token that has already been rotated means it
+    was copied, and the whole session is revoked. A database error is not
+    taken as reuse: the refresh fails with a 503 and the session survives.
+    """
+
+    def __init__(self, db_service: DatabaseServiceAbstractClass,
+                 lifetime: timedelta = timedelta(hours=settings.REFRESH_TOKEN_EXPIRE_HOURS)):
+        self.db_service = db_service
+        self.lifetime = lifetime
+
+    @staticmethod
+    def _hash(secret: str) -> str:
+        return hashlib.sha256(secret.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _split(refresh_token: str) -> Optional[Tuple[str, str]]:
+        session_id, _, secret = refresh_token.partition(".")
+        if not session_id or not secret:
+            return None
+        return session_id, secret
+
+    @property
+    def expires_in(self) -> int:
+        return int(self.lifetime.total_seconds())
+
+    async def create(self, username: str, groups: List[str]) -> Optional[str]:
+        """Open a session for a fresh login and return its refresh token, or None if it could not be stored"""
+        session_id = secrets.token_urlsafe(16)
+        secret = secrets.token_urlsafe(32)
+        now = datetime.utcnow()
+        session = {
+            "_id": session_id,
+            "username": username,
+            "token_hash": self._hash(secret),
+            # Groups as LDAP reported them at login; access tokens minted from the
+            # session carry groups_at so they age out like the original token's claims
+            "groups": groups,
+            "groups_at": time.time(),
+            "created_at": now,
+            "expires_at": now + self.lifetime,
+            "last_used_at": now,
+        }
+        if not await self.db_service.create_session(session):
+            logger.warning("Could not store refresh session for %s", username)
+            return None
+        return f"{session_id}.{secret}"
+
+    async def rotate(self, refresh_token: str) -> Optional[Tuple[dict, str]]:
+        """Swap refresh_token for a new one and return the session with it, or None if it is not valid"""
+        parts = self._split(refresh_token)
+        if parts is None:
+            return None
+        session_id, secret = parts
+        token_hash = self._hash(secret)
+        new_secret = secrets.token_urlsafe(32)
+        try:
+            session = await self.db_service.rotate_session(session_id, token_hash, self._hash(new_secret))
+        except Exception:
+            # The session is left as it was, so the same token works again once the store is back
+            logger.warning("Could not rotate refresh session %s", session_id, exc_info=True)
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Session store unavailable. Try again later."
+            )
+        if session is None:
+            # Only a live session holding a different hash means the token was already
+            # rotated and has been copied; unknown and expired sessions are just invalid
+            current = await self.db_service.get_session(session_id)
+            if current is not None and current["token_hash"] != token_hash:
+                logger.warning("Refresh token reuse for session %s - revoking it", session_id)
+                await self.db_service.delete_session(session_id)
+            return None
+        return session, f"{session_id}.{new_secret}"
+
+    async def revoke(self, session_id: str) -> bool:
+        """End a session so its refresh token stops working"""
+        return await self.db_service.delete_session(session_id)
+
+
+def get_session_service() -> SessionService:
+    """Factory function for session service dependency injection"""
+    from services.database_service import get_database_service
+
+    return SessionService(get_database_service())
@@ -0,0 +1,115 @@
+import asyncio
+import time
+from typing import Optional
+
+from core.config import settings
+from models.schemas import AdminStats
+from services.interfaces import AsyncLDAPServiceAbstractClass, DatabaseServiceAbstractClass
+from utils.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+
+class AdminStatsService:
+    """Serves admin statistics from a cached summary refreshed in the background"""
+
+    def __init__(
+        self,
+        ldap_service: AsyncLDAPServiceAbstractClass,
+        db_service: DatabaseServiceAbstractClass,
+        ttl: float = settings.ADMIN_STATS_CACHE_TTL,
+        refresh_interval: float = settings.ADMIN_STATS_REFRESH_INTERVAL
+    ):
+        self.ldap_service = ldap_service
+        self.db_service = db_service
+        self.ttl = ttl
+        self.refresh_interval = refresh_interval
+        self._stats: Optional[AdminStats] = None
+        self._computed_at = 0.0
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    async def compute(self) -> AdminStats:
+        """Build the summary - one Mongo aggregation plus one LDAP group search"""
+        stats, member_counts = await asyncio.gather(
+            self.db_service.get_admin_stats(),
+            self.ldap_service.get_group_member_counts()
+        )
+        return AdminStats(
+            total_users=stats["total_users"],
+            group_a_users=member_counts.get("Group_A", 0),
+            group_b_users=member_counts.get("Group_B", 0),
+            active_sessions=stats["active_sessions"]
+        )
+
+    def _is_fresh(self) -> bool:
+        return self._stats is not None and time.monotonic() - self._computed_at < self.ttl
+
+    async def _store(self) -> AdminStats:
+        self._stats = await self.compute()
+        self._computed_at = time.monotonic()
+        return self._stats
+
+    async def refresh(self) -> AdminStats:
+        """Recompute the summary and replace the cached copy"""
+        async with self._lock:
+            return await self._store()
+
+    async def get_stats(self) -> AdminStats:
+        """Return cached statistics, recomputing only when older than the TTL"""
+        self.start()
+
+        if self._is_fresh():
+            return self._stats
+
+        async with self._lock:
+            # Another request may have refreshed while we waited for the lock
+            if self._is_fresh():
+                return self._stats
+            return await self._store()
+
+    async def _refresh_forever(self):
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("Admin stats refresh failed")
+
+    def start(self):
+        """Start the background refresher on the running loop if it isn't already"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._refresh_forever())
+
+    async def stop(self):
+        """Cancel the background refresher"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+_admin_stats_service: Optional[AdminStatsService] = None
+
+
+def get_admin_stats_service() -> AdminStatsService:
+    """Factory function for the process-wide admin stats service"""
+    global _admin_stats_service
+    if _admin_stats_service is None:
+        from services.ldap_service import get_ldap_service
+        from services.database_service import get_database_service
+
+        _admin_stats_service = AdminStatsService(get_ldap_service(), get_database_service())
+    return _admin_stats_service
+
+
+async def shutdown_admin_stats_service():
+    """Stop the background refresher and drop the shared instance"""
+    global _admin_stats_service
+    if _admin_stats_service is not None:
+        await _admin_stats_service.stop()
+        _admin_stats_service = None
@@ -0,0 +1,57 @@
+import asyncio
+from typing import Optional
+from fastapi import HTTPException
+
+from services.interfaces import AsyncLDAPServiceAbstractClass, DatabaseServiceAbstractClass
+
+
+UID_COUNTER = "uidNumber"
+# The first allocated UID when the directory has no posix accounts yet is 1001
+DEFAULT_LAST_UID = 1000
+
+
+class UIDAllocator:
+    """Hands out uidNumbers from an atomic MongoDB counter seeded once from LDAP"""
+
+    def __init__(self, ldap_service: AsyncLDAPServiceAbstractClass, db_service: DatabaseServiceAbstractClass):
+        self.ldap_service = ldap_service
+        self.db_service = db_service
+        self._seeded = False
+        self._lock = asyncio.Lock()
+
+    async def seed(self) -> bool:
+        """Raise the counter to the highest uidNumber already in the directory"""
+        async with self._lock:
+            if self._seeded:
+                return True
+            highest = await self.ldap_service.get_highest_uid_number()
+            seed = max(highest or 0, DEFAULT_LAST_UID)
+            self._seeded = await self.db_service.seed_counter(UID_COUNTER, seed)
+            return self._seeded
+
+    async def allocate(self, count: int = 1) -> int:
+        """Reserve count consecutive uidNumbers and return the first one"""
+        if not self._seeded and not await self.seed():
+            raise HTTPException(status_code=503, detail="UID allocator is not available")
+        last = await self.db_service.increment_counter(UID_COUNTER, count)
+        return last - count + 1
+
+
+_uid_allocator: Optional[UIDAllocator] = None
+
+
+def get_uid_allocator() -> UIDAllocator:
+    """Factory function for the process-wide UID allocator"""
+    global _uid_allocator
+    if _uid_allocator is None:
+        from services.ldap_service import get_ldap_service
+        from services.database_service import get_database_service
+
+        _uid_allocator = UIDAllocator(get_ldap_service(), get_database_service())
+    return _uid_allocator
+
+
+def reset_uid_allocator():
+    """Drop the shared allocator so it is rebuilt around fresh services"""
+    global _uid_allocator
+    _uid_allocator = None
@@ -0,0 +1,73 @@
+"""LDAPConnectionPool against the in-memory directory used by the benchmarks"""
+import ldap
+import pytest
+
+from benchmarks.fake_ldap import FakeLDAPServer
+from core.config import settings
+from services.ldap_pool import LDAPConnectionPool
+
+
+@pytest.fixture
+def server():
+    return FakeLDAPServer(connect_latency=0, bind_latency=0, op_latency=0)
+
+
+@pytest.fixture
+def opened():
+    """Every connection the pool has opened, in order"""
+    return []
+
+
+@pytest.fixture
+def pool(server, opened):
+    def connect(uri, bind_dn, bind_password):
+        conn = server.initialize(uri)
+        conn.simple_bind_s(bind_dn, bind_password)
+        opened.append(conn)
+        return conn
+
+    pool = LDAPConnectionPool(
+        "ldap://fake", settings.LDAP_ADMIN_DN, settings.LDAP_ADMIN_PASSWORD, size=3, connect=connect
+    )
+    yield pool
+    pool.close()
+
+
+def test_run_reconnects_once_after_server_restart(pool, opened):
+    pool.warm(3)
+    # A restarted server has dropped every connection the pool holds
+    for conn in opened:
+        conn.unbind_s()
+
+    assert pool.run(lambda conn: conn.whoami_s()) == f"dn:{settings.LDAP_ADMIN_DN}"
+    # The dead idle connections were dropped rather than each tried in turn
+    assert len(opened) == 4
+    assert pool.stats() == {"size": 3, "open": 1, "idle": 1, "in_use": 0}
+
+
+def test_run_gives_up_after_one_retry(pool):
+    calls = []
+
+    def operation(conn):
+        calls.append(conn)
+        raise ldap.SERVER_DOWN({"desc": "Can't contact LDAP server"})
+
+    with pytest.raises(ldap.SERVER_DOWN):
+        pool.run(operation)
+    assert len(calls) == 2
+    assert calls[0] is not calls[1]
+    assert pool.stats()["open"] == 0
+
+
+def test_run_does_not_retry_other_errors(pool):
+    calls = []
+
+    def operation(conn):
+        calls.append(conn)
+        raise ldap.NO_SUCH_OBJECT({"desc": "No such object"})
+
+    with pytest.raises(ldap.NO_SUCH_OBJECT):
+        pool.run(operation)
+    assert len(calls) == 1
+    # The connection itself is fine and goes back to the pool
+    assert pool.stats() == {"size": 3, "open": 1, "idle": 1, "in_use": 0}
@@ -0,0 +1,127 @@
+"""LoginGuard's sliding windows and unknown-user cache with the in-memory counter store"""
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from services import login_guard as login_guard_module
+from services.login_guard import LoginGuard, MemoryCounterStore
+
+
+WINDOW = 100.0
+IP = "203.0.113.7"
+
+
+class Clock:
+    def __init__(self, now: float):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # Start exactly at a window boundary so the previous window's weight is easy to follow
+    clock = Clock(10 * WINDOW)
+    monkeypatch.setattr(login_guard_module, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def guard(clock):
+    return LoginGuard(
+        MemoryCounterStore(), window=WINDOW, max_failures_per_username=5, max_failures_per_ip=8,
+        missing_user_ttl=30
+    )
+
+
+def check(guard: LoginGuard, username: str, client_ip=IP):
+    return asyncio.run(guard.check(username, client_ip))
+
+
+def rejection(guard: LoginGuard, username: str, client_ip=IP) -> HTTPException:
+    with pytest.raises(HTTPException) as excinfo:
+        check(guard, username, client_ip)
+    return excinfo.value
+
+
+def fail(guard: LoginGuard, username: str, times: int, client_ip=IP):
+    for _ in range(times):
+        asyncio.run(guard.record_failure(username, client_ip))
+
+
+def test_username_is_refused_after_max_failures(guard):
+    fail(guard, "alice", 4)
+    assert check(guard, "alice") == 4
+    fail(guard, "alice", 1)
+
+    error = rejection(guard, "alice")
+    assert error.status_code == 429
+    assert error.headers["Retry-After"] == str(int(WINDOW))
+    assert check(guard, "bob") == 0
+
+
+def test_failures_slide_out_of_the_window(guard, clock):
+    fail(guard, "alice", 5)
+
+    # Start of the next window: the previous one still counts in full
+    clock.now += WINDOW
+    assert rejection(guard, "alice").status_code == 429
+
+    # Halfway through it, only half of the previous window overlaps
+    clock.now += WINDOW / 2
+    assert check(guard, "alice") == 2.5
+
+    # Two windows on, nothing is left
+    clock.now += WINDOW
+    assert check(guard, "alice") == 0
+
+
+def test_client_ip_is_refused_across_usernames(guard):
+    for i in range(8):
+        fail(guard, f"user{i}", 1)
+    assert rejection(guard, "someone-else").status_code == 429
+    assert check(guard, "someone-else", client_ip="198.51.100.1") == 0
+
+
+def test_unknown_user_gets_the_same_answers_as_a_wrong_password(guard):
+    asyncio.run(guard.remember_missing_user("ghost"))
+    other_ip = "198.51.100.1"
+
+    # A cached unknown user is refused without a bind, exactly like a failed one
+    for _ in range(5):
+        error = rejection(guard, "ghost")
+        assert error.status_code == 401
+        assert error.detail == "Incorrect username or password"
+        assert error.headers == {"WWW-Authenticate": "Bearer"}
+        fail(guard, "alice", 1, client_ip=other_ip)
+
+    # And it is counted the same way, so both reach the limit together
+    assert rejection(guard, "ghost").status_code == 429
+    assert rejection(guard, "alice", client_ip=other_ip).status_code == 429
+
+
+def test_reset_clears_failures_and_the_unknown_user_entry(guard):
+    fail(guard, "alice", 5)
+    asyncio.run(guard.remember_missing_user("alice"))
+
+    asyncio.run(guard.reset("alice"))
+    assert check(guard, "alice") == 0
+
+
+def test_record_failure_returns_the_current_window_count(guard, clock):
+    assert asyncio.run(guard.record_failure("alice", IP)) == 1
+    assert asyncio.run(guard.record_failure("alice", None)) == 2
+    clock.now += WINDOW
+    assert asyncio.run(guard.record_failure("alice", IP)) == 1
+
+
+def test_unavailable_store_fails_open(clock):
+    class BrokenStore(MemoryCounterStore):
+        async def get_many(self, keys):
+            raise ConnectionError("store down")
+
+    guard = LoginGuard(BrokenStore(), window=WINDOW, max_failures_per_username=1)
+    fail(guard, "alice", 3)
+    assert check(guard, "alice") == 0.0
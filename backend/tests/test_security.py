@@ -0,0 +1,60 @@
+"""Trusting signed group claims until they are revoked or too old"""
+import time
+
+import pytest
+
+from core.config import settings
+from core.security import SecurityService
+
+
+@pytest.fixture
+def security(monkeypatch):
+    monkeypatch.setattr(settings, "TRUST_TOKEN_CLAIMS", True)
+    return SecurityService()
+
+
+def claims(username: str, issued_at: float, **extra) -> dict:
+    return {"sub": username, "groups": ["Group_A"], "iat": issued_at, **extra}
+
+
+def test_recent_claims_are_trusted(security):
+    assert security.claims_are_fresh(claims("alice", time.time() - 1))
+
+
+def test_claims_are_not_trusted_when_disabled_or_missing(security, monkeypatch):
+    assert not security.claims_are_fresh({"sub": "alice", "iat": time.time()})
+    monkeypatch.setattr(settings, "TRUST_TOKEN_CLAIMS", False)
+    assert not security.claims_are_fresh(claims("alice", time.time()))
+
+
+def test_old_claims_are_not_trusted(security):
+    issued_at = time.time() - settings.TOKEN_CLAIMS_MAX_AGE_SECONDS - 1
+    assert not security.claims_are_fresh(claims("alice", issued_at))
+    # A refreshed token's groups are as old as the LDAP read, not the token
+    assert not security.claims_are_fresh(claims("alice", time.time(), groups_at=issued_at))
+
+
+def test_revoke_claims_only_affects_earlier_tokens_of_that_user(security):
+    before = time.time() - 1
+    security.revoke_claims("alice")
+    after = time.time() + 1
+
+    assert not security.claims_are_fresh(claims("alice", before))
+    assert security.claims_are_fresh(claims("alice", after))
+    assert security.claims_are_fresh(claims("bob", before))
+
+
+def test_evicted_revocation_does_not_readmit_claims(monkeypatch):
+    monkeypatch.setattr(settings, "TRUST_TOKEN_CLAIMS", True)
+    monkeypatch.setattr(settings, "TOKEN_REVOCATION_CACHE_SIZE", 1)
+    security = SecurityService()
+    before = time.time() - 1
+
+    security.revoke_claims("alice")
+    # The list only holds one user, so alice's revocation is pushed out
+    security.revoke_claims("bob")
+
+    assert not security.claims_are_fresh(claims("alice", before))
+    # Claims issued before a lost revocation go back to LDAP for everyone
+    assert not security.claims_are_fresh(claims("carol", before))
+    assert security.claims_are_fresh(claims("alice", time.time() + 1))
@@ -0,0 +1,90 @@
+"""Refresh token rotation and reuse detection against the database fake"""
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+
+from benchmarks.fakes import FakeDatabaseService
+from services.session_service import SessionService
+
+
+@pytest.fixture
+def db_service():
+    return FakeDatabaseService(latency=0.001)
+
+
+@pytest.fixture
+def sessions(db_service):
+    return SessionService(db_service)
+
+
+def open_session(sessions: SessionService) -> str:
+    return asyncio.run(sessions.create("alice", ["Group_A"]))
+
+
+def rotate(sessions: SessionService, refresh_token: str):
+    return asyncio.run(sessions.rotate(refresh_token))
+
+
+def test_rotate_swaps_the_token(sessions):
+    token = open_session(sessions)
+    session, new_token = rotate(sessions, token)
+
+    assert session["username"] == "alice"
+    assert new_token != token
+    assert new_token.partition(".")[0] == token.partition(".")[0]
+    assert rotate(sessions, new_token) is not None
+
+
+def test_reusing_a_rotated_token_revokes_the_session(sessions, db_service):
+    token = open_session(sessions)
+    _, new_token = rotate(sessions, token)
+
+    assert rotate(sessions, token) is None
+    assert db_service.sessions == {}
+    # Whoever holds the current token is logged out too
+    assert rotate(sessions, new_token) is None
+
+
+def test_concurrent_rotations_issue_one_token(sessions, db_service):
+    token = open_session(sessions)
+
+    async def race():
+        return await asyncio.gather(sessions.rotate(token), sessions.rotate(token))
+
+    results = asyncio.run(race())
+    # The swap is a compare-and-set, so only one caller gets a new token. The
+    # loser presented a token that no longer matches, which is reuse.
+    winners = [result for result in results if result is not None]
+    assert len(winners) == 1
+    assert db_service.sessions == {}
+    assert rotate(sessions, winners[0][1]) is None
+
+
+def test_unknown_and_expired_sessions_are_not_revoked(sessions, db_service):
+    assert rotate(sessions, "missing.secret") is None
+    assert rotate(sessions, "no-secret") is None
+
+    token = open_session(sessions)
+    session_id = token.partition(".")[0]
+    db_service.sessions[session_id]["expires_at"] = datetime.utcnow() - timedelta(seconds=1)
+    assert rotate(sessions, token) is None
+    assert session_id in db_service.sessions
+    assert "delete_session" not in db_service.calls
+
+
+def test_store_errors_are_not_taken_as_reuse(sessions, db_service, monkeypatch):
+    token = open_session(sessions)
+
+    async def unavailable(*args):
+        raise ConnectionError("mongod unreachable")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(db_service, "rotate_session", unavailable)
+        with pytest.raises(HTTPException) as excinfo:
+            rotate(sessions, token)
+    assert excinfo.value.status_code == 503
+
+    # The session survived, and the same token works once the store is back
+    assert rotate(sessions, token) is not None
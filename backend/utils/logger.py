@@ -18,7 +18,7 @@ def setup_logging():
     
     # Configure root logger
     logging.basicConfig(
-        level=getattr(logging, settings.LOG_LEVEL if hasattr(settings, 'LOG_LEVEL') else 'INFO'),
+        level=getattr(logging, settings.LOG_LEVEL, logging.INFO),
         format=log_format,
         handlers=[
             logging.StreamHandler(sys.stdout),
@@ -0,0 +1,29 @@
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+
+class StageTimer:
+    """Records how long each named stage of a request pipeline took"""
+
+    def __init__(self):
+        self.stages: Dict[str, float] = {}
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time the enclosed block as the given stage"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = time.perf_counter() - start
+
+    def total(self) -> float:
+        """Seconds since the timer was created"""
+        return time.perf_counter() - self._start
+
+    def report(self, callback: Optional[Callable[[Dict[str, float]], None]]):
+        """Hand the stage durations, plus the total, to callback if one is set"""
+        if callback is not None:
+            callback({**self.stages, "total": self.total()})
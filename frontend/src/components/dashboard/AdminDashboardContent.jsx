@@ -8,35 +8,57 @@ const AdminDashboardContent = () => {
   const { user } = useAuth();
   const [users, setUsers] = useState([]);
   const [stats, setStats] = useState({});
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     fetchAdminData();
   }, []);
 
+  const authHeaders = () => {
+    const token = localStorage.getItem('token');
+    return token ? { Authorization: `Bearer ${token}` } : {};
+  };
+
   const fetchAdminData = async () => {
     try {
-      const token = localStorage.getItem('token');
-      const headers = token ? { Authorization: `Bearer ${token}` } : {};
-      
-      const [usersResponse, statsResponse] = await Promise.all([
-        axios.get('/admin/users', { headers }),
-        axios.get('/admin/stats', { headers })
-      ]);
+      // One request authenticates once; the server gathers the first page of users and stats together
+      const response = await axios.get('/admin/dashboard', { headers: authHeaders() });
       
       // Ensure we get an array for users
-      setUsers(Array.isArray(usersResponse.data) ? usersResponse.data : []);
-      setStats(statsResponse.data || {});
+      setUsers(Array.isArray(response.data.users) ? response.data.users : []);
+      setNextCursor(response.data.next_cursor || null);
+      setStats(response.data.stats || {});
     } catch (error) {
       console.error('Failed to fetch admin data:', error);
       // Set empty array on error to prevent map error
       setUsers([]);
+      setNextCursor(null);
       setStats({});
     } finally {
       setLoading(false);
     }
   };
 
+  const loadMoreUsers = async () => {
+    setLoadingMore(true);
+    try {
+      // Later pages come from /admin/users, which returns the following cursor in a header
+      const response = await axios.get('/admin/users', {
+        headers: authHeaders(),
+        params: { after: nextCursor },
+      });
+      const page = Array.isArray(response.data) ? response.data : [];
+      setUsers((current) => [...current, ...page]);
+      setNextCursor(response.headers['x-next-cursor'] || null);
+    } catch (error) {
+      console.error('Failed to fetch more users:', error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   if (loading) {
     return <LoadingSpinner message="Loading admin dashboard..." />;
   }
@@ -70,6 +92,11 @@ const AdminDashboardContent = () => {
 
         <div className="users-section">
           <h2>User Management</h2>
+          {nextCursor && (
+            <p className="users-partial">
+              Showing the first {users.length} of {stats.total_users || 'many'} users.
+            </p>
+          )}
           <div className="users-table-container">
             <table className="users-table">
               <thead>
@@ -100,6 +127,17 @@ const AdminDashboardContent = () => {
               </tbody>
             </table>
           </div>
+          {nextCursor && (
+            <div className="action-buttons">
+              <button
+                className="action-button primary"
+                onClick={loadMoreUsers}
+                disabled={loadingMore}
+              >
+                {loadingMore ? 'Loading...' : 'Load more users'}
+              </button>
+            </div>
+          )}
         </div>
       </div>
     </div>
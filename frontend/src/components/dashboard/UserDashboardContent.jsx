@@ -16,13 +16,11 @@ const UserDashboardContent = () => {
 
   const fetchUserData = async () => {
     try {
-      const [profileResponse, activitiesResponse] = await Promise.all([
-        axios.get('/user/profile'),
-        axios.get('/user/activities')
-      ]);
+      // One request authenticates once; the server gathers profile and activities together
+      const response = await axios.get('/user/dashboard');
       
-      setProfile(profileResponse.data);
-      setActivities(activitiesResponse.data);
+      setProfile(response.data.profile);
+      setActivities(response.data.activities);
     } catch (error) {
       console.error('Failed to fetch user data:', error);
     } finally {